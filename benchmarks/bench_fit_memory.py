@@ -0,0 +1,66 @@
+"""
+Peak memory of fit, traced with tracemalloc, against the first release's
+fit (which copied X with a ones column and the DataFrame columns)
+
+    python -m benchmarks.bench_fit_memory [--n 1000000] [--p 20]
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.common import (
+    baseline_fit, make_regression, peak_memory, print_table, warm_up,
+)
+from mlr.MLR import MyLinearRegression
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--p", type=int, default=20)
+    args = parser.parse_args()
+    warm_up()
+
+    X, y = make_regression(args.n, args.p)
+    size = X.nbytes
+    rows = []
+
+    rows.append(["fit, inv (before)", peak_memory(lambda: baseline_fit(X, y))])
+    for solver in ("auto", "cholesky", "qr", "svd"):
+        rows.append(["fit, " + solver, peak_memory(lambda: MyLinearRegression(solver=solver).fit(X, y))])
+
+    def ingest_and_fit(copy):
+        model = MyLinearRegression()
+        model.ingest_data(X, y, copy=copy)
+        model.fit()
+
+    rows.append(["ingest_data(copy=True) + fit", peak_memory(lambda: ingest_and_fit(True))])
+    rows.append(["ingest_data(copy=False) + fit", peak_memory(lambda: ingest_and_fit(False))])
+
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+    if pd is not None:
+        columns = ["x{}".format(i) for i in range(args.p)]
+        df = pd.DataFrame(X, columns=columns, copy=True)
+        df["y"] = y
+
+        def baseline_dataframe():
+            baseline_fit(np.array(df[columns]), np.array(df["y"]))
+
+        rows.append(["fit_dataframe, inv (before)", peak_memory(baseline_dataframe)])
+        rows.append([
+            "fit_dataframe",
+            peak_memory(lambda: MyLinearRegression().fit_dataframe(columns, "y", df)),
+        ])
+
+    print("Peak traced memory, n={} p={} (X is {:.1f} MB)".format(args.n, args.p, size / 1e6))
+    print_table(
+        ("", "peak MB", "peak / size of X"),
+        [[name, peak / 1e6, peak / size] for name, peak in rows],
+    )
+
+
+if __name__ == "__main__":
+    main()
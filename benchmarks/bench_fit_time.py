@@ -0,0 +1,42 @@
+"""
+Fit time of every direct solver across n and p, against the first
+release's fit (inverse of X^T X)
+
+    python -m benchmarks.bench_fit_time [--n 10000 100000] [--p 10 50]
+"""
+import argparse
+
+from benchmarks.common import (
+    baseline_fit, best_time, make_regression, print_table, warm_up,
+)
+from mlr.MLR import MyLinearRegression
+
+SOLVERS = ("auto", "cholesky", "qr", "svd", "lstsq")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--n", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--p", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--max-size", type=float, default=5e7, help="largest n * p run")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    warm_up()
+
+    rows = []
+    for n in args.n:
+        for p in args.p:
+            if n * p > args.max_size:
+                continue
+            X, y = make_regression(n, p)
+            times = [best_time(lambda: baseline_fit(X, y), args.repeat)]
+            for solver in SOLVERS:
+                model = MyLinearRegression(solver=solver)
+                times.append(best_time(lambda: model.fit(X, y), args.repeat))
+            rows.append([str(n), str(p)] + [1e3 * t for t in times])
+    print("Fit time in ms (best of {})".format(args.repeat))
+    print_table(("n", "p", "inv (before)") + SOLVERS, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Scaling of fit_grouped over 1..N worker processes, against one fit per
+group in a Python loop
+
+    python -m benchmarks.bench_grouped_scaling [--n 2000000] [--groups 1000] [--jobs 1 2 4]
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import best_time, print_table, warm_up, worker_counts
+from mlr import fit_grouped
+from mlr.MLR import MyLinearRegression
+
+
+def make_frame(n, p, num_groups, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = ["x{}".format(i) for i in range(p)]
+    df = pd.DataFrame(rng.standard_normal((n, p)), columns=columns)
+    df["group"] = rng.integers(0, num_groups, n)
+    coef = rng.standard_normal((num_groups, p))
+    df["y"] = np.einsum("ij,ij->i", df[columns].to_numpy(), coef[df["group"]])
+    df["y"] += rng.standard_normal(n)
+    return df, columns
+
+
+def fit_loop(df, columns):
+    """One MyLinearRegression fit per group, the approach fit_grouped replaces"""
+    models = {}
+    for key, group in df.groupby("group"):
+        model = MyLinearRegression()
+        model.fit(group[columns].to_numpy(), group["y"].to_numpy())
+        models[key] = model
+    return models
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--n", type=int, default=2_000_000)
+    parser.add_argument("--p", type=int, default=10)
+    parser.add_argument("--groups", type=int, default=1000)
+    parser.add_argument(
+        "--jobs", type=int, nargs="+", default=None,
+        help="worker counts to run (default: 1, 2, 4, ... up to the CPU count)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    warm_up()
+
+    cpus = os.cpu_count() or 1
+    jobs = worker_counts(args.jobs)
+
+    df, columns = make_frame(args.n, args.p, args.groups)
+    loop = best_time(lambda: fit_loop(df, columns), 1)
+    rows = [["loop of fit", loop, 1.0]]
+    single = None
+    for n_jobs in jobs:
+        elapsed = best_time(
+            lambda: fit_grouped(df, columns, "y", "group", n_jobs=n_jobs), args.repeat
+        )
+        single = elapsed if single is None else single
+        rows.append(["n_jobs={}".format(n_jobs), elapsed, single / elapsed])
+
+    print(
+        "n={} p={} groups={}, {} CPU(s); time in s".format(
+            args.n, args.p, args.groups, cpus
+        )
+    )
+    print_table(("", "time", "speedup"), rows)
+
+
+if __name__ == "__main__":
+    main()
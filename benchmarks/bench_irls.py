@@ -0,0 +1,81 @@
+"""
+Per-iteration cost of fit_robust, whose IRLS reuses one workspace, against
+an IRLS refitting the weighted model at every iteration (and against
+statsmodels RLM, if installed)
+
+    python -m benchmarks.bench_irls [--n 1000000] [--p 20] [--iterations 10]
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.common import (
+    best_time, make_regression, peak_memory, print_table, warm_up,
+)
+from mlr.MLR import MyLinearRegression
+from mlr.Robust import MAD_SCALE, TUNING
+
+
+def refit_irls(X, y, iterations):
+    """Huber IRLS calling fit(sample_weight=...) at every iteration"""
+    model = MyLinearRegression()
+    model.fit(X, y)
+    c = TUNING["huber"]
+    for _ in range(iterations):
+        resid = model.resid_
+        scale = np.median(np.abs(resid)) / MAD_SCALE
+        weights = c * scale / np.maximum(np.abs(resid), c * scale)
+        model.fit(X, y, sample_weight=weights)
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--p", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    warm_up()
+
+    X, y = make_regression(args.n, args.p)
+    y[: args.n // 50] += 20  # gross outliers
+    m = args.iterations
+
+    def robust(iterations):
+        # tol=0: run exactly `iterations` iterations
+        MyLinearRegression().fit_robust(X, y, max_iter=iterations, tol=0)
+
+    # the least squares start and the last weighted fit are the same for any
+    # number of iterations: the difference is the cost of the iterations
+    runs = [
+        ("fit_robust (workspace)", lambda: robust(m), best_time(lambda: robust(0), args.repeat)),
+        (
+            "fit per iteration",
+            lambda: refit_irls(X, y, m),
+            best_time(lambda: refit_irls(X, y, 0), args.repeat),
+        ),
+    ]
+    try:
+        import statsmodels.api as sm
+    except ImportError:
+        sm = None
+    if sm is not None:
+        design = sm.add_constant(X)
+        rlm = sm.RLM(y, design, M=sm.robust.norms.HuberT())
+        runs.append(("statsmodels RLM", lambda: rlm.fit(maxiter=m, tol=0), 0.0))
+
+    rows = []
+    for name, func, fixed in runs:
+        elapsed = best_time(func, args.repeat)
+        rows.append([name, 1e3 * (elapsed - fixed) / m, peak_memory(func) / 1e6])
+    print(
+        "n={} p={}, {} iterations (X is {:.1f} MB)".format(
+            args.n, args.p, m, X.nbytes / 1e6
+        )
+    )
+    print_table(("", "ms / iteration", "peak MB"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Single-row latency and million-row throughput of predict, against the
+first release's predict (a new float64 array stored on every call)
+
+    python -m benchmarks.bench_predict [--n 1000000] [--p 20]
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.common import (
+    best_time, make_regression, peak_memory, print_table, warm_up,
+)
+from mlr.MLR import MyLinearRegression
+
+
+def baseline_predict(model, X):
+    """The predict of the first release: reshape, product, stored on the model"""
+    if len(X.shape) == 1:
+        X = X.reshape(-1, 1)
+    model.predicted_ = np.dot(X, model.coef_) + model.intercept_
+    return model.predicted_
+
+
+def latency(func, calls):
+    """Returns the mean time in seconds of one of `calls` calls of func()"""
+    return best_time(lambda: [func() for _ in range(calls)]) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--p", type=int, default=20)
+    parser.add_argument("--calls", type=int, default=10_000, help="single-row calls timed")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    warm_up()
+
+    X, y = make_regression(args.n, args.p)
+    X32 = X.astype(np.float32)
+    model = MyLinearRegression()
+    model.fit(X, y)
+    row = X[:1]
+    out = np.empty(args.n)
+    out32 = np.empty(args.n, dtype=np.float32)
+
+    print("Single row, mean latency in us over {} calls".format(args.calls))
+    print_table(
+        ("", "latency"),
+        [
+            ["predict (before)", 1e6 * latency(lambda: baseline_predict(model, row), args.calls)],
+            ["predict", 1e6 * latency(lambda: model.predict(row), args.calls)],
+            ["predict, out=", 1e6 * latency(lambda: model.predict(row, out=out[:1]), args.calls)],
+        ],
+    )
+
+    runs = [
+        ("predict (before)", lambda: baseline_predict(model, X)),
+        ("predict", lambda: model.predict(X)),
+        ("predict, out=", lambda: model.predict(X, out=out)),
+        ("float32 (before)", lambda: baseline_predict(model, X32)),
+        ("float32, dtype=float32", lambda: model.predict(X32, dtype=np.float32)),
+        ("float32, out=", lambda: model.predict(X32, out=out32)),
+    ]
+    rows = []
+    for name, func in runs:
+        elapsed = best_time(func, args.repeat)
+        rows.append([name, 1e3 * elapsed, args.n / elapsed / 1e6, peak_memory(func) / 1e6])
+    print()
+    print("n={} p={}, best of {}".format(args.n, args.p, args.repeat))
+    print_table(("", "time ms", "M rows/s", "peak MB"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Scaling of predict_many over 1..N threads, against a loop of predict calls
+on the batches
+
+    python -m benchmarks.bench_predict_many [--batches 64] [--rows 100000] [--threads 1 2 4]
+
+Run with OMP_NUM_THREADS=1 (or the variable of your BLAS), so that the
+threads of the pool, not those of BLAS, share the CPUs.
+"""
+import argparse
+import os
+
+from benchmarks.common import (
+    best_time, make_regression, print_table, warm_up, worker_counts,
+)
+from mlr.MLR import MyLinearRegression
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--batches", type=int, default=64)
+    parser.add_argument("--rows", type=int, default=100_000, help="rows per batch")
+    parser.add_argument("--p", type=int, default=50)
+    parser.add_argument(
+        "--threads", type=int, nargs="+", default=None,
+        help="thread counts to run (default: 1, 2, 4, ... up to the CPU count)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    warm_up()
+
+    X, y = make_regression(args.rows, args.p)
+    model = MyLinearRegression(read_only=True)
+    model.fit(X, y)
+    batches = [
+        make_regression(args.rows, args.p, seed=seed)[0] for seed in range(args.batches)
+    ]
+
+    loop = best_time(lambda: [model.predict(batch) for batch in batches], args.repeat)
+    rows = [["loop of predict", loop, 1.0]]
+    for n_threads in worker_counts(args.threads):
+        elapsed = best_time(
+            lambda: model.predict_many(batches, n_threads=n_threads), args.repeat
+        )
+        rows.append(["n_threads={}".format(n_threads), elapsed, loop / elapsed])
+
+    print(
+        "{} batches of {} x {}, {} CPU(s); time in s".format(
+            args.batches, args.rows, args.p, os.cpu_count() or 1
+        )
+    )
+    print_table(("", "time", "speedup"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Time of rolling_fit over rolling and expanding windows, against one fit
+per window in a Python loop
+
+    python -m benchmarks.bench_rolling [--n 20000] [--p 5] [--windows 300:1 500:50]
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.common import best_time, make_regression, print_table, warm_up
+from mlr.MLR import MyLinearRegression
+
+
+def fit_loop(X, y, window, step, expanding):
+    """One MyLinearRegression fit per window, the approach rolling_fit replaces"""
+    coef = []
+    for end in range(window, len(y) + 1, step):
+        start = 0 if expanding else end - window
+        model = MyLinearRegression()
+        model.fit(X[start:end], y[start:end])
+        coef.append(model.coef_)
+    return np.array(coef)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--n", type=int, default=20_000)
+    parser.add_argument("--p", type=int, default=5)
+    parser.add_argument(
+        "--windows", nargs="+", default=["300:1", "500:50", "2000:10"],
+        help="window:step pairs to run",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    warm_up()
+
+    X, y = make_regression(args.n, args.p)
+    model = MyLinearRegression()
+    model.ingest_data(X, y)
+    rows = []
+    for spec in args.windows:
+        window, step = (int(value) for value in spec.split(":"))
+        for expanding in (False, True):
+            count = len(range(window, args.n + 1, step))
+            loop = best_time(lambda: fit_loop(X, y, window, step, expanding), 1)
+            rolling = best_time(
+                lambda: model.rolling_fit(window, step=step, expanding=expanding),
+                args.repeat,
+            )
+            rows.append([
+                "expanding" if expanding else "rolling",
+                str(window), str(step), str(count), loop, rolling, loop / rolling,
+            ])
+
+    print("n={} p={}; time in s".format(args.n, args.p))
+    print_table(
+        ("", "window", "step", "windows", "loop of fit", "rolling_fit", "speedup"), rows
+    )
+
+
+if __name__ == "__main__":
+    main()
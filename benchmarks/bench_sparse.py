@@ -0,0 +1,87 @@
+"""
+Time and peak memory of fit and predict on a large sparse one-hot design,
+against the same fit on the dense design where it fits in memory
+
+    python -m benchmarks.bench_sparse [--n 1000000] [--levels 50000] [--columns 5]
+
+The defaults are scaled down from 1M x 50k so that the script runs in a
+few seconds; the sparse fit needs memory proportional to the nonzeros
+(n * columns), whatever the number of levels.
+"""
+import argparse
+
+import numpy as np
+import scipy.sparse as sp
+
+from benchmarks.common import best_time, peak_memory, print_table, warm_up
+from mlr.MLR import MyLinearRegression
+
+
+def one_hot_design(n, levels, columns, seed=0):
+    """
+    A CSR design of `columns` categorical columns of levels / columns levels
+    each, one-hot encoded without their first level (as fit_dataframe does
+    with an intercept), and a target depending on every level
+    """
+    rng = np.random.default_rng(seed)
+    per_column = levels // columns
+    codes = rng.integers(0, per_column, (n, columns))
+    present = codes > 0
+    indices = (codes - 1 + np.arange(columns) * (per_column - 1))[present]
+    indptr = np.concatenate([[0], np.cumsum(present.sum(axis=1))])
+    p = columns * (per_column - 1)
+    X = sp.csr_matrix((np.ones(len(indices)), indices, indptr), shape=(n, p))
+    y = 1.0 + X @ rng.standard_normal(p) + rng.standard_normal(n)
+    return X, y
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--n", type=int, default=200_000)
+    parser.add_argument("--levels", type=int, default=10_000)
+    parser.add_argument("--columns", type=int, default=5, help="categorical columns")
+    parser.add_argument("--solvers", nargs="+", default=["auto", "lsqr"])
+    parser.add_argument(
+        "--max-dense", type=float, default=1e9, help="largest dense design run, in bytes"
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+    warm_up()
+
+    X, y = one_hot_design(args.n, args.levels, args.columns)
+    n, p = X.shape
+    sparse_bytes = X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    dense_bytes = 8 * n * p
+
+    rows = []
+    for solver in args.solvers:
+        model = MyLinearRegression(solver=solver)
+        fit_time = best_time(lambda: model.fit(X, y), args.repeat)
+        fit_peak = peak_memory(lambda: MyLinearRegression(solver=solver).fit(X, y))
+        predict_time = best_time(lambda: model.predict(X), args.repeat)
+        rows.append([
+            "sparse, " + model.solver_, fit_time, fit_peak / 1e6, predict_time,
+            model.r_squared(),
+        ])
+    if dense_bytes <= args.max_dense:
+        X_dense = X.toarray()
+        model = MyLinearRegression()
+        fit_time = best_time(lambda: model.fit(X_dense, y), args.repeat)
+        fit_peak = peak_memory(lambda: MyLinearRegression().fit(X_dense, y))
+        predict_time = best_time(lambda: model.predict(X_dense), args.repeat)
+        rows.append([
+            "dense, " + model.solver_, fit_time, fit_peak / 1e6, predict_time,
+            model.r_squared(),
+        ])
+
+    print(
+        "n={} p={}, {} nonzeros: {:.1f} MB sparse, {:.1f} MB dense{}".format(
+            n, p, X.nnz, sparse_bytes / 1e6, dense_bytes / 1e6,
+            "" if dense_bytes <= args.max_dense else " (not run)",
+        )
+    )
+    print_table(("", "fit s", "fit peak MB", "predict s", "R^2"), rows)
+
+
+if __name__ == "__main__":
+    main()
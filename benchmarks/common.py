@@ -0,0 +1,99 @@
+"""
+Helpers shared by the benchmark scripts
+"""
+import os
+import time
+import tracemalloc
+
+import numpy as np
+
+
+def warm_up():
+    """
+    Fits a small problem with every solver, dense and sparse, and calls
+    predict and the inference methods once, so that the one-time imports
+    (SciPy, LAPACK) are not charged to the first run measured
+    """
+    import scipy.sparse as sp
+    from mlr.MLR import MyLinearRegression
+    from mlr.Solvers import SOLVERS
+
+    X, y = make_regression(200, 5, seed=1)
+    for design in (X, sp.csr_matrix(X)):
+        for solver in SOLVERS:
+            model = MyLinearRegression(solver=solver)
+            model.fit(design, y)
+            model.predict(design)
+            model.pvalues()
+            model.aic()
+
+
+def best_time(func, repeat=3):
+    """Returns the best wall-clock time in seconds of `repeat` calls of func()"""
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def worker_counts(requested=None):
+    """
+    Returns the requested numbers of workers, or by default 1, 2, 4, ... up
+    to the CPU count (included)
+    """
+    if requested is not None:
+        return requested
+    cpus = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpus:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpus:
+        counts.append(cpus)
+    return counts
+
+
+def peak_memory(func):
+    """
+    Returns the peak memory in bytes allocated while running func(), as
+    traced by tracemalloc (NumPy reports its array buffers to it)
+    """
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def baseline_fit(X, y):
+    """
+    The fit of the first release of MyLinearRegression, for reference: a
+    copy of X with a ones column, the inverse of X^T X, and the fitted
+    values and residuals as new arrays
+    """
+    X_biased = np.c_[np.ones(X.shape[0]), X]
+    coef = np.dot(np.linalg.inv(np.dot(X_biased.T, X_biased)), np.dot(X_biased.T, y))
+    fitted = np.dot(X, coef[1:]) + coef[0]
+    resid = y - fitted
+    return coef, fitted, resid
+
+
+def make_regression(n, p, seed=0, dtype=np.float64):
+    """Random regression data: X of shape (n, p) and y"""
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((n, p)).astype(dtype)
+    y = X @ rng.standard_normal(p).astype(dtype) + 1 + rng.standard_normal(n)
+    return X, y
+
+
+def print_table(header, rows):
+    """Prints rows of values as aligned columns under `header`"""
+    cells = [list(header)] + [
+        [value if isinstance(value, str) else "{:.4g}".format(value) for value in row]
+        for row in rows
+    ]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(header))]
+    for row in cells:
+        print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)))
@@ -1,8 +1,6 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import statsmodels.api as sm
-from seaborn import heatmap
 from mlr.Multicollinearity import Multicollinearity
+from mlr.Sparse import is_sparse
 
 class Data_plots:
     """
@@ -24,20 +22,31 @@ class Data_plots:
                Default: True
         cmap : matplotlib colormap name or object, or list of colors, optional
         """
+        import matplotlib.pyplot as plt
+        from seaborn import heatmap
+
         heatmap(Multicollinearity.corrcoef(self),cmap=cmap,annot=annot)
         plt.show()
     
     def pairplot(self):
-        """Creates pairplot of all variables and the target using the Seaborn library"""
+        """
+        Creates pairplot of all variables and the target using the Seaborn library
+        (a sparse design is densified)
+        """
         if not self.is_fitted:
             print("Model not fitted yet!")
             return None
+        if self.features_ is None:
+            print("The raw data is needed: the model was fitted from a stream!")
+            return None
 
         print("This may take a little time. Have patience...")
+        import matplotlib.pyplot as plt
         from seaborn import pairplot
         from pandas import DataFrame
 
-        df = DataFrame(np.hstack((self.features_, self.target_.reshape(-1, 1))))
+        X = self.features_.toarray() if is_sparse(self.features_) else self.features_
+        df = DataFrame(np.hstack((X, self.target_.reshape(-1, 1))))
         pairplot(df)
         plt.show()
 
@@ -51,6 +60,8 @@ class Data_plots:
         if not self.is_fitted:
             print("Model not fitted yet!")
             return None
+        import matplotlib.pyplot as plt
+
         plt.title("True vs. fitted values", fontsize=14)
         plt.scatter(y, self.fitted_, s=100, alpha=0.75, color="red", edgecolor="k")
         if reference_line:
@@ -1,6 +1,5 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import statsmodels.api as sm
+from mlr.Sparse import dense_column
 
 class Diagnostics_plots:
     """
@@ -22,6 +21,8 @@ class Diagnostics_plots:
         if not self.is_fitted:
             print("Model not fitted yet!")
             return None
+        import matplotlib.pyplot as plt
+
         plt.title("Fitted vs. residuals plot", fontsize=14)
         plt.scatter(self.fitted_, self.resid_, edgecolor="k")
         plt.hlines(
@@ -40,6 +41,11 @@ class Diagnostics_plots:
         if not self.is_fitted:
             print("Model not fitted yet!")
             return None
+        if self.features_ is None:
+            print("The raw data is needed: the model was fitted from a stream!")
+            return None
+        import matplotlib.pyplot as plt
+
         num_plots = self.features_.shape[1]
         if num_plots % 3 == 0:
             nrows = int(num_plots / 3)
@@ -51,8 +57,10 @@ class Diagnostics_plots:
         for i in range(num_plots, nrows * ncols):
             axes[i].set_visible(False)
         for i in range(num_plots):
+            # one column at a time, densified if the design is sparse
+            column = dense_column(self.features_, i)
             axes[i].scatter(
-                self.features_.T[i],
+                column,
                 self.resid_,
                 color="orange",
                 edgecolor="k",
@@ -63,8 +71,8 @@ class Diagnostics_plots:
             axes[i].set_ylabel("Residuals")
             axes[i].hlines(
                 y=0,
-                xmin=np.amin(self.features_.T[i]),
-                xmax=np.amax(self.features_.T[i]),
+                xmin=np.amin(column),
+                xmax=np.amax(column),
                 color="k",
                 linestyle="dashed",
             )
@@ -79,6 +87,8 @@ class Diagnostics_plots:
             norm_r = self.resid_ / np.linalg.norm(self.resid_)
         else:
             norm_r = self.resid_
+        import matplotlib.pyplot as plt
+
         num_bins = min(20, int(np.sqrt(self.features_.shape[0])))
         plt.title("Histogram of the normalized residuals")
         plt.hist(norm_r, bins=num_bins, edgecolor="k")
@@ -121,6 +131,7 @@ class Diagnostics_plots:
         if not self.is_fitted:
             print("Model not fitted yet!")
             return None
+        import matplotlib.pyplot as plt
         from scipy.stats import probplot
 
         if normalized:
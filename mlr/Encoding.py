@@ -0,0 +1,121 @@
+import sys
+import numpy as np
+
+
+def is_dataframe(X):
+    """True if X is a Pandas DataFrame (Pandas is not imported for the check)"""
+    pandas = sys.modules.get("pandas")
+    return pandas is not None and isinstance(X, pandas.DataFrame)
+
+
+class DataFrameEncoding:
+    """
+    Encoding of the feature columns of a DataFrame into a design matrix,
+    learnt by `fit_dataframe` and reused to predict on new DataFrames
+
+    Numerical columns are used as is. Categorical columns (`category`,
+    object or string dtype) are one-hot encoded straight from their integer
+    codes into a sparse matrix, with one column per level: no dense dummy
+    columns are ever created. The first level of each categorical column is
+    the reference level and gets no column when the intercept is fitted
+    (without intercept, only that of the first categorical column is kept).
+    Missing values and levels not seen in the fit are encoded as the
+    reference level.
+
+    columns: Names of the feature columns, in order
+    categories: Dictionary mapping each categorical column to its levels
+    drop_first: Dictionary mapping each categorical column to whether its
+                reference level is dropped
+    feature_names: Names of the columns of the design matrix, e.g. 'color[red]'
+    """
+
+    def __init__(self, columns, categories, drop_first):
+        self.columns = list(columns)
+        self.categories = categories
+        self.drop_first = drop_first
+        self.feature_names = []
+        for column in self.columns:
+            if column in categories:
+                levels = categories[column][1 if drop_first[column] else 0 :]
+                self.feature_names += ["{}[{}]".format(column, level) for level in levels]
+            else:
+                self.feature_names.append(column)
+
+    def __repr__(self):
+        return "Encoding of {} columns ({} categorical) into {} features".format(
+            len(self.columns), len(self.categories), len(self.feature_names)
+        )
+
+    @classmethod
+    def from_dataframe(cls, dataframe, columns, fit_intercept=True):
+        """
+        Learns the encoding of the given columns of a DataFrame
+
+        Arguments:
+        dataframe: Pandas DataFrame
+        columns: List of the names of the feature columns
+        fit_intercept: Boolean, whether the model fits an intercept
+        """
+        from pandas import Categorical
+        from pandas.api.types import is_numeric_dtype
+
+        categories = {}
+        drop_first = {}
+        for column in columns:
+            series = dataframe[column]
+            if is_numeric_dtype(series):
+                continue
+            if hasattr(series, "cat"):
+                categories[column] = series.cat.categories
+            else:
+                categories[column] = Categorical(series).categories
+            drop_first[column] = fit_intercept or len(drop_first) > 0
+        return cls(columns, categories, drop_first)
+
+    def transform(self, dataframe):
+        """
+        Returns the design matrix of a DataFrame holding the feature columns:
+        a float64 array (a view of the DataFrame's data where its layout
+        allows, no copy) if all are numerical, else a sparse CSR matrix
+        """
+        if not self.categories:
+            return dataframe[self.columns].to_numpy(dtype=np.float64, copy=False)
+
+        import scipy.sparse as sp
+
+        n = len(dataframe)
+        blocks = []
+        for column in self.columns:
+            series = dataframe[column]
+            if column not in self.categories:
+                values = series.to_numpy(dtype=np.float64, copy=False)
+                blocks.append(sp.csc_matrix(values.reshape(-1, 1)))
+                continue
+            offset = 1 if self.drop_first[column] else 0
+            codes = self._codes(series, self.categories[column])
+            # missing and unseen values take the reference level (code 0):
+            # no column if it is dropped, else the reference level's column
+            codes = np.where(codes < 0, 0, codes) - offset
+            rows = np.flatnonzero(codes >= 0)
+            width = len(self.categories[column]) - offset
+            blocks.append(
+                sp.csc_matrix(
+                    (np.ones(len(rows)), (rows, codes[rows])), shape=(n, width)
+                )
+            )
+        return sp.hstack(blocks, format="csr")
+
+    @staticmethod
+    def _codes(series, levels):
+        """
+        Returns the index of each value of `series` among `levels` (-1 for
+        missing or unknown values), from the codes of a categorical series
+        when it has them instead of hashing every value
+        """
+        if hasattr(series, "cat"):
+            codes = series.cat.codes.to_numpy()
+            if series.cat.categories.equals(levels):
+                return codes.astype(np.int64)
+            mapping = np.append(levels.get_indexer(series.cat.categories), -1)
+            return mapping[codes]
+        return levels.get_indexer(series)
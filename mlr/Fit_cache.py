@@ -0,0 +1,299 @@
+import numpy as np
+from mlr.Solvers import solve_least_squares, row_blocks, InterceptFactorization
+from mlr.Sparse import is_sparse, column_means, dense_rows
+
+
+class Fit_cache:
+    """
+    Versioned cache of fitted statistics shared by the other mixins
+
+    The sufficient statistics of a fit (X^T X factorization, sigma^2, residual
+    sum of squares, etc.) are computed once by `fit` and stored against the
+    current version of the data. Assigning a new `features_`, `target_` or
+    `sample_weight_` bumps the version: every cached entry is dropped and the
+    model is no longer fitted (`is_fitted` is False, `fitted_` and `resid_`
+    are cleared) until `fit` is called on the new data, so that no metric
+    mixes the old fit with the new data, nor silently refits.
+
+    Note: in-place mutation of the arrays (e.g. `model.features_[0] = 1`)
+    cannot be detected. Re-assign the attribute (or call `ingest_data`/`fit`)
+    after modifying the data.
+    """
+
+    @property
+    def features_(self):
+        return self.__dict__.get("_features_")
+
+    @features_.setter
+    def features_(self, value):
+        self.__dict__["_features_"] = value
+        self._bump_data_version()
+
+    @property
+    def target_(self):
+        return self.__dict__.get("_target_")
+
+    @target_.setter
+    def target_(self, value):
+        self.__dict__["_target_"] = value
+        self._bump_data_version()
+
+    @property
+    def sample_weight_(self):
+        return self.__dict__.get("_sample_weight_")
+
+    @sample_weight_.setter
+    def sample_weight_(self, value):
+        self.__dict__["_sample_weight_"] = value
+        self._bump_data_version()
+
+    def _bump_data_version(self):
+        """Marks the data as changed, invalidating every cached statistic and the fit"""
+        self.__dict__["_data_version_"] = self.__dict__.get("_data_version_", 0) + 1
+        self.__dict__["is_fitted"] = False
+        self.__dict__["fitted_"] = None
+        self.__dict__["resid_"] = None
+
+    def _cache(self):
+        """Returns the cache dictionary for the current version of the data"""
+        version = self.__dict__.get("_data_version_", 0)
+        cache = self.__dict__.get("_cache_")
+        if cache is None or cache["version"] != version:
+            cache = {"version": version}
+            self.__dict__["_cache_"] = cache
+        return cache
+
+    def _cached(self, key, compute):
+        """
+        Returns the cached entry for `key`, computing it with `compute()` if absent
+
+        Arguments:
+        key: Name of the cached entry
+        compute: Callable with no arguments producing the entry
+        """
+        cache = self._cache()
+        if key not in cache:
+            cache[key] = compute()
+        return cache[key]
+
+    def _set_fit_stats(self, stats):
+        """Stores the sufficient statistics of a fit for the current data version"""
+        self._cache()["stats"] = stats
+
+    def _fit_stats(self):
+        """
+        Returns the sufficient statistics of the fit for the current data,
+        solving the problem on `features_` and `target_` on first access
+        """
+        return self._cached("stats", self._compute_fit_stats)
+
+    def _compute_fit_stats(self):
+        """
+        Solves the least squares problem on `features_` and `target_`
+        and returns its sufficient statistics, with the fitted values
+        and residuals (under the keys 'fitted' and 'resid')
+
+        The intercept is handled by centering on the column means, so no
+        copy of X with a bias column is made (nor of a sparse X densified).
+        With `sample_weight_`, the means, sums of squares and the solve are
+        weighted (weighted least squares), still without copying X.
+        """
+        if self.features_ is None:
+            return self._solve_sufficient_stats(self.stream_stats_)
+        X = self.features_
+        y = self.target_
+        w = self.sample_weight_
+        n, p = X.shape
+        # the intercept entry of X^T W X is the total weight
+        total = n if w is None else np.sum(w)
+        if w is None:
+            y_mean = np.mean(y, axis=0)
+        else:
+            y_mean = np.tensordot(w, y, axes=1) / total
+        if self.fit_intercept_:
+            x_mean = column_means(X, w)
+            beta, centered, solver, n_iter = self._solve(X, y, x_mean, y_mean)
+            intercept = y_mean - np.dot(x_mean, beta)
+            coef = np.concatenate([np.asarray(intercept)[None], beta])
+            factor = None  # iterative solvers do not factorize X^T X
+            if centered is not None:
+                factor = InterceptFactorization(centered, total, x_mean)
+        else:
+            coef, factor, solver, n_iter = self._solve(X, y)
+        yc = y - y_mean
+        sst = np.sum(_weighted(yc, w) * yc, axis=0)
+        stats = self._make_fit_stats(
+            n, p, coef, factor, solver, None, sst, y_mean, total
+        )
+        stats["n_iter"] = n_iter
+
+        # exact residual sum of squares from the residuals themselves
+        fitted, resid = self._fitted_resid(stats["coef"])
+        stats["fitted"] = fitted
+        stats["resid"] = resid
+        stats["sse"] = np.sum(_weighted(resid, w) * resid, axis=0)
+        stats["sigma2"] = per_dof(stats["sse"], stats["dfe"])
+        return stats
+
+    def _solve(self, X, y, x_mean=None, y_mean=None):
+        """
+        Solves the least squares problem with the solver and the iterative
+        solver options (tol, max_iter, callback) of the model
+
+        Returns:
+        A tuple (coef, factorization, solver, n_iter) where n_iter is the
+        number of iterations of an iterative solver (the largest over the
+        targets), or None
+        """
+        iterations = []
+        callback = getattr(self, "callback", None)
+
+        def record(iteration, coef, residual_norm):
+            iterations.append(iteration)
+            if callback is not None:
+                callback(iteration, coef, residual_norm)
+
+        coef, factor, solver = solve_least_squares(
+            X,
+            y,
+            solver=self.solver,
+            x_mean=x_mean,
+            y_mean=y_mean,
+            tol=getattr(self, "tol", None),
+            max_iter=getattr(self, "max_iter", None),
+            callback=record,
+            weights=self.sample_weight_,
+        )
+        return coef, factor, solver, max(iterations) if iterations else None
+
+    def _fitted_resid(self, coef):
+        """
+        Computes the fitted values and residuals of `features_` by row blocks,
+        writing into preallocated arrays (no full-size temporaries)
+
+        Arguments:
+        coef: Fitted coefficients (intercept first, if any)
+        """
+        X = self.features_
+        y = self.target_
+        if self.fit_intercept_:
+            intercept, coef = coef[0], coef[1:]
+        else:
+            intercept = 0
+        n = X.shape[0]
+        if is_sparse(X):
+            # sparse product, without densifying blocks of X
+            fitted = X @ coef + intercept
+            return fitted, y - fitted
+        fitted = np.empty((n,) + y.shape[1:])
+        resid = np.empty((n,) + y.shape[1:])
+        for start, stop in row_blocks(n, X.shape[1], X.dtype.itemsize):
+            block = fitted[start:stop]
+            np.dot(np.asarray(X[start:stop], dtype=np.float64), coef, out=block)
+            block += intercept
+            np.subtract(y[start:stop], block, out=resid[start:stop])
+        return fitted, resid
+
+    def _make_fit_stats(
+        self, n, p, coef, factor, solver, sse, sst, y_mean, total_weight=None
+    ):
+        """
+        Assembles the statistics dictionary stored in the cache
+
+        Arguments:
+        n: Number of observations
+        p: Number of features
+        coef: Fitted coefficients (intercept first, if any)
+        factor: Factorization of the Gram matrix of the design (with the
+                intercept column, if any)
+        solver: Name of the solver used
+        sse: Residual sum of squares
+        sst: Total sum of squares around the mean of the target
+        y_mean: Mean of the target
+        total_weight: Sum of the sample weights (n if unweighted)
+
+        The number of parameters `k` is the numerical rank of the design
+        (intercept included), not the number of coefficients: a rank
+        deficient design solved by SVD (minimum-norm coefficients) has the
+        degrees of freedom of its rank, as in statsmodels
+        """
+        k = len(coef) if factor is None else factor.rank
+        dfe = n - k
+        return {
+            "n": n,
+            "total_weight": n if total_weight is None else total_weight,
+            "k": k,
+            "p": p,
+            "dfe": dfe,
+            "dft": n - 1,
+            "coef": coef,
+            "factor": factor,
+            "solver": solver,
+            "sse": sse,
+            "sst": sst,
+            "y_mean": y_mean,
+            "sigma2": None if sse is None else per_dof(sse, dfe),
+        }
+
+    def _hat_diag(self):
+        """
+        Returns the diagonal of the hat matrix (leverage of each observation)
+        Computed once on request and cached, by row blocks from the factorization
+        of the fit, without forming the n x n hat matrix (that of W^1/2 X for
+        a weighted fit)
+        """
+
+        def compute():
+            X = self.features_
+            factor = self._fit_stats()["factor"]
+            n = X.shape[0]
+            hat = np.empty(n)
+            for start, stop in row_blocks(n, X.shape[1], X.dtype.itemsize):
+                hat[start:stop] = factor.row_leverage(dense_rows(X, start, stop))
+            if self.sample_weight_ is not None:
+                hat *= self.sample_weight_
+            return hat
+
+        return self._cached("hat_diag", compute)
+
+    def _ols(self):
+        """
+        Returns the statsmodels OLS (WLS, if weighted) results for the current
+        data, for the statsmodels plots. Fitted at most once per data version.
+        A sparse design is densified, as statsmodels needs a dense one
+        """
+        if self.features_ is None:
+            print("The raw data is needed: the model was fitted from a stream!")
+            return None
+
+        def compute():
+            import statsmodels.api as sm
+
+            X = self.features_
+            if is_sparse(X):
+                X = X.toarray()
+            if self.fit_intercept_:
+                X = sm.add_constant(X)
+            if self.sample_weight_ is not None:
+                return sm.WLS(self.target_, X, weights=self.sample_weight_).fit()
+            return sm.OLS(self.target_, X).fit()
+
+        return self._cached("ols", compute)
+
+
+def per_dof(value, dof):
+    """
+    Returns value / dof, or NaN (without a warning) if there are no degrees
+    of freedom left, e.g. sigma^2 of a fit with no more observations than
+    parameters
+    """
+    if dof <= 0:
+        return np.full(np.shape(value), np.nan)[()]
+    return value / dof
+
+
+def _weighted(values, weights):
+    """Returns `values` with its rows multiplied by `weights` (itself if None)"""
+    if weights is None:
+        return values
+    return values * weights.reshape((-1,) + (1,) * (values.ndim - 1))
@@ -0,0 +1,309 @@
+import numpy as np
+from mlr.Solvers import row_blocks
+from mlr.Parallel import SharedArray, attach_shared, balanced_shards, effective_n_jobs
+
+
+class GroupedModels:
+    """
+    Collection of linear regressions fitted per group of a DataFrame
+
+    All the per-group results are stored as contiguous arrays, one row per group,
+    in the order of `groups`:
+
+    groups: Group keys (a pandas Index)
+    counts: Number of observations of each group
+    coef: Coefficients, shape (num_groups, num_features)
+    intercept: Intercepts, shape (num_groups,)
+    std_err: Standard errors, shape (num_groups, num_features + 1), intercept
+             first (no intercept column if the intercept is not fitted)
+    sse: Sum of squared errors
+    sst: Total sum of squares
+    r_squared: R^2 of each group
+    dfe: Degrees of freedom of the errors
+
+    Groups with fewer observations than coefficients, or with collinear
+    features, get the minimum-norm solution and NaN standard errors.
+    """
+
+    def __init__(self, groups, counts, feature_names, coef, intercept, std_err, sse, sst, dfe):
+        self.groups = groups
+        self.counts = counts
+        self.feature_names = feature_names
+        self.coef = coef
+        self.intercept = intercept
+        self.std_err = std_err
+        self.sse = sse
+        self.sst = sst
+        self.dfe = dfe
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.r_squared = 1 - sse / sst
+
+    def __repr__(self):
+        return "Linear regressions of {} groups on {} features".format(
+            len(self.groups), len(self.feature_names)
+        )
+
+    def __len__(self):
+        return len(self.groups)
+
+    def predict(self, X, keys):
+        """
+        Output model predictions, each row with the model of its group
+
+        Arguments:
+        X: 2D numpy array of features
+        keys: Group key of each row (array-like of the same length as X)
+        """
+        index = self.groups.get_indexer(keys)
+        assert np.all(index >= 0), "Some keys are not among the fitted groups"
+        return np.einsum("ij,ij->i", X, self.coef[index]) + self.intercept[index]
+
+    def to_dataframe(self):
+        """Returns the per-group coefficients, R^2 and counts as a Pandas DataFrame"""
+        from pandas import DataFrame
+
+        df = DataFrame(self.coef, index=self.groups, columns=self.feature_names)
+        df.insert(0, "intercept", self.intercept)
+        df["r^2"] = self.r_squared
+        df["count"] = self.counts
+        return df
+
+
+def _group_sums(values, num_columns, starts, group_of_row):
+    """
+    Sums the rows of `values` (sorted by group) within each group, by row
+    blocks so that per-row products like outer products never exist for all
+    rows at once
+
+    Arguments:
+    values: Callable (start, stop) -> per-row array for those rows
+    num_columns: Number of values per row (for the block size)
+    starts: Index of the first row of each group
+    group_of_row: Group number of each (sorted) row
+    """
+    n = len(group_of_row)
+    total = None
+    for start, stop in row_blocks(n, num_columns):
+        block = values(start, stop)
+        # offsets of the group boundaries within the block, starting at 0
+        inner = starts[(starts > start) & (starts < stop)] - start
+        offsets = np.r_[0, inner]
+        sums = np.add.reduceat(block, offsets, axis=0)
+        if total is None:
+            total = np.zeros((len(starts),) + block.shape[1:])
+        # each group appears at most once per block: no duplicate indices
+        total[group_of_row[start + offsets]] += sums
+    return total
+
+
+def fit_grouped(dataframe, X, y, by, fit_intercept=True, n_jobs=1):
+    """
+    Fits one linear regression per group of a DataFrame, vectorized across groups
+
+    The data is sorted by group once; the per-group cross-products are
+    summed with NumPy segment reductions and all the groups are solved with
+    one stacked (batched) matrix inversion, so the cost is that of a few
+    passes over the data instead of one Python-level fit per group.
+
+    Arguments:
+    dataframe: Pandas DataFrame
+    X: A list of columns of the dataframe acting as features. Must be only numerical.
+    y: Name of the column of the dataframe acting as the target
+    by: Name (or list of names) of the column(s) defining the groups
+    fit_intercept: Boolean, whether an intercept term will be included in the fits
+    n_jobs: Number of worker processes (-1 for all the CPUs). With more than
+            one, the groups are split in shards of about the same number of
+            rows, and the sorted data is placed in shared memory that the
+            workers map instead of receiving pickled copies.
+
+    Returns:
+    A GroupedModels object
+    """
+    assert (
+        type(X) == list
+    ), "X must be a list of the names of the numerical feature/predictor columns"
+    assert type(y) == str, "y must be a string - name of the column you want as target"
+
+    grouper = dataframe.groupby(by, sort=True)
+    sizes = grouper.size()
+    codes = grouper.ngroup().to_numpy()
+    # sort once, stable so the row order is kept within groups
+    order = np.argsort(codes, kind="stable")
+    order = order[codes[order] >= 0]  # rows with missing group keys
+    counts = sizes.to_numpy()
+
+    X_values = dataframe[X].to_numpy(dtype=np.float64)
+    y_values = dataframe[y].to_numpy(dtype=np.float64)
+    n_jobs = effective_n_jobs(n_jobs)
+    shards = balanced_shards(counts, n_jobs) if n_jobs > 1 else []
+
+    if len(shards) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with SharedArray((len(order), len(X))) as Xs, SharedArray(len(order)) as ys:
+            # the sorted copy is written straight into shared memory
+            np.take(X_values, order, axis=0, out=Xs.array)
+            np.take(y_values, order, out=ys.array)
+            row_ends = np.cumsum(counts)
+            with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+                futures = [
+                    executor.submit(
+                        _fit_shard,
+                        Xs.handle,
+                        ys.handle,
+                        int(row_ends[first] - counts[first]),
+                        int(row_ends[last - 1]),
+                        counts[first:last],
+                        fit_intercept,
+                    )
+                    for first, last in shards
+                ]
+                results = [future.result() for future in futures]
+        results = [np.concatenate(parts) for parts in zip(*results)]
+    else:
+        results = _fit_sorted_groups(
+            X_values[order], y_values[order], counts, fit_intercept
+        )
+
+    return GroupedModels(sizes.index, counts, list(X), *results)
+
+
+def _fit_shard(X_handle, y_handle, row_start, row_stop, counts, fit_intercept):
+    """
+    Worker process: fits the groups of rows [row_start, row_stop) of the
+    sorted data held in shared memory. The rows are centered in place,
+    which is safe as the shards do not overlap.
+    """
+    X_shm, Xs = attach_shared(X_handle)
+    y_shm, ys = attach_shared(y_handle)
+    try:
+        return _fit_sorted_groups(
+            Xs[row_start:row_stop], ys[row_start:row_stop], counts, fit_intercept
+        )
+    finally:
+        del Xs, ys
+        X_shm.close()
+        y_shm.close()
+
+
+def _fit_sorted_groups(Xs, ys, counts, fit_intercept):
+    """
+    Fits the regressions of consecutive groups of rows, sorted by group
+
+    Arguments:
+    Xs: 2D numpy array of the features sorted by group (centered in place)
+    ys: 1D numpy array of the target sorted by group
+    counts: Number of rows of each group
+
+    Returns:
+    A tuple (coef, intercept, std_err, sse, sst, dfe) of per-group arrays
+    """
+    num_groups = len(counts)
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+    group_of_row = np.repeat(np.arange(num_groups), counts)
+    p = Xs.shape[1]
+
+    # per-group means, and the data centered within its group
+    if fit_intercept:
+        x_mean = np.add.reduceat(Xs, starts, axis=0) / counts[:, None]
+        y_mean = np.add.reduceat(ys, starts) / counts
+        Xs -= x_mean[group_of_row]
+        ys_c = ys - y_mean[group_of_row]
+    else:
+        ys_c = ys
+
+    def outer(start, stop):
+        Xb = Xs[start:stop]
+        return Xb[:, :, None] * Xb[:, None, :]
+
+    xtx = _group_sums(outer, p * p, starts, group_of_row)
+
+    def cross(start, stop):
+        return Xs[start:stop] * ys_c[start:stop, None]
+
+    xty = _group_sums(cross, p, starts, group_of_row)
+
+    k = p + 1 if fit_intercept else p
+    coef, xtx_inv, solvable = solve_stacked(xtx, xty, counts, k)
+
+    resid = ys_c - np.einsum("ij,ij->i", Xs, coef[group_of_row])
+    sse = np.add.reduceat(resid * resid, starts)
+    if fit_intercept:
+        intercept = y_mean - np.einsum("gi,gi->g", x_mean, coef)
+        sst = np.add.reduceat(ys_c * ys_c, starts)
+    else:
+        intercept = np.zeros(num_groups)
+        ys_mean = np.add.reduceat(ys, starts) / counts
+        sst = np.add.reduceat((ys - ys_mean[group_of_row]) ** 2, starts)
+
+    dfe = counts - k
+    std_err = stacked_std_err(
+        xtx_inv, sse, dfe, solvable, counts, x_mean if fit_intercept else None
+    )
+    return coef, intercept, std_err, sse, sst, dfe
+
+
+def solve_stacked(xtx, xty, counts, k):
+    """
+    Solves a stack of normal equations with one batched Cholesky factorization
+
+    The coefficients come from batched triangular solves with the Cholesky
+    factors, as in the Cholesky path of `fit`, not from an explicit inverse;
+    the inverses (for the standard errors) are formed from the factors.
+
+    Arguments:
+    xtx: Stacked Gram matrices, shape (num_models, p, p)
+    xty: Stacked right-hand sides, shape (num_models, p)
+    counts: Number of observations of each model
+    k: Number of coefficients of each model (p, plus one with an intercept)
+
+    Returns:
+    A tuple (coef, xtx_inv, solvable). Models with fewer observations than
+    coefficients or with collinear features get the minimum-norm (lstsq)
+    solution and the pseudo-inverse, and are flagged as not solvable.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cond = np.linalg.cond(xtx)
+    solvable = (counts >= k) & (cond < 1 / np.finfo(float).eps)
+    coef = np.empty_like(xty)
+    xtx_inv = np.empty_like(xtx)
+    if np.any(solvable):
+        A = xtx[solvable]
+        b = xty[solvable][..., None]
+        identity = np.broadcast_to(np.eye(A.shape[1]), A.shape)
+        try:
+            L = np.linalg.cholesky(A)
+            L_inv = np.linalg.solve(L, identity)
+            coef[solvable] = np.linalg.solve(
+                np.swapaxes(L, 1, 2), np.linalg.solve(L, b)
+            )[..., 0]
+            xtx_inv[solvable] = np.swapaxes(L_inv, 1, 2) @ L_inv
+        except np.linalg.LinAlgError:
+            # not positive definite in rounding: LU with partial pivoting
+            coef[solvable] = np.linalg.solve(A, b)[..., 0]
+            xtx_inv[solvable] = np.linalg.solve(A, identity)
+    for g in np.flatnonzero(~solvable):
+        coef[g] = np.linalg.lstsq(xtx[g], xty[g], rcond=None)[0]
+        xtx_inv[g] = np.linalg.pinv(xtx[g])
+    return coef, xtx_inv, solvable
+
+
+def stacked_std_err(xtx_inv, sse, dfe, solvable, counts, x_mean=None):
+    """
+    Standard errors of a stack of models, from the diagonal of the
+    (intercept-augmented) inverse Gram matrices. NaN for the models that
+    are not solvable or have no degrees of freedom left
+
+    Arguments:
+    x_mean: Feature means of each model if an intercept was fitted (its
+            standard error then comes first), None otherwise
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma2 = np.where(solvable & (dfe > 0), sse / dfe, np.nan)
+    var_coef = np.diagonal(xtx_inv, axis1=1, axis2=2)
+    if x_mean is not None:
+        var_intercept = 1 / counts + np.einsum("gi,gij,gj->g", x_mean, xtx_inv, x_mean)
+        var = np.column_stack([var_intercept, var_coef])
+    else:
+        var = var_coef
+    return np.sqrt(var * sigma2[:, None])
@@ -1,6 +1,5 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import statsmodels.api as sm
+from mlr.Fit_cache import per_dof
 
 class Inference:
     """
@@ -10,6 +9,16 @@ class Inference:
         t-test statistics
         F-statistics and p-value of F-test
         Confidence interval
+
+    All are computed from the coefficients, residuals and X^T X factorization
+    kept by the fit (intercept first, if fitted), with SciPy distributions.
+
+    For a multi-target fit (2D target of shape (n, k)) every method returns
+    arrays with one column per target.
+
+    The degrees of freedom are those of the numerical rank of the design. A
+    fit with no more observations than parameters has none left for the
+    errors: sigma^2 is undefined and these methods return NaN.
     """
 
     def __init__():
@@ -22,8 +31,7 @@ class Inference:
         if not self.is_fitted:
             print("Model not fitted yet!")
             return None
-        lm = sm.OLS(self.target_, sm.add_constant(self.features_)).fit()
-        return lm.bse
+        return np.sqrt(self._cov_diag())
 
     def pvalues(self):
         """
@@ -32,8 +40,9 @@ class Inference:
         if not self.is_fitted:
             print("Model not fitted yet!")
             return None
-        lm = sm.OLS(self.target_, sm.add_constant(self.features_)).fit()
-        return lm.pvalues
+        from scipy.stats import t
+
+        return 2 * t.sf(np.abs(self._tvalues()), self._fit_stats()["dfe"])
 
     def tvalues(self):
         """
@@ -42,8 +51,7 @@ class Inference:
         if not self.is_fitted:
             print("Model not fitted yet!")
             return None
-        lm = sm.OLS(self.target_, sm.add_constant(self.features_)).fit()
-        return lm.tvalues
+        return self._tvalues()
 
     def ftest(self):
         """
@@ -52,8 +60,20 @@ class Inference:
         if not self.is_fitted:
             print("Model not fitted yet!")
             return None
-        lm = sm.OLS(self.target_, sm.add_constant(self.features_)).fit()
-        return (lm.fvalue, lm.f_pvalue)
+        from scipy.stats import f
+
+        stats = self._fit_stats()
+        if self.fit_intercept_:
+            df_model = stats["k"] - 1
+            explained = stats["sst"] - stats["sse"]
+        else:
+            # without intercept, the model is compared with y = 0
+            # (sum(w y^2) = SST + sum(w) mean(y)^2, with weights)
+            df_model = stats["k"]
+            total = stats["total_weight"]
+            explained = stats["sst"] + total * stats["y_mean"] ** 2 - stats["sse"]
+        fvalue = per_dof(explained, df_model) / stats["sigma2"]
+        return (fvalue, f.sf(fvalue, df_model, stats["dfe"]))
     
     def conf_int(self,cols=None,alpha=0.05):
         """
@@ -62,6 +82,9 @@ class Inference:
         Arguments:
         cols: List of the columns (features) for which confidence interval is sought
         alpha: Confidence level. Default is 0.05
+
+        Returns an array of (lower, upper) bounds per coefficient, of shape
+        (num_coefficients, 2), or (num_coefficients, 2, k) for k targets
         """
         
         assert alpha>0 and alpha < 1, "Confidence level either zero, negative, or greater than 1"
@@ -69,6 +92,28 @@ class Inference:
         if not self.is_fitted:
             print("Model not fitted yet!")
             return None
-        lm = sm.OLS(self.target_, sm.add_constant(self.features_)).fit()
-        return (lm.conf_int(cols=cols,alpha=alpha))
-        
\ No newline at end of file
+        from scipy.stats import t
+
+        stats = self._fit_stats()
+        q = t.ppf(1 - alpha / 2, stats["dfe"])
+        params = stats["coef"]
+        se = np.sqrt(self._cov_diag())
+        intervals = np.stack([params - q * se, params + q * se], axis=1)
+        if cols is not None:
+            intervals = intervals[cols]
+        return intervals
+
+    def _cov_diag(self):
+        """
+        Diagonal of the covariance matrix of the coefficients, sigma^2 diag((X^T X)^-1),
+        from the factorization kept by the fit: O(p^3) at most, independent of n.
+        NaN if the model was fitted by an iterative solver, which keeps none
+        """
+        stats = self._fit_stats()
+        if stats["factor"] is None:
+            return np.full(np.shape(stats["coef"]), np.nan)
+        return np.multiply.outer(np.diag(stats["factor"].inverse()), stats["sigma2"])
+
+    def _tvalues(self):
+        """t-test statistics of the coefficients"""
+        return self._fit_stats()["coef"] / np.sqrt(self._cov_diag())
@@ -0,0 +1,284 @@
+import numpy as np
+from mlr.Solvers import BLOCK_BYTES, row_blocks
+from mlr.Sparse import is_sparse
+
+# Maximum number of rows of a minibatch of the 'sgd' solver
+SGD_BATCH_ROWS = 256
+
+
+class DesignOperator:
+    """
+    Products with a design matrix X (dense, memory-mapped or sparse),
+    optionally centered on the column means `x_mean`, with its columns
+    scaled by `column_scale` and its rows by `row_scale` (the square roots
+    of the observation weights), without copying X
+
+    The iterative solvers only access the data through `matvec` (X v) and
+    `rmatvec` (X^T u), or by row blocks for the minibatches of SGD.
+    """
+
+    def __init__(self, X, x_mean=None, column_scale=None, row_scale=None):
+        self.X = X
+        self.x_mean = x_mean
+        self.column_scale = column_scale
+        self.row_scale = row_scale
+        self.shape = X.shape
+
+    def matvec(self, v):
+        """Returns X v"""
+        if self.column_scale is not None:
+            v = self.column_scale * v
+        out = np.asarray(self.X @ v, dtype=np.float64)
+        if self.x_mean is not None:
+            out -= np.dot(self.x_mean, v)
+        if self.row_scale is not None:
+            out *= self.row_scale
+        return out
+
+    def rmatvec(self, u):
+        """Returns X^T u"""
+        if self.row_scale is not None:
+            u = self.row_scale * u
+        out = np.asarray(self.X.T @ u, dtype=np.float64)
+        if self.x_mean is not None:
+            out -= self.x_mean * np.sum(u)
+        if self.column_scale is not None:
+            out *= self.column_scale
+        return out
+
+    def rows(self, start, stop):
+        """Returns the operator of rows [start, stop) (a view of X, not a copy)"""
+        row_scale = None if self.row_scale is None else self.row_scale[start:stop]
+        return DesignOperator(
+            self.X[start:stop], self.x_mean, self.column_scale, row_scale
+        )
+
+    def largest_eigenvalue(self, num_iter=20):
+        """Estimates the largest eigenvalue of X^T X by power iteration"""
+        v = np.random.default_rng(0).standard_normal(self.shape[1])
+        value = 0.0
+        for _ in range(num_iter):
+            w = self.rmatvec(self.matvec(v))
+            value = np.linalg.norm(w)
+            if value == 0:
+                break
+            v = w / value
+        return value
+
+    def column_sq_norms(self):
+        """
+        Returns the squared norms of the columns (centered and row scaled,
+        not column scaled), read by row blocks
+        """
+        X = self.X
+        weights = None if self.row_scale is None else self.row_scale ** 2
+        if is_sparse(X):
+            squares = X.multiply(X)
+            if weights is None:
+                norms = np.asarray(squares.sum(axis=0)).ravel()
+            else:
+                norms = np.asarray(squares.T @ weights).ravel()
+        else:
+            norms = np.zeros(X.shape[1])
+            for start, stop in row_blocks(X.shape[0], X.shape[1], X.dtype.itemsize):
+                block = np.asarray(X[start:stop], dtype=np.float64)
+                if weights is None:
+                    norms += np.einsum("ij,ij->j", block, block)
+                else:
+                    norms += np.einsum("ij,ij,i->j", block, block, weights[start:stop])
+        if self.x_mean is not None:
+            total = X.shape[0] if weights is None else np.sum(weights)
+            norms -= total * self.x_mean ** 2
+        return np.maximum(norms, 0)
+
+    def jacobi_scaling(self):
+        """
+        Returns the inverse column norms (1 for null columns): scaling the
+        columns by them is the Jacobi (diagonal) preconditioning of X^T X
+        """
+        norms = np.sqrt(self.column_sq_norms())
+        scale = np.ones_like(norms)
+        nonzero = norms > 0
+        scale[nonzero] = 1 / norms[nonzero]
+        return scale
+
+
+def conjugate_gradient(A, b, tol, max_iter, callback=None):
+    """
+    Solves min ||A x - b|| by conjugate gradient on the normal equations
+    A^T A x = A^T b (CGLS)
+
+    A^T A is never formed: each iteration costs one product with A and one
+    with A^T, and the memory is O(n + p).
+
+    Arguments:
+    A: DesignOperator
+    b: 1D numpy array
+    tol: Stop when ||A^T r|| <= tol ||A^T b||
+    max_iter: Maximum number of iterations
+    callback: Called as callback(iteration, x, residual_norm) after every iteration
+
+    Returns:
+    A tuple (x, number of iterations)
+    """
+    x = np.zeros(A.shape[1])
+    r = np.array(b, dtype=np.float64)
+    s = A.rmatvec(r)
+    d = s.copy()
+    gamma = np.dot(s, s)
+    threshold = tol * np.sqrt(gamma)
+    iteration = 0
+    while iteration < max_iter and np.sqrt(gamma) > threshold:
+        iteration += 1
+        q = A.matvec(d)
+        alpha = gamma / np.dot(q, q)
+        x += alpha * d
+        r -= alpha * q
+        s = A.rmatvec(r)
+        gamma_new = np.dot(s, s)
+        d = s + (gamma_new / gamma) * d
+        gamma = gamma_new
+        if callback is not None:
+            callback(iteration, x, np.linalg.norm(r))
+    return x, iteration
+
+
+def lsqr(A, b, tol, max_iter, callback=None):
+    """
+    Solves min ||A x - b|| with LSQR (Paige and Saunders), by Golub-Kahan
+    bidiagonalization of A: equivalent to CG on the normal equations in
+    exact arithmetic, more stable in floating point
+
+    Arguments:
+    A: DesignOperator
+    b: 1D numpy array
+    tol: Stop when ||r|| <= tol ||b||, or ||A^T r|| <= tol ||A|| ||r||
+         (||A|| estimated along the iterations)
+    max_iter: Maximum number of iterations
+    callback: Called as callback(iteration, x, residual_norm) after every iteration
+
+    Returns:
+    A tuple (x, number of iterations)
+    """
+    x = np.zeros(A.shape[1])
+    u = np.array(b, dtype=np.float64)
+    beta = np.linalg.norm(u)
+    if beta == 0:
+        return x, 0
+    u /= beta
+    v = A.rmatvec(u)
+    alpha = np.linalg.norm(v)
+    if alpha == 0:
+        return x, 0
+    v /= alpha
+    w = v.copy()
+    phi_bar, rho_bar = beta, alpha
+    b_norm, a_norm2 = beta, 0.0
+    iteration = 0
+    while iteration < max_iter:
+        iteration += 1
+        # bidiagonalization step
+        u = A.matvec(v) - alpha * u
+        beta = np.linalg.norm(u)
+        a_norm2 += alpha * alpha + beta * beta
+        if beta > 0:
+            u /= beta
+            v = A.rmatvec(u) - beta * v
+            alpha = np.linalg.norm(v)
+            if alpha > 0:
+                v /= alpha
+        # plane rotation eliminating the subdiagonal
+        rho = np.hypot(rho_bar, beta)
+        c, s = rho_bar / rho, beta / rho
+        theta = s * alpha
+        rho_bar = -c * alpha
+        phi = c * phi_bar
+        phi_bar = s * phi_bar
+        x += (phi / rho) * w
+        w = v - (theta / rho) * w
+        # phi_bar is ||r|| and phi_bar * alpha * |c| is ||A^T r||
+        if callback is not None:
+            callback(iteration, x, phi_bar)
+        if phi_bar <= tol * b_norm or alpha * abs(c) <= tol * np.sqrt(a_norm2):
+            break
+    return x, iteration
+
+
+def minibatch_sgd(A, b, tol, max_iter, callback=None, random_state=0):
+    """
+    Solves min ||A x - b|| approximately by minibatch stochastic gradient
+    descent, reading A by row blocks: one pass over the data per epoch and
+    never more than one minibatch in memory (A may be memory-mapped)
+
+    Minibatches are slices of the rows of A (sparse ones stay sparse),
+    visited in a random order every epoch. The step decays as
+    step0 / sqrt(epoch), step0 being set from the largest eigenvalue of the
+    Gram matrix of the first minibatch, and the solution is the average of
+    the iterates since the last epoch that is a power of two (suffix
+    averaging, in O(p) memory), which removes most of the gradient noise.
+    Along its pass over the data, each epoch also accumulates the full
+    gradient A^T r at the average it started from: the stopping test is
+    exact and costs no extra pass. Expect a few significant digits at the
+    default tolerance: the solver is meant for data too large for the others.
+
+    Arguments:
+    A: DesignOperator
+    b: 1D numpy array
+    tol: Stop when ||A^T r|| <= tol ||A^T b|| at the average an epoch
+         started from, which is then returned
+    max_iter: Maximum number of epochs
+    callback: Called as callback(epoch, x, residual_norm) after every epoch,
+              with the average x the epoch started from and its residual norm
+    random_state: Seed of the order of the minibatches
+
+    Returns:
+    A tuple (x, number of epochs). x passed the gradient test only if the
+    number of epochs is below max_iter
+    """
+    n, p = A.shape
+    batch_rows = SGD_BATCH_ROWS
+    if not is_sparse(A.X):
+        # a block of a memory-mapped X is read in full by each product
+        batch_rows = min(batch_rows, max(1, BLOCK_BYTES // (8 * p)))
+    starts = np.arange(0, n, batch_rows)
+    rng = np.random.default_rng(random_state)
+
+    first = A.rows(0, min(batch_rows, n))
+    top = first.largest_eigenvalue() / first.shape[0]
+    step0 = 1 / max(top, np.finfo(float).tiny)
+
+    x = np.zeros(p)
+    average = x.copy()  # the average the epoch starts from
+    total = np.zeros(p)
+    count = 0
+    b_norm = None
+    epoch = 0
+    while epoch < max_iter:
+        epoch += 1
+        step = step0 / np.sqrt(epoch)
+        if epoch & (epoch - 1) == 0:
+            total[:] = 0
+            count = 0
+        gradient = np.zeros(p)
+        sse = 0.0
+        for start in rng.permutation(starts):
+            stop = min(start + batch_rows, n)
+            batch = A.rows(start, stop)
+            average_resid = batch.matvec(average) - b[start:stop]
+            gradient += batch.rmatvec(average_resid)
+            sse += np.dot(average_resid, average_resid)
+            resid = batch.matvec(x) - b[start:stop]
+            # divided by the nominal size, so that a shorter last minibatch
+            # does not weigh its rows more (which would bias the solution)
+            x -= (step / batch_rows) * batch.rmatvec(resid)
+            total += x
+            count += 1
+        if b_norm is None:
+            # the first epoch starts from zero, where the gradient is -A^T b
+            b_norm = np.linalg.norm(gradient)
+        if callback is not None:
+            callback(epoch, average, np.sqrt(sse))
+        if np.linalg.norm(gradient) <= tol * b_norm:
+            return average, epoch
+        average = total / count
+    return average, epoch
@@ -4,34 +4,97 @@ from mlr.Diagnostics_plots import Diagnostics_plots
 from mlr.Data_plots import Data_plots
 from mlr.Outliers import Outliers
 from mlr.Multicollinearity import Multicollinearity
+from mlr.Fit_cache import Fit_cache
+from mlr.Streaming import Streaming, load_array
+from mlr.Rolling import Rolling
+from mlr.Selection import Selection
+from mlr.Validation import Validation
+from mlr.Regularized import Regularized
+from mlr.Robust import Robust
+from mlr.Solvers import SOLVERS
+from mlr.Parallel import effective_n_jobs
+from mlr.Predictor import LinearPredictor, predict_linear
+from mlr.Sparse import is_sparse, as_compressed
+from mlr.Encoding import DataFrameEncoding, is_dataframe
 
+import time
 import numpy as np
-from pandas.api.types import is_numeric_dtype
 
 class MyLinearRegression(Metrics, Inference, 
                         Diagnostics_plots, Data_plots, 
-                        Outliers, Multicollinearity
+                        Outliers, Multicollinearity,
+                        Streaming, Rolling, Selection, Validation,
+                        Regularized, Robust, Fit_cache
                         ):
-    def __init__(self, fit_intercept=True):
+    def __init__(
+        self,
+        fit_intercept=True,
+        solver="auto",
+        read_only=False,
+        tol=None,
+        max_iter=None,
+        callback=None,
+    ):
+        """
+        Arguments:
+        fit_intercept: Boolean, whether an intercept term will be included in the fit
+        solver: Least squares solver, one of 'auto', 'cholesky', 'qr', 'svd', 'lstsq',
+                or the iterative 'cg', 'lsqr', 'lsmr', 'sgd' (for very wide or
+                huge data: X^T X is never formed).
+                'auto' picks one from the shape and condition number of the data
+        read_only: Boolean, scoring mode: `predict` does not store `predicted_`,
+                   so a fitted model can be shared by threads without a lock.
+                   Can also be switched on after fitting (`model.read_only = True`)
+        tol: Stopping tolerance of the iterative solvers (solver default if None)
+        max_iter: Maximum number of iterations (epochs for 'sgd') of the iterative solvers
+        callback: Function called by the iterative solvers after every iteration,
+                  as callback(iteration, coef, residual_norm)
+        """
+        assert solver in SOLVERS, "solver must be one of {}".format(SOLVERS)
         self.coef_ = None
         self.intercept_ = None
         self.fit_intercept_ = fit_intercept
+        self.solver = solver
+        self.read_only = read_only
+        self.tol = tol
+        self.max_iter = max_iter
+        self.callback = callback
         self.is_fitted = False
         self.is_ingested = False
         self.features_ = None
         self.target_ = None
+        self.sample_weight_ = None
+        self.stream_stats_ = None
+        self.feature_names_ = None
+        self.encoding_ = None
 
     def __repr__(self):
         return "I am a Linear Regression model!"
 
-    def ingest_data(self, X, y):
+    def ingest_data(self, X, y, dtype=np.float64, num_features=None, copy=False):
         """
        Ingests the given data
         
         Arguments:
-        X: 1D or 2D numpy array 
-        y: 1D numpy array
+        X: 1D or 2D numpy array, numpy memmap, scipy.sparse matrix (kept in
+           CSR or CSC format, never densified), or path to a .npy or raw binary file
+        y: 1D numpy array, numpy memmap, or path to a .npy or raw binary file.
+           A 2D array of shape (n, k) fits k targets at once.
+        dtype: Data type of the values in raw binary files
+        num_features: Number of columns of X, if it is a raw binary file
+        copy: Boolean. By default the arrays are referenced, not copied, and
+              must not be modified while the model uses them. Pass True to
+              keep a private copy instead.
+
+        Files are memory-mapped, not read: the fit then reads them in row blocks.
         """
+        X = load_array(X, dtype=dtype, num_features=num_features)
+        y = load_array(y, dtype=dtype)
+        if is_sparse(X):
+            X = as_compressed(X)
+        if copy:
+            X = X.copy() if is_sparse(X) else np.array(X)
+            y = np.array(y)
         # check if X is 1D or 2D array
         if len(X.shape) == 1:
             X = X.reshape(-1, 1)
@@ -39,41 +102,81 @@ class MyLinearRegression(Metrics, Inference,
         # features and data
         self.features_ = X
         self.target_ = y
+        self.stream_stats_ = None
+        self.feature_names_ = None
+        self.encoding_ = None
         self.is_ingested = True
 
-    def fit(self, X=None, y=None, fit_intercept_=True):
+    def fit(self, X=None, y=None, fit_intercept_=True, sample_weight=None):
         """
         Fit model coefficients.
         Arguments:
-        X: 1D or 2D numpy array 
-        y: 1D numpy array
+        X: 1D or 2D numpy array, numpy memmap, scipy.sparse matrix, or path to a .npy file
+        y: 1D numpy array, numpy memmap, or path to a .npy file.
+           A 2D array of shape (n, k) fits k targets with a single factorization
+           of X^T X; coef_ is then of shape (num_features, k) and intercept_ of shape (k,)
+        sample_weight: Optional 1D array of non-negative observation weights,
+                       for weighted least squares (kept in `sample_weight_`).
+                       X is not copied: its rows are scaled by sqrt(weight)
+                       block by block, or inside the products of the
+                       iterative solvers. SSE, SST, sigma^2, the standard
+                       errors and the leverage are those of the weighted fit
         """
 
-        if X != None:
+        if X is not None:
+            X = load_array(X)
+            if is_sparse(X):
+                X = as_compressed(X)
             if len(X.shape) == 1:
                 X = X.reshape(-1, 1)
             self.features_ = X
-        if y != None:
-            self.target_ = y
+            self.stream_stats_ = None
+            self.feature_names_ = None
+            self.encoding_ = None
+            self.is_ingested = True
+        if y is not None:
+            self.target_ = load_array(y)
+        if self.features_ is None or self.target_ is None:
+            # the statistics of a streamed (or updated) fit are left as they are
+            if getattr(self, "stream_stats_", None) is not None:
+                print("The raw data is needed: the model was fitted from a stream!")
+            else:
+                print("No data ingested yet!")
+            return None
+        if sample_weight is not None:
+            sample_weight = np.asarray(sample_weight, dtype=np.float64).ravel()
+            assert (
+                len(sample_weight) == self.target_.shape[0]
+            ), "sample_weight must have one weight per observation"
+            assert np.all(sample_weight >= 0), "sample_weight must be non-negative"
+        self.sample_weight_ = sample_weight
+
+        # solve the least squares problem and cache its sufficient statistics
+        start = time.perf_counter()
+        self.stream_stats_ = None
+        stats = self._compute_fit_stats()
+        self._set_fit_stats(stats)
+        self._set_fit_attributes()
+        self.fit_time_ = time.perf_counter() - start
 
+        # Predicted/fitted y and residuals, computed without temporaries
+        self.fitted_ = stats["fitted"]
+        self.resid_ = stats["resid"]
+
+    def _set_fit_attributes(self):
+        """Sets the coefficients and fit attributes from the cached fit statistics"""
+        stats = self._fit_stats()
         # degrees of freedom of population dependent variable variance
-        self.dft_ = self.features_.shape[0] - 1
+        self.dft_ = stats["dft"]
         # degrees of freedom of population error variance
-        self.dfe_ = self.features_.shape[0] - self.features_.shape[1] - 1
-
-        # add bias if fit_intercept is True
-        if self.fit_intercept_:
-            X_biased = np.c_[np.ones(self.features_.shape[0]), self.features_]
-        else:
-            X_biased = self.features_
-        # Assign target_ to a local variable y
-        y = self.target_
+        self.dfe_ = stats["dfe"]
 
-        # closed form solution
-        xTx = np.dot(X_biased.T, X_biased)
-        inverse_xTx = np.linalg.inv(xTx)
-        xTy = np.dot(X_biased.T, y)
-        coef = np.dot(inverse_xTx, xTy)
+        coef = stats["coef"]
+        self.solver_ = stats["solver"]
+        # iterations of an iterative solver (None for the direct ones)
+        self.n_iter_ = stats.get("n_iter")
+        factor = stats["factor"]
+        self.condition_number_ = None if factor is None else factor.condition_number()
 
         # set attributes
         if self.fit_intercept_:
@@ -83,98 +186,133 @@ class MyLinearRegression(Metrics, Inference,
             self.intercept_ = 0
             self.coef_ = coef
 
-        # Predicted/fitted y
-        self.fitted_ = np.dot(self.features_, self.coef_) + self.intercept_
-
-        # Residuals
-        residuals = self.target_ - self.fitted_
-        self.resid_ = residuals
-
         # Set is_fitted to True
         self.is_fitted = True
 
     
-    def fit_dataframe(self, X, y, dataframe, fit_intercept_= True):
+    def fit_dataframe(self, X, y, dataframe, fit_intercept_= True, sample_weight=None):
         """
         Fit model coefficients from a Pandas DataFrame.
         
         Arguments:
-        X: A list of columns of the dataframe acting as features. Must be only numerical.
-        y: Name of the column of the dataframe acting as the target
+        X: A list of columns of the dataframe acting as features. Numerical
+           columns are used as is; categorical ones (category, object or
+           string dtype) are one-hot encoded from their codes into a sparse
+           design (see DataFrameEncoding), kept in `encoding_` so that
+           `predict` accepts DataFrames with the same columns
+        y: Name of the column of the dataframe acting as the target,
+           or a list of names to fit several targets at once
         fit_intercept: Boolean, whether an intercept term will be included in the fit
+        sample_weight: Optional observation weights (or the name of the column
+                       holding them), as for `fit`
         """
-        
+        from pandas.api.types import is_numeric_dtype
+
         # Code to check type of X and y arguments
         assert (
             type(X) == list
-        ), "X must be a list of the names of the numerical feature/predictor columns"
+        ), "X must be a list of the names of the feature/predictor columns"
         assert (
-            type(y) == str
-        ), "y must be a string - name of the column you want as target"
+            type(y) == str or type(y) == list
+        ), "y must be a string - name of the column you want as target (or a list of them)"
         
-        # Code to check numeric data type
-        is_numeric = True
-        for feature in X:
-            if not is_numeric_dtype(dataframe[feature]):
-                is_numeric = False
-                break
-        if not is_numeric_dtype(dataframe[y]):
-                is_numeric = False
-        
-        if not is_numeric:
-            raise TypeError('Either one or more features or the target is not of numeric type')
-            return None
-            
-        self.features_ = np.array(dataframe[X])
-        self.target_ = np.array(dataframe[y])
+        # Code to check numeric data type of the target
+        targets = y if type(y) == list else [y]
+        for target in targets:
+            if not is_numeric_dtype(dataframe[target]):
+                raise TypeError('One or more targets is not of numeric type')
 
-        # degrees of freedom of population dependent variable variance
-        self.dft_ = self.features_.shape[0] - 1
-        # degrees of freedom of population error variance
-        self.dfe_ = self.features_.shape[0] - self.features_.shape[1] - 1
+        encoding = DataFrameEncoding.from_dataframe(dataframe, X, self.fit_intercept_)
+        # views of the numerical columns where the dataframe layout allows it, no copies
+        self.features_ = encoding.transform(dataframe)
+        self.target_ = dataframe[y].to_numpy()
+        self.stream_stats_ = None
+        self.feature_names_ = encoding.feature_names
+        self.encoding_ = encoding
+        self.is_ingested = True
 
-        # add bias if fit_intercept is True
-        if self.fit_intercept_:
-            X_biased = np.c_[np.ones(self.features_.shape[0]), self.features_]
-        else:
-            X_biased = self.features_
-        # Assign target_ to a local variable y
-        y = self.target_
+        if type(sample_weight) == str:
+            sample_weight = dataframe[sample_weight].to_numpy()
+        self.fit(sample_weight=sample_weight)
+
+    def predict(self, X, out=None, dtype=None, chunk_size=None):
+        """Output model prediction.
+        Arguments:
+        X: 1D or 2D numpy array (or memmap), scipy.sparse matrix, or Pandas
+           DataFrame holding the feature columns (encoded as in `fit_dataframe`)
+        out: Optional preallocated C-contiguous output array of shape (n,),
+             or (n, k) for k targets, which the predictions are written into.
+             `predicted_` is then not set (nor in read-only mode), so
+             concurrent calls do not interfere
+        dtype: Data type of the computation, e.g. np.float32 to score float32
+               data without up-casting it (by default, that of X and coef_
+               combined, or of `out`)
+        chunk_size: Number of rows evaluated at a time (by default, blocks of
+                    a few MB), so huge batches need no full-size temporaries
+        """
+        if is_dataframe(X):
+            encoding = getattr(self, "encoding_", None)
+            if encoding is None:
+                X = X.to_numpy()
+            else:
+                X = encoding.transform(X)
+        # check if X is 1D or 2D array
+        if len(X.shape) == 1:
+            X = X.reshape(-1, 1)
+        predicted = predict_linear(
+            X, self.coef_, self.intercept_, out=out, dtype=dtype, chunk_size=chunk_size
+        )
+        if out is None and not getattr(self, "read_only", False):
+            self.predicted_ = predicted
+        return predicted
 
-        # closed form solution
-        xTx = np.dot(X_biased.T, X_biased)
-        inverse_xTx = np.linalg.inv(xTx)
-        xTy = np.dot(X_biased.T, y)
-        coef = np.dot(inverse_xTx, xTy)
+    def predict_many(self, batches, n_threads=None, dtype=None):
+        """
+        Output model predictions for several batches, scored concurrently on
+        a thread pool (NumPy releases the GIL in the matrix products).
+        Nothing is stored on the model, whatever the read-only mode.
 
-        # set attributes
-        if self.fit_intercept_:
-            self.intercept_ = coef[0]
-            self.coef_ = coef[1:]
-        else:
-            self.intercept_ = 0
-            self.coef_ = coef
+        Arguments:
+        batches: List of 1D or 2D numpy arrays
+        n_threads: Number of threads (-1 or None for all the CPUs)
+        dtype: Data type of the computation, as for `predict`
+
+        Returns:
+        The list of the predictions of each batch, in the order of `batches`
+        """
+        from concurrent.futures import ThreadPoolExecutor
 
-        # Predicted/fitted y
-        self.fitted_ = np.dot(self.features_, self.coef_) + self.intercept_
+        if not self.is_fitted:
+            print("Model not fitted yet!")
+            return None
+        coef, intercept = self.coef_, self.intercept_
 
-        # Residuals
-        residuals = self.target_ - self.fitted_
-        self.resid_ = residuals
+        def score(X):
+            if len(X.shape) == 1:
+                X = X.reshape(-1, 1)
+            return predict_linear(X, coef, intercept, dtype=dtype)
 
-        # Set is_fitted to True
-        self.is_fitted = True
+        n_threads = effective_n_jobs(-1 if n_threads is None else n_threads)
+        if n_threads == 1 or len(batches) < 2:
+            return [score(X) for X in batches]
+        with ThreadPoolExecutor(max_workers=min(n_threads, len(batches))) as executor:
+            return list(executor.map(score, batches))
+
+    def export(self, dtype=np.float64):
+        """
+        Returns a slim LinearPredictor holding only the fitted coefficients,
+        to pickle or save (`LinearPredictor.save`) for scoring without
+        shipping the training data
 
-    def predict(self, X):
-        """Output model prediction.
         Arguments:
-        X: 1D or 2D numpy array
+        dtype: Data type of the exported coefficients, e.g. np.float32
         """
-        # check if X is 1D or 2D array
-        if len(X.shape) == 1:
-            X = X.reshape(-1, 1)
-        self.predicted_ = self.intercept_ + np.dot(X, self.coef_)
-        return self.predicted_
+        if not self.is_fitted:
+            print("Model not fitted yet!")
+            return None
+        return LinearPredictor(
+            self.coef_, self.intercept_, feature_names=self.feature_names_, dtype=dtype
+        )
 
     def run_diagnostics(self):
         """Runs diagnostics tests and plots"""
@@ -1,6 +1,5 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import statsmodels.api as sm
+from mlr.Fit_cache import per_dof
 
 class Metrics:
     """
@@ -13,6 +12,9 @@ class Metrics:
     mse: Mean sum of squared errors
     AIC: Akaike information criterion
     BIC: Bayesian information criterion
+
+    For a multi-target fit (2D target of shape (n, k)) every metric is an
+    array with one value per target.
     """
  
     def sse(self):
@@ -20,8 +22,7 @@ class Metrics:
         if not self.is_fitted:
             print("Model not fitted yet!")
             return None
-        squared_errors = (self.resid_) ** 2
-        self.sq_error_ = np.sum(squared_errors)
+        self.sq_error_ = self._fit_stats()["sse"]
         return self.sq_error_
 
     def sst(self):
@@ -29,9 +30,7 @@ class Metrics:
         if not self.is_fitted:
             print("Model not fitted yet!")
             return None
-        avg_y = np.mean(self.target_)
-        squared_errors = (self.target_ - avg_y) ** 2
-        self.sst_ = np.sum(squared_errors)
+        self.sst_ = self._fit_stats()["sst"]
         return self.sst_
 
     def r_squared(self):
@@ -47,7 +46,8 @@ class Metrics:
         if not self.is_fitted:
             print("Model not fitted yet!")
             return None
-        self.adj_r_sq_ = 1 - (self.sse() / self.dfe_) / (self.sst() / self.dft_)
+        stats = self._fit_stats()
+        self.adj_r_sq_ = 1 - per_dof(stats["sse"], stats["dfe"]) / (stats["sst"] / stats["dft"])
         return self.adj_r_sq_
 
     def mse(self):
@@ -55,7 +55,8 @@ class Metrics:
         if not self.is_fitted:
             print("Model not fitted yet!")
             return None
-        self.mse_ = np.mean((self.predict(self.features_) - self.target_) ** 2)
+        stats = self._fit_stats()
+        self.mse_ = stats["sse"] / stats["n"]
         return self.mse_
 
     def aic(self):
@@ -65,8 +66,8 @@ class Metrics:
         if not self.is_fitted:
             print("Model not fitted yet!")
             return None
-        lm = sm.OLS(self.target_, sm.add_constant(self.features_)).fit()
-        return lm.aic
+        stats = self._fit_stats()
+        return -2 * self._llf() + 2 * stats["k"]
 
     def bic(self):
         """
@@ -75,8 +76,8 @@ class Metrics:
         if not self.is_fitted:
             print("Model not fitted yet!")
             return None
-        lm = sm.OLS(self.target_, sm.add_constant(self.features_)).fit()
-        return lm.bic
+        stats = self._fit_stats()
+        return -2 * self._llf() + np.log(stats["n"]) * stats["k"]
 
     def print_metrics(self):
         """Prints a report of the useful metrics for a given model object"""
@@ -93,7 +94,11 @@ class Metrics:
             ("BIC:", self.bic()),
         )
         for item in items:
-            print("{0:8} {1:.4f}".format(item[0], item[1]))
+            if np.ndim(item[1]) > 0:
+                # one value per target of a multi-target fit
+                print("{0:8} {1}".format(item[0], np.array2string(item[1], precision=4)))
+            else:
+                print("{0:8} {1:.4f}".format(item[0], item[1]))
 
     def summary_metrics(self):
         """Returns a dictionary of the useful metrics"""
@@ -112,4 +117,20 @@ class Metrics:
         )
         for item in items:
             metrics[item[0]] = item[1]
-        return metrics
\ No newline at end of file
+        return metrics
+
+    def _llf(self):
+        """Gaussian log-likelihood of the fit (of the weighted fit, as in statsmodels WLS)"""
+        stats = self._fit_stats()
+        n = stats["n"]
+        llf = -n / 2 * (np.log(2 * np.pi) + np.log(stats["sse"] / n) + 1)
+        return llf + self._llf_weights()
+
+    def _llf_weights(self):
+        """Term of the sample weights in the log-likelihood: sum(log w) / 2"""
+        w = getattr(self, "sample_weight_", None)
+        if w is None:
+            # a streamed (or updated) fit keeps the sum in its statistics
+            stream = getattr(self, "stream_stats_", None)
+            return 0.0 if stream is None else stream.log_weight_sum / 2
+        return np.sum(np.log(w[w > 0])) / 2
@@ -1,12 +1,14 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import statsmodels.api as sm
+from mlr.Solvers import centered_cross_products, InterceptFactorization
+from mlr.Sparse import is_sparse, column_means, sparse_cross_products
 
 class Multicollinearity:
     """
     Methods for checking multicollinearity in the dataset features
     
-    vif:Computes variance influence factors for each feature variable
+    corrcoef: Returns the correlation coefficient matrix for the features
+    covar: Returns the covariance matrix for the features
+    vif: Computes variance influence factors for each feature variable
     """
 
     def __init__():
@@ -17,6 +19,10 @@ class Multicollinearity:
         if not self.is_ingested:
             print("No data ingested or fitted yet!")
             return None
+        if is_sparse(self.features_):
+            cov = self._sparse_covariance()
+            scale = 1 / np.sqrt(np.diag(cov))
+            return cov * np.outer(scale, scale)
         return np.corrcoef(self.features_.T)
     
     def covar(self):
@@ -24,19 +30,102 @@ class Multicollinearity:
         if not self.is_ingested:
             print("No data ingested or fitted yet!")
             return None
+        if is_sparse(self.features_):
+            return self._sparse_covariance()
         return np.cov(self.features_.T)
     
-    def vif(self):
-        """Computes variance influence factors for each feature variable"""
+    def vif(self, verbose=True, weighted=False):
+        """
+        Computes variance influence factors for each feature variable
+
+        The factors are the diagonal of the inverse of the correlation matrix
+        of the features, O(n*p^2 + p^3) instead of one auxiliary regression per
+        feature. When the model was fitted with an intercept, the centered
+        X^T X is taken from the fit and the cost is only O(p^3).
+
+        Arguments:
+        verbose: Boolean. Whether to print the factors. Default: True
+        weighted: Boolean. For a weighted fit, whether to compute the factors
+                  of the weighted design (the correlations of W^1/2 X, from
+                  the fit) rather than of the features alone, as statsmodels'
+                  variance_inflation_factor does. Default: False
+
+        Returns a numpy array with the factor of each feature (inf for a
+        feature that is an exact linear combination of the others, or is
+        constant)
+        """
         if not self.is_fitted:
             print("Model not fitted yet!")
             return None
-        import statsmodels.api as sm
-        from statsmodels.stats.outliers_influence import (
-            variance_inflation_factor as vif,
+        gram = self._centered_gram(weighted)
+        if gram is None:
+            print("The raw data is needed: the model was fitted from a weighted stream!")
+            return None
+        # a constant feature has no correlation matrix entry: infinite factor
+        diag = np.diag(gram)
+        varying = diag > np.finfo(float).eps * np.max(diag)
+        vifs = np.full(len(diag), np.inf)
+        if not np.all(varying):
+            print(
+                "Constant feature(s) {}: infinite variance inflation factor".format(
+                    np.flatnonzero(~varying).tolist()
+                )
+            )
+        if np.any(varying):
+            vifs[varying] = _correlation_vifs(gram[np.ix_(varying, varying)])
+        if verbose:
+            for i, v in enumerate(vifs):
+                print("Variance inflation factor for feature {}: {}".format(i, round(v, 2)))
+        return vifs
+
+    def _sparse_covariance(self):
+        """Returns the covariance matrix of sparse features, without densifying them"""
+        X = self.features_
+        gram = sparse_cross_products(X, None, column_means(X))[0]
+        return gram / (X.shape[0] - 1)
+
+    def _centered_gram(self, weighted=False):
+        """
+        Returns Xc^T Xc for the features centered on their means (Xc^T W Xc
+        centered on the weighted means, if `weighted` and the fit is weighted),
+        from the fit factorization or the stream statistics when they hold
+        it, else by row blocks. None if the raw data is needed but not kept
+        """
+        stream = getattr(self, "stream_stats_", None)
+        fit_weighted = self.sample_weight_ is not None or (
+            stream is not None and stream.weighted
         )
+        if weighted or not fit_weighted:
+            factor = self._fit_stats()["factor"]
+            if isinstance(factor, InterceptFactorization):
+                return factor.centered.gram()
+            if stream is not None:
+                return stream.cxx
+        if self.features_ is None:
+            return None
+        X = self.features_
+        w = self.sample_weight_ if weighted else None
+        if is_sparse(X):
+            return sparse_cross_products(X, None, column_means(X, w), None, w)[0]
+        gram, _ = centered_cross_products(X, None, column_means(X, w), None, w)
+        return gram
+
 
-        lm = sm.OLS(self.target_, sm.add_constant(self.features_)).fit()
-        for i in range(self.features_.shape[1]):
-            v = vif(np.matrix(self.features_), i)
-            print("Variance inflation factor for feature {}: {}".format(i, round(v, 2)))
\ No newline at end of file
+def _correlation_vifs(gram):
+    """
+    Returns the diagonal of the inverse of the correlation matrix of the
+    centered Gram matrix `gram` (of features with a positive variance)
+    """
+    scale = 1 / np.sqrt(np.diag(gram))
+    corr = gram * np.outer(scale, scale)
+    try:
+        R_inv = np.linalg.inv(np.linalg.cholesky(corr).T)
+        return np.sum(R_inv * R_inv, axis=1)
+    except np.linalg.LinAlgError:
+        # singular: infinite factor for the features in the null space
+        eigvals, eigvecs = np.linalg.eigh(corr)
+        null = eigvals <= np.finfo(float).eps * len(eigvals) * eigvals[-1]
+        weights = eigvecs * eigvecs
+        vifs = np.sum(weights[:, ~null] / eigvals[~null], axis=1)
+        vifs[np.any(weights[:, null] > np.finfo(float).eps, axis=1)] = np.inf
+        return vifs
@@ -1,44 +1,111 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import statsmodels.api as sm
 
 class Outliers:
     """
-    Methods for plotting outliers, leverage, influence points
+    Methods for computing and plotting outliers, leverage, influence points
     
+    leverage: Returns the leverage (hat matrix diagonal) of each observation
+    studentized_resid: Returns the internally or externally studentized residuals
+    cooks_distances: Returns Cook's distance of each observation
+    dffits: Returns the DFFITS of each observation
     cook_distance: Computes and plots Cook's distance
     influence_plot: Creates the influence plot
     leverage_resid_plot: Plots leverage vs normalized residuals' square
+
+    The leverage is computed by row blocks from the factorization of the fit
+    (the rows of the thin Q factor), never forming the n x n hat matrix, so
+    these methods scale to millions of observations.
     """
 
     def __init__():
         pass
 
-    def cook_distance(self):
-        """Computes and plots Cook\'s distance"""
+    def leverage(self):
+        """Returns the leverage (diagonal of the hat matrix) of each observation"""
         if not self.is_fitted:
             print("Model not fitted yet!")
             return None
-        import statsmodels.api as sm
-        from statsmodels.stats.outliers_influence import OLSInfluence as influence
+        if self.features_ is None:
+            print("The raw data is needed: the model was fitted from a stream!")
+            return None
+        if self._fit_stats()["factor"] is None:
+            print("X^T X was not factorized: the model was fitted by an iterative solver!")
+            return None
+        return self._hat_diag()
+
+    def studentized_resid(self, external=False):
+        """
+        Returns the studentized residuals
+
+        Arguments:
+        external: Boolean. If False (default), the residuals are scaled with the
+                  error variance of the full fit (internal studentization). If True,
+                  with the error variance of the fit leaving the observation out
+        """
+        h = self.leverage()
+        if h is None:
+            return None
+        stats = self._fit_stats()
+        resid = self.resid_
+        if self.sample_weight_ is not None:
+            # residuals of the weighted fit: sqrt(w) (y - X b)
+            w = self.sample_weight_.reshape((-1,) + (1,) * (resid.ndim - 1))
+            resid = resid * np.sqrt(w)
+        # broadcast over the targets of a multi-target fit
+        one_minus_h = (1 - h).reshape((-1,) + (1,) * (resid.ndim - 1))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = resid / np.sqrt(stats["sigma2"] * one_minus_h)
+            if external:
+                dfe = stats["dfe"]
+                r = r * np.sqrt((dfe - 1) / (dfe - r * r))
+        return r
+
+    def cooks_distances(self):
+        """Returns Cook\'s distance of each observation"""
+        h = self.leverage()
+        if h is None:
+            return None
+        r = self.studentized_resid()
+        h = h.reshape((-1,) + (1,) * (r.ndim - 1))
+        # an observation of leverage 1 is fitted exactly: inf or NaN
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return r * r / self._fit_stats()["k"] * h / (1 - h)
+
+    def dffits(self):
+        """Returns the DFFITS of each observation (externally studentized)"""
+        h = self.leverage()
+        if h is None:
+            return None
+        t = self.studentized_resid(external=True)
+        h = h.reshape((-1,) + (1,) * (t.ndim - 1))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return t * np.sqrt(h / (1 - h))
+
+    def cook_distance(self):
+        """Computes and plots Cook\'s distance, and returns it"""
+        c = self.cooks_distances()
+        if c is None:
+            return None
+        import matplotlib.pyplot as plt
 
-        lm = sm.OLS(self.target_, sm.add_constant(self.features_)).fit()
-        inf = influence(lm)
-        (c, p) = inf.cooks_distance
         plt.figure(figsize=(8, 5))
         plt.title("Cook's distance plot for the residuals", fontsize=14)
-        plt.stem(np.arange(len(c)), c, markerfmt=",", use_line_collection=True)
+        plt.stem(np.arange(len(c)), c, markerfmt=",")
         plt.grid(True)
         plt.show()
+        return c
 
     def influence_plot(self):
         """Creates the influence plot"""
         if not self.is_fitted:
             print("Model not fitted yet!")
             return None
+        import matplotlib.pyplot as plt
         import statsmodels.api as sm
 
-        lm = sm.OLS(self.target_, sm.add_constant(self.features_)).fit()
+        lm = self._ols()
+        if lm is None:
+            return None
         fig, ax = plt.subplots(figsize=(10, 8))
         fig = sm.graphics.influence_plot(lm, ax=ax, criterion="cooks")
         plt.show()
@@ -48,9 +115,12 @@ class Outliers:
         if not self.is_fitted:
             print("Model not fitted yet!")
             return None
+        import matplotlib.pyplot as plt
         import statsmodels.api as sm
 
-        lm = sm.OLS(self.target_, sm.add_constant(self.features_)).fit()
+        lm = self._ols()
+        if lm is None:
+            return None
         fig, ax = plt.subplots(figsize=(10, 8))
         fig = sm.graphics.plot_leverage_resid2(lm, ax=ax)
         plt.show()
\ No newline at end of file
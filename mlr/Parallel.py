@@ -0,0 +1,114 @@
+import os
+import numpy as np
+
+
+def effective_n_jobs(n_jobs):
+    """Number of worker processes for `n_jobs` (-1 means all the CPUs)"""
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return max(1, n_jobs)
+
+
+class SharedArray:
+    """
+    A numpy array allocated in shared memory
+
+    Worker processes receive its `handle` (name, shape, dtype) and map the
+    same memory with `attach_shared`, instead of having the array pickled
+    and copied to each of them. Use as a context manager so the memory is
+    released when done.
+    """
+
+    def __init__(self, shape, dtype=np.float64):
+        from multiprocessing import shared_memory
+
+        dtype = np.dtype(dtype)
+        shape = tuple(np.atleast_1d(shape))
+        size = max(1, int(np.prod(shape)) * dtype.itemsize)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
+        self.handle = (self.shm.name, shape, dtype.str)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Releases the shared memory"""
+        self.array = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+def attach_shared(handle):
+    """
+    Maps a SharedArray in a worker process from its handle
+
+    Returns a tuple (shm, array). Keep `shm` alive while using the array
+    and call `shm.close()` when done; the creating process unlinks it.
+    """
+    from multiprocessing import shared_memory
+
+    name, shape, dtype = handle
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: the pool workers share the resource tracker of the
+        # creating process, so registering the segment again is harmless
+        shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def balanced_shards(counts, num_shards):
+    """
+    Splits consecutive groups into at most `num_shards` contiguous shards of
+    about the same number of rows
+
+    Arguments:
+    counts: Number of rows of each group
+
+    Returns:
+    A list of (first_group, last_group + 1) tuples
+    """
+    ends = np.cumsum(counts)
+    targets = ends[-1] * np.arange(1, num_shards) / num_shards
+    cuts = np.unique(np.r_[0, np.searchsorted(ends, targets, side="right"), len(counts)])
+    return [(int(a), int(b)) for a, b in zip(cuts[:-1], cuts[1:]) if b > a]
+
+
+def share(array, stack):
+    """
+    Copies a numpy array, or the arrays of a scipy.sparse CSR matrix, into
+    shared memory, released when the ExitStack `stack` closes
+
+    Returns the handle from which the workers map the data with
+    `attach_shared_data`.
+    """
+    from mlr.Sparse import is_sparse
+
+    if is_sparse(array):
+        parts = (array.data, array.indices, array.indptr)
+        return ("csr", array.shape) + tuple(share(part, stack) for part in parts)
+    shared = stack.enter_context(SharedArray(array.shape, array.dtype))
+    shared.array[...] = array
+    return shared.handle
+
+
+def attach_shared_data(handle):
+    """
+    Maps the array or CSR matrix shared with `share` in a worker process
+
+    Returns a tuple (list of shms, data). Call `close()` on every shm when
+    done with the data.
+    """
+    if handle[0] != "csr":
+        shm, array = attach_shared(handle)
+        return [shm], array
+    import scipy.sparse as sp
+
+    shms, parts = zip(*(attach_shared(part) for part in handle[2:]))
+    return list(shms), sp.csr_matrix(tuple(parts), shape=handle[1], copy=False)
@@ -0,0 +1,190 @@
+import os
+import numpy as np
+from mlr.Solvers import row_blocks, BLOCK_BYTES
+from mlr.Sparse import is_sparse
+
+
+class LinearPredictor:
+    """
+    Slim, read-only linear predictor exported from a fitted model
+
+    Holds only the coefficients, the intercept, the feature names and the
+    data type, so it is cheap to pickle or save and to score with: unlike
+    the fitted model it carries none of the training data.
+
+    coef: Coefficients, shape (num_features,) or (num_features, k) for k targets
+    intercept: Intercept, a scalar or shape (k,)
+    feature_names: Tuple of the names of the features
+    dtype: Numpy data type of the coefficients (and of the predictions)
+    """
+
+    __slots__ = ("coef", "intercept", "feature_names", "dtype")
+
+    def __init__(self, coef, intercept, feature_names=None, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        self.coef = np.asarray(coef, dtype=self.dtype)
+        self.intercept = np.asarray(intercept, dtype=self.dtype)
+        if feature_names is None:
+            feature_names = ["X[{}]".format(i) for i in range(self.coef.shape[0])]
+        self.feature_names = tuple(str(name) for name in feature_names)
+
+    def __repr__(self):
+        return "Linear predictor on {} features ({})".format(
+            len(self.feature_names), self.dtype.name
+        )
+
+    def predict(self, X):
+        """
+        Output model predictions
+
+        Arguments:
+        X: 2D numpy array (or scipy.sparse matrix) of shape (n, num_features),
+           or 1D array of the features of a single observation. It is used as
+           is: no reshaping, no copy and nothing stored on the predictor.
+        """
+        return X @ self.coef + self.intercept
+
+    def save(self, path):
+        """
+        Saves the predictor to an uncompressed .npz file
+
+        The arrays are stored uncompressed, so `load` can memory-map them
+        from the file instead of reading them.
+
+        Arguments:
+        path: Path of the file. The .npz suffix is added if missing, as
+              `np.savez` does, and `load` accepts the path with or without it
+
+        Returns:
+        The path of the file written
+        """
+        path = _npz_path(path)
+        np.savez(
+            path,
+            coef=self.coef,
+            intercept=self.intercept,
+            feature_names=np.array(self.feature_names, dtype=str),
+        )
+        return path
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        """
+        Loads a predictor saved with `save`
+
+        Arguments:
+        path: Path to the .npz file (the .npz suffix may be left out)
+        mmap_mode: Memory-map mode of the coefficient arrays ('r' by default,
+                   zero-copy), or None to read them into memory
+        """
+        if not os.path.exists(path):
+            path = _npz_path(path)
+        if mmap_mode is None:
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files}
+        else:
+            arrays = _memmap_npz(path, mmap_mode)
+        predictor = cls.__new__(cls)
+        predictor.coef = arrays["coef"]
+        predictor.intercept = arrays["intercept"]
+        predictor.dtype = predictor.coef.dtype
+        predictor.feature_names = tuple(str(name) for name in arrays["feature_names"])
+        return predictor
+
+
+def predict_linear(X, coef, intercept, out=None, dtype=None, chunk_size=None):
+    """
+    Computes X coef + intercept by row chunks, writing into `out`
+
+    Arguments:
+    X: 2D numpy array (or memmap) of shape (n, num_features), or scipy.sparse
+       matrix (multiplied as is, in one sparse product)
+    coef: Coefficients, shape (num_features,) or (num_features, k)
+    intercept: Intercept, a scalar or shape (k,)
+    out: Optional preallocated C-contiguous array of shape (n,) or (n, k)
+    dtype: Data type of the computation and of the output. Defaults to the
+           dtype of `out` if given, else to that of X and coef combined; pass
+           np.float32 to score float32 data without up-casting it
+    chunk_size: Number of rows per chunk (by default, chunks of about
+                BLOCK_BYTES of X), so that a cast of X never exists in full
+    """
+    if dtype is None:
+        dtype = out.dtype if out is not None else np.result_type(X.dtype, coef.dtype)
+    dtype = np.dtype(dtype)
+    coef = np.asarray(coef, dtype=dtype)
+    intercept = np.asarray(intercept, dtype=dtype)
+    n = X.shape[0]
+    shape = (n,) + coef.shape[1:]
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    elif out.shape != shape or out.dtype != dtype:
+        raise ValueError(
+            "out must be an array of shape {} and dtype {}".format(shape, dtype.name)
+        )
+    if is_sparse(X):
+        out[...] = X @ coef
+        out += intercept
+        return out
+    if chunk_size is None and X.dtype == dtype and X.nbytes <= BLOCK_BYTES:
+        # small batch (e.g. a single row): one BLAS call, no chunking overhead
+        np.dot(X, coef, out=out)
+        out += intercept
+        return out
+    if chunk_size is None:
+        blocks = row_blocks(n, X.shape[1], X.dtype.itemsize)
+    else:
+        blocks = ((start, min(start + chunk_size, n)) for start in range(0, n, chunk_size))
+    for start, stop in blocks:
+        block = out[start:stop]
+        np.dot(np.asarray(X[start:stop], dtype=dtype), coef, out=block)
+        block += intercept
+    return out
+
+
+def _npz_path(path):
+    """Returns `path` with the .npz suffix added if it lacks it"""
+    path = os.fspath(path)
+    return path if path.endswith(".npz") else path + ".npz"
+
+
+def _memmap_npz(path, mmap_mode="r"):
+    """
+    Memory-maps the arrays of an uncompressed .npz file
+
+    `np.load` ignores `mmap_mode` for .npz archives; the members of an
+    uncompressed archive are however stored as contiguous .npy files, which
+    are mapped here at their offset in the archive.
+    """
+    import zipfile
+    from numpy.lib import format as npy_format
+
+    arrays = {}
+    with open(path, "rb") as fh, zipfile.ZipFile(fh) as archive:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                arrays[name] = npy_format.read_array(archive.open(info))
+                continue
+            # skip the zip local file header to the start of the .npy data
+            fh.seek(info.header_offset + 26)
+            name_length, extra_length = np.frombuffer(fh.read(4), dtype="<u2")
+            fh.seek(info.header_offset + 30 + int(name_length) + int(extra_length))
+            version = npy_format.read_magic(fh)
+            if version == (1, 0):
+                shape, fortran_order, dtype = npy_format.read_array_header_1_0(fh)
+            else:
+                shape, fortran_order, dtype = npy_format.read_array_header_2_0(fh)
+            if dtype.hasobject or np.prod(shape) == 0 or shape == ():
+                fh.seek(info.header_offset + 30 + int(name_length) + int(extra_length))
+                arrays[name] = npy_format.read_array(fh)
+                continue
+            mapped = np.memmap(
+                path,
+                dtype=dtype,
+                mode=mmap_mode,
+                offset=fh.tell(),
+                shape=shape,
+                order="F" if fortran_order else "C",
+            )
+            arrays[name] = mapped.view(np.ndarray)
+    return arrays
@@ -0,0 +1,225 @@
+import numpy as np
+from mlr.Solvers import Factorization
+
+
+class RegularizationPath:
+    """
+    Coefficients of a regularized regression along a sequence of penalties
+
+    alphas: Penalties, one per row of the arrays below
+    coef: Coefficients, shape (num_alphas, num_features)
+    intercept: Intercepts, shape (num_alphas,)
+    r_squared: R^2 on the training data
+    df: Degrees of freedom of each fit (effective for ridge, number of
+        non-zero coefficients for lasso/elastic net)
+    n_iter: Number of coordinate descent sweeps of each fit (None for ridge)
+    """
+
+    def __init__(self, alphas, coef, intercept, r_squared, df, n_iter=None):
+        self.alphas = alphas
+        self.coef = coef
+        self.intercept = intercept
+        self.r_squared = r_squared
+        self.df = df
+        self.n_iter = n_iter
+
+    def __repr__(self):
+        return "Regularization path over {} penalties".format(len(self.alphas))
+
+    def __len__(self):
+        return len(self.alphas)
+
+    def predict(self, X):
+        """
+        Output the predictions of every fit of the path
+
+        Arguments:
+        X: 2D numpy array of features
+
+        Returns:
+        A 2D array of shape (num_observations, num_alphas)
+        """
+        return np.dot(X, self.coef.T) + self.intercept
+
+
+class Regularized:
+    """
+    Methods for regularized (penalized) least squares
+
+    ridge_path: Ridge regression for a sequence of penalties
+    elastic_net_path: Elastic net (and lasso) for a sequence of penalties
+
+    Both work from the cross-product matrices of the fit (centered if the
+    intercept is fitted, which is not penalized), so a whole path costs
+    little more than one fit and needs no further pass over the data.
+    Features are not standardized: scale them first if their units differ.
+    """
+
+    def __init__():
+        pass
+
+    def ridge_path(self, alphas):
+        """
+        Fits ridge regression, minimizing ||y - X b||^2 + alpha ||b||^2,
+        for every penalty in `alphas`
+
+        The singular values and vectors of X are computed once (from the
+        eigen-decomposition of X^T X); each penalty then only rescales them,
+        in O(p^2). Collinear features are handled for any alpha > 0.
+
+        Arguments:
+        alphas: Sequence of non-negative penalties
+
+        Returns:
+        A RegularizationPath object
+        """
+        setup = self._penalized_setup()
+        if setup is None:
+            return None
+        xtx, xty, yty, x_mean, y_mean, n = setup
+        alphas = np.asarray(alphas, dtype=np.float64)
+        assert np.all(alphas >= 0), "alphas must be non-negative"
+
+        factor = Factorization.from_gram_eigh(xtx)
+        s2 = factor.s ** 2
+        rotated = np.dot(factor.Vt, xty)
+        # shrinkage factors 1 / (s^2 + alpha) of each singular direction,
+        # with the null directions dropped when alpha is 0 (minimum norm)
+        with np.errstate(divide="ignore"):
+            shrink = np.where(
+                s2 + alphas[:, None] > 0, 1 / (s2 + alphas[:, None]), 0
+            )
+        cutoff = np.finfo(float).eps * len(s2) * s2[0]
+        shrink[:, s2 <= cutoff] *= alphas[:, None] > 0
+        coef = np.dot(shrink * rotated, factor.Vt)
+        df = np.sum(s2 * shrink, axis=1)
+        return self._path_result(alphas, coef, df, None, xtx, xty, yty, x_mean, y_mean)
+
+    def elastic_net_path(
+        self, alphas=None, l1_ratio=1.0, n_alphas=100, eps=1e-3, tol=1e-7, max_iter=1000
+    ):
+        """
+        Fits the elastic net, minimizing
+            1 / (2 n) ||y - X b||^2 + alpha (l1_ratio ||b||_1 + (1 - l1_ratio) / 2 ||b||^2)
+        for every penalty in `alphas`, by coordinate descent on X^T X
+
+        The penalties are visited in decreasing order, each fit starting
+        from the previous solution (warm start). The sequential strong rule
+        screens out the features that are likely to stay at zero; sweeps
+        then cycle over the active features only, and every fit ends with a
+        check of the optimality conditions over all the features.
+
+        Arguments:
+        alphas: Sequence of penalties. By default, `n_alphas` values on a
+                log scale from the smallest penalty giving all-zero
+                coefficients down to `eps` times it
+        l1_ratio: Mix of the penalties, 1 for the lasso, 0 for ridge
+        n_alphas: Number of default penalties
+        eps: Ratio of the smallest to the largest default penalty
+        tol: Convergence tolerance on the largest coefficient update
+             (relative to the largest coefficient)
+        max_iter: Maximum number of sweeps per penalty
+
+        Returns:
+        A RegularizationPath object (penalties in decreasing order)
+        """
+        assert 0 <= l1_ratio <= 1, "l1_ratio must be between 0 and 1"
+        setup = self._penalized_setup()
+        if setup is None:
+            return None
+        xtx, xty, yty, x_mean, y_mean, n = setup
+        p = len(xty)
+        G = xtx / n
+        c = xty / n
+        diag = np.diag(G).copy()
+
+        if alphas is None:
+            assert l1_ratio > 0, "Give the alphas explicitly when l1_ratio is 0"
+            alpha_max = np.max(np.abs(c)) / l1_ratio
+            alphas = alpha_max * np.logspace(0, np.log10(eps), n_alphas)
+        alphas = np.sort(np.asarray(alphas, dtype=np.float64))[::-1]
+
+        coef = np.zeros((len(alphas), p))
+        n_iter = np.zeros(len(alphas), dtype=int)
+        beta = np.zeros(p)
+        grad = c.copy()  # c - G beta, the correlations with the residuals
+        previous_alpha = alphas[0]
+        for i, alpha in enumerate(alphas):
+            l1 = alpha * l1_ratio
+            l2 = alpha * (1 - l1_ratio)
+            # sequential strong rule: features kept in the working set
+            strong = (np.abs(grad) >= 2 * l1 - previous_alpha * l1_ratio) | (beta != 0)
+            working = np.flatnonzero(strong & (diag + l2 > 0))
+            while True:
+                n_iter[i] += _coordinate_descent(
+                    G, diag, beta, grad, working, l1, l2, tol, max_iter
+                )
+                # optimality (KKT) check of the features left out
+                violating = np.flatnonzero(
+                    ~strong & (np.abs(grad) > l1 * (1 + 1e-9)) & (diag + l2 > 0)
+                )
+                if len(violating) == 0:
+                    break
+                strong[violating] = True
+                working = np.flatnonzero(strong & (diag + l2 > 0))
+            coef[i] = beta
+            previous_alpha = alpha
+
+        df = np.count_nonzero(coef, axis=1)
+        return self._path_result(alphas, coef, df, n_iter, xtx, xty, yty, x_mean, y_mean)
+
+    def lasso_path(self, alphas=None, n_alphas=100, eps=1e-3, tol=1e-7, max_iter=1000):
+        """Fits the lasso for every penalty in `alphas`: `elastic_net_path` with l1_ratio=1"""
+        return self.elastic_net_path(alphas, 1.0, n_alphas, eps, tol, max_iter)
+
+    def _penalized_setup(self):
+        """
+        Returns the cross-products (X^T X, X^T y, y^T y) of the problem (centered
+        if the intercept is fitted), the means of X and y, and the number of
+        observations; or None if the model is not fitted
+        """
+        if not self.is_fitted:
+            print("Model not fitted yet!")
+            return None
+        suff = self._sufficient_stats()
+        assert np.ndim(suff.y_mean) == 0, "Regularized fits support a single target"
+        if self.fit_intercept_:
+            return suff.cxx, suff.cxy, suff.cyy, suff.x_mean, suff.y_mean, suff.n
+        return suff.xtx, suff.xty, suff.yty, None, suff.y_mean, suff.n
+
+    def _path_result(self, alphas, coef, df, n_iter, xtx, xty, yty, x_mean, y_mean):
+        """Builds the RegularizationPath, with the intercepts and training R^2"""
+        if x_mean is not None:
+            intercept = y_mean - np.dot(coef, x_mean)
+            sst = yty
+        else:
+            intercept = np.zeros(len(alphas))
+            sst = self._fit_stats()["sst"]
+        # SSE = y^T y - 2 b^T X^T y + b^T X^T X b, for every fit at once
+        sse = yty - 2 * np.dot(coef, xty) + np.einsum("ai,ij,aj->a", coef, xtx, coef)
+        r_squared = 1 - np.maximum(sse, 0) / sst
+        return RegularizationPath(alphas, coef, intercept, r_squared, df, n_iter)
+
+
+def _coordinate_descent(G, diag, beta, grad, working, l1, l2, tol, max_iter):
+    """
+    Cyclic coordinate descent over the features in `working`, updating
+    `beta` and `grad` (= c - G beta) in place
+
+    Returns:
+    The number of sweeps done
+    """
+    for sweep in range(1, max_iter + 1):
+        max_update = 0.0
+        for j in working:
+            old = beta[j]
+            rho = grad[j] + diag[j] * old
+            new = np.sign(rho) * max(abs(rho) - l1, 0.0) / (diag[j] + l2)
+            if new != old:
+                delta = new - old
+                beta[j] = new
+                grad -= delta * G[j]  # G is symmetric: row j is column j
+                max_update = max(max_update, abs(delta))
+        if max_update <= tol * max(np.max(np.abs(beta)), 1e-12):
+            return sweep
+    return max_iter
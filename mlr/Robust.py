@@ -0,0 +1,315 @@
+import numpy as np
+from mlr.Solvers import row_blocks, solve_gram, solve_least_squares
+from mlr.Sparse import is_sparse, column_means
+
+# Default tuning constants of the norms (95% efficiency at the normal)
+TUNING = {"huber": 1.345, "tukey": 4.685}
+
+# Size in bytes of the row blocks of the IRLS: the cross-products of a
+# block are accumulated into k x k arrays, which needs far smaller blocks
+# than BLOCK_BYTES to run at the speed of BLAS
+IRLS_BLOCK_BYTES = 2 ** 20
+
+# Consistency constant of the median absolute deviation at the normal,
+# the third quartile of the standard normal distribution
+MAD_SCALE = 0.6744897501960817
+
+
+class IRLSWorkspace:
+    """
+    Buffers of the iteratively reweighted least squares, allocated once
+    and reused by every iteration
+
+    Each iteration makes two passes over X by row blocks: one for the
+    residuals, written in place, and one for the weighted cross-products of
+    [1, X - m] (m: the column means, for precision), which fills the same
+    block buffer every time and accumulates into preallocated k x k arrays.
+    An iteration allocates nothing proportional to n or to the block size.
+
+    Three n-length arrays are held: the residuals and a scratch array for
+    their magnitudes, which are the `resid_` and `fitted_` arrays of the
+    least squares start when given (their values are not needed again),
+    and the weights. The blocks are of IRLS_BLOCK_BYTES at most (a single
+    block the size of the data, for a small X).
+
+    resid, abs_resid: Residuals and a scratch array for their magnitudes
+    weights: Current weights
+    """
+
+    def __init__(self, X, y, fit_intercept, resid=None, scratch=None):
+        n, p = X.shape
+        self.X = X
+        self.y = y
+        self.fit_intercept = fit_intercept
+        self.offset = 1 if fit_intercept else 0
+        self.x_mean = column_means(X) if fit_intercept else None
+        k = p + self.offset
+        self.blocks = list(row_blocks(n, k, block_bytes=IRLS_BLOCK_BYTES))
+        block_rows = max(stop - start for start, stop in self.blocks)
+        self.block = np.empty((block_rows, k))
+        self.y_block = np.empty(block_rows)
+        self.root_block = np.empty(block_rows)
+        self.gram = np.empty((k, k))
+        self.rhs = np.empty(k)
+        self.gram_block = np.empty((k, k))
+        self.rhs_block = np.empty(k)
+        self.resid = _buffer(resid, n)
+        self.abs_resid = _buffer(scratch, n)
+        self.weights = np.empty(n)
+
+    def _fill(self, start, stop):
+        """Fills the block buffer with rows [start, stop) of [1, X - m], returns its view"""
+        block = self.block[: stop - start]
+        if self.fit_intercept:
+            block[:, 0] = 1
+        columns = block[:, self.offset :]
+        if self.x_mean is None:
+            columns[...] = self.X[start:stop]
+        else:
+            np.subtract(self.X[start:stop], self.x_mean, out=columns)
+        return block
+
+    def residuals(self, coef):
+        """
+        Writes y - X b into `resid`
+
+        Arguments:
+        coef: Coefficients of the columns of [1, X - m]
+        """
+        beta = coef[self.offset :]
+        # intercept of the unshifted X, so that X is read as is
+        intercept = 0.0
+        if self.fit_intercept:
+            intercept = coef[0] - np.dot(self.x_mean, beta)
+        for start, stop in self.blocks:
+            out = self.resid[start:stop]
+            np.dot(self.X[start:stop], beta, out=out)
+            out += intercept
+            np.subtract(self.y[start:stop], out, out=out)
+
+    def solve(self):
+        """
+        Returns the weighted least squares coefficients of [1, X - m] for
+        the current `weights`, from the cross-products of the rows scaled
+        by the square roots of the weights
+        """
+        self.gram[...] = 0
+        self.rhs[...] = 0
+        for start, stop in self.blocks:
+            root = self.root_block[: stop - start]
+            np.sqrt(self.weights[start:stop], out=root)
+            block = self._fill(start, stop)
+            block *= root[:, None]
+            y_block = self.y_block[: stop - start]
+            np.multiply(self.y[start:stop], root, out=y_block)
+            np.dot(block.T, block, out=self.gram_block)
+            np.dot(block.T, y_block, out=self.rhs_block)
+            self.gram += self.gram_block
+            self.rhs += self.rhs_block
+        return solve_gram(self.gram, self.rhs)[0]
+
+    def to_shifted(self, coef):
+        """Converts (intercept, coefficients) of X into those of [1, X - m]"""
+        if not self.fit_intercept:
+            return np.array(coef, dtype=np.float64)
+        shifted = np.array(coef, dtype=np.float64)
+        shifted[0] += np.dot(self.x_mean, coef[1:])
+        return shifted
+
+
+class Robust:
+    """
+    Methods for robust regression
+
+    fit_robust: Fits the model with the Huber or Tukey biweight norm, by
+                iteratively reweighted least squares (IRLS)
+
+    The observations with large residuals are downweighted, so that a few
+    outliers do not pull the fit. The final weights are applied as sample
+    weights to a last weighted least squares fit, so that the coefficients,
+    the metrics and the inference of the model are those of that fit.
+    """
+
+    def __init__():
+        pass
+
+    def fit_robust(
+        self,
+        X=None,
+        y=None,
+        norm="huber",
+        tuning=None,
+        max_iter=50,
+        tol=1e-8,
+        sample_weight=None,
+    ):
+        """
+        Fits model coefficients minimizing a robust norm of the residuals,
+        by iteratively reweighted least squares
+
+        Starts from the least squares fit of the model's solver. Each
+        iteration estimates the scale of the residuals (median absolute
+        deviation / 0.6745, the third quartile of the normal), computes the
+        weight of each observation from its scaled residual u, and solves
+        the weighted least squares problem:
+            huber: w = min(1, c / |u|)
+            tukey: w = (1 - (u / c)^2)^2 if |u| < c, else 0
+        All the buffers (residuals, weights, row block, cross-products) are
+        allocated once, the residuals reusing the arrays of the least
+        squares start: an iteration costs two passes over X by row blocks
+        and a p x p solve. A sparse X is reweighted through the weighted
+        solver of the model instead.
+
+        The Tukey biweight rejects gross outliers entirely, but its problem
+        is not convex: the result depends on the least squares start.
+
+        Arguments:
+        X: 1D or 2D numpy array, numpy memmap, scipy.sparse matrix, or path
+           to a .npy file (the ingested data if None)
+        y: 1D numpy array, numpy memmap, or path to a .npy file
+        norm: 'huber' or 'tukey'
+        tuning: Tuning constant c of the norm, in units of the scale
+                (1.345 for huber and 4.685 for tukey by default)
+        max_iter: Maximum number of IRLS iterations
+        tol: Stop when the coefficients change by less than tol (relative)
+        sample_weight: Optional prior observation weights, multiplying the
+                       robust ones
+
+        Sets robust_weights_ (the weights of the norm, without the prior
+        weights), scale_ (the scale of the residuals) and robust_n_iter_.
+        """
+        assert norm in TUNING, "norm must be one of {}".format(tuple(TUNING))
+        c = TUNING[norm] if tuning is None else tuning
+        assert c > 0, "tuning must be positive"
+
+        self.fit(X, y, sample_weight=sample_weight)
+        if not self.is_fitted:
+            # fit printed why (no data ingested, or a streamed model)
+            return None
+        X = self.features_
+        y = self.target_
+        assert y.ndim == 1, "fit_robust supports a single target"
+        prior = self.sample_weight_
+        coef = self.coef_
+        if self.fit_intercept_:
+            coef = np.concatenate([[self.intercept_], coef])
+
+        # the residuals and fitted values of the start are reused as buffers:
+        # the last weighted fit replaces them
+        stats = self._fit_stats()
+        resid, fitted = stats.pop("resid"), stats.pop("fitted")
+        self.resid_ = self.fitted_ = None
+        if is_sparse(X):
+            work = _SparseIRLS(X, y, self.fit_intercept_, self.solver, resid, fitted)
+        else:
+            work = IRLSWorkspace(X, y, self.fit_intercept_, resid, fitted)
+        del resid, fitted
+        coef = work.to_shifted(coef)
+
+        scale = 0.0
+        n_iter = 0
+        while n_iter < max_iter:
+            work.residuals(coef)
+            # scale of the residuals, by the MAD (the median overwrites abs_resid)
+            np.abs(work.resid, out=work.abs_resid)
+            scale = np.median(work.abs_resid, overwrite_input=True) / MAD_SCALE
+            if scale == 0:
+                break
+            _norm_weights(norm, work.resid, c * scale, work.abs_resid, work.weights)
+            if prior is not None:
+                work.weights *= prior
+            n_iter += 1
+            previous = coef
+            coef = work.solve()
+            change = np.linalg.norm(coef - previous)
+            if change <= tol * max(np.linalg.norm(coef), np.finfo(float).tiny):
+                break
+
+        # weights of the final coefficients, for the last weighted fit
+        work.residuals(coef)
+        if scale > 0:
+            _norm_weights(norm, work.resid, c * scale, work.abs_resid, work.weights)
+        else:
+            work.weights[...] = 1
+        weights = work.weights
+        # the buffers are released before the last fit allocates its own
+        del work
+        self.robust_weights_ = weights
+        self.scale_ = scale
+        self.robust_n_iter_ = n_iter
+        if prior is not None:
+            weights = weights * prior
+        self.fit(sample_weight=weights)
+
+
+class _SparseIRLS:
+    """
+    Buffers of the IRLS on a sparse X, with the interface of IRLSWorkspace:
+    the residuals are sparse products and each weighted problem is solved by
+    `solve_least_squares` (weights applied without densifying X).
+    Coefficients are those of [1, X], not shifted
+    """
+
+    def __init__(self, X, y, fit_intercept, solver, resid=None, scratch=None):
+        n = X.shape[0]
+        self.X = X
+        self.y = y
+        self.fit_intercept = fit_intercept
+        self.offset = 1 if fit_intercept else 0
+        self.solver = solver
+        self.resid = _buffer(resid, n)
+        self.abs_resid = _buffer(scratch, n)
+        self.weights = np.empty(n)
+
+    def residuals(self, coef):
+        np.subtract(self.y, self.X @ coef[self.offset :], out=self.resid)
+        if self.fit_intercept:
+            self.resid -= coef[0]
+
+    def solve(self):
+        if not self.fit_intercept:
+            return solve_least_squares(
+                self.X, self.y, solver=self.solver, weights=self.weights
+            )[0]
+        total = np.sum(self.weights)
+        x_mean = column_means(self.X, self.weights)
+        y_mean = np.dot(self.weights, self.y) / total
+        beta = solve_least_squares(
+            self.X, self.y, self.solver, x_mean, y_mean, weights=self.weights
+        )[0]
+        return np.concatenate([[y_mean - np.dot(x_mean, beta)], beta])
+
+    def to_shifted(self, coef):
+        return np.array(coef, dtype=np.float64)
+
+
+def _buffer(array, n):
+    """Returns `array` to be overwritten if it is a float64 array of n values, else a new one"""
+    if isinstance(array, np.ndarray) and array.shape == (n,) and array.dtype == np.float64:
+        return array
+    return np.empty(n)
+
+
+def _norm_weights(norm, resid, threshold, scratch, out):
+    """
+    Writes the IRLS weights of the residuals into `out`, in place
+
+    Arguments:
+    norm: 'huber' or 'tukey'
+    resid: Residuals
+    threshold: Tuning constant times the scale of the residuals
+    scratch: Array of the size of `resid`, overwritten
+    out: Output array
+    """
+    if norm == "huber":
+        # threshold / max(|r|, threshold)
+        np.abs(resid, out=scratch)
+        np.maximum(scratch, threshold, out=scratch)
+        np.divide(threshold, scratch, out=out)
+    else:
+        # (1 - (r / threshold)^2)^2, zero beyond the threshold
+        np.divide(resid, threshold, out=scratch)
+        np.square(scratch, out=scratch)
+        np.subtract(1, scratch, out=scratch)
+        np.maximum(scratch, 0, out=scratch)
+        np.square(scratch, out=out)
@@ -0,0 +1,202 @@
+import numpy as np
+from mlr.Solvers import row_blocks
+from mlr.Sparse import dense_rows
+from mlr.Grouped import _group_sums, solve_stacked, stacked_std_err
+
+# Span, in window lengths, of the rows whose running sums are shared by
+# consecutive rolling windows. The sums and the shift of the data are
+# anchored again for every such chunk of windows, so that the rounding
+# errors of the differences depend on the window length, not on the
+# length of the series
+ANCHOR_WINDOWS = 4
+
+
+class RollingModels:
+    """
+    Trajectories of a linear regression fitted over rolling (or expanding)
+    windows of the data
+
+    All the per-window results are stored as contiguous arrays, one row per
+    window, in time order:
+
+    starts, ends: Row bounds [start, end) of each window
+    coef: Coefficients, shape (num_windows, num_features)
+    intercept: Intercepts, shape (num_windows,)
+    std_err: Standard errors, shape (num_windows, num_features + 1), intercept
+             first (no intercept column if the intercept is not fitted)
+    sse: Sum of squared errors
+    sst: Total sum of squares
+    r_squared: R^2 of each window
+    dfe: Degrees of freedom of the errors
+
+    Windows with fewer observations than coefficients, or with collinear
+    features, get the minimum-norm solution and NaN standard errors.
+    """
+
+    def __init__(self, starts, ends, coef, intercept, std_err, sse, sst, dfe):
+        self.starts = starts
+        self.ends = ends
+        self.coef = coef
+        self.intercept = intercept
+        self.std_err = std_err
+        self.sse = sse
+        self.sst = sst
+        self.dfe = dfe
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.r_squared = 1 - sse / sst
+
+    def __repr__(self):
+        return "Linear regressions over {} windows".format(len(self.ends))
+
+    def __len__(self):
+        return len(self.ends)
+
+    def to_dataframe(self):
+        """Returns the per-window coefficients and R^2 as a Pandas DataFrame, by window end"""
+        from pandas import DataFrame
+
+        names = ["X[{}]".format(i) for i in range(self.coef.shape[1])]
+        df = DataFrame(self.coef, index=self.ends, columns=names)
+        df.insert(0, "intercept", self.intercept)
+        df["r^2"] = self.r_squared
+        return df
+
+
+class Rolling:
+    """
+    Methods for fitting the model over moving windows of the data
+
+    rolling_fit: Fits the model over rolling or expanding windows
+    """
+
+    def __init__():
+        pass
+
+    def rolling_fit(self, window, step=1, expanding=False):
+        """
+        Fits the model over windows of consecutive rows of the ingested data,
+        e.g. to monitor a time series
+
+        The sufficient statistics (sums of x, y, x x^T, x y and y^2) of the
+        segments between window bounds are accumulated in a single pass over
+        the data; each window's statistics are then a difference of running
+        sums, and all the windows are solved with one batched inversion.
+        Rolling windows are processed in chunks spanning about ANCHOR_WINDOWS
+        windows, whose running sums start from zero and whose data is
+        shifted by its local mean: the differences then lose no more
+        precision on a long series (or a trending one) than on a short one,
+        for about (window - step) / (ANCHOR_WINDOWS window) more rows read.
+        Expanding windows share a single set of running sums.
+
+        Arguments:
+        window: Number of rows of each window (the first window, if expanding)
+        step: Number of rows between the ends of consecutive windows
+        expanding: Boolean. If True, every window starts at the first row
+
+        Returns:
+        A RollingModels object
+        """
+        if not self.is_ingested or self.features_ is None:
+            print("No data ingested or fitted yet!")
+            return None
+        if getattr(self, "sample_weight_", None) is not None:
+            print("rolling_fit does not support sample weights!")
+            return None
+        X = self.features_
+        y = self.target_
+        assert y.ndim == 1, "rolling_fit supports a single target"
+        n, p = X.shape
+        assert 0 < window <= n, "window must be between 1 and the number of rows"
+
+        ends = np.arange(window, n + 1, step)
+        starts = np.zeros_like(ends) if expanding else ends - window
+
+        # consecutive windows sharing the same running sums
+        if expanding:
+            size = len(ends)
+        else:
+            size = max(1, -(-ANCHOR_WINDOWS * window // step))
+        chunks = [
+            _window_moments(X, y, starts[i : i + size], ends[i : i + size])
+            for i in range(0, len(ends), size)
+        ]
+        x_mean, y_mean, cxx, cxy, cyy = (np.concatenate(parts) for parts in zip(*chunks))
+        counts = ends - starts
+
+        if self.fit_intercept_:
+            k = p + 1
+            coef, xtx_inv, solvable = solve_stacked(cxx, cxy, counts, k)
+            sse = cyy - np.einsum("gi,gi->g", coef, cxy)
+            intercept = y_mean - np.einsum("gi,gi->g", x_mean, coef)
+        else:
+            # raw (uncentered) cross-products of the window
+            k = p
+            xtx = cxx + counts[:, None, None] * x_mean[:, :, None] * x_mean[:, None, :]
+            xty = cxy + counts[:, None] * x_mean * y_mean[:, None]
+            yty = cyy + counts * y_mean * y_mean
+            coef, xtx_inv, solvable = solve_stacked(xtx, xty, counts, k)
+            sse = yty - np.einsum("gi,gi->g", coef, xty)
+            intercept = np.zeros(len(ends))
+        sse = np.maximum(sse, 0)
+
+        dfe = counts - k
+        std_err = stacked_std_err(
+            xtx_inv, sse, dfe, solvable, counts, x_mean if self.fit_intercept_ else None
+        )
+        return RollingModels(starts, ends, coef, intercept, std_err, sse, cyy, dfe)
+
+
+def _window_moments(X, y, starts, ends):
+    """
+    Returns the means and centered cross-products (x_mean, y_mean, cxx, cxy,
+    cyy) of the windows of rows [starts, ends), one row per window, from
+    running sums of the moments of the rows they span
+
+    The running sums start at the first row of the windows, and the data
+    is shifted by the mean of its first rows, so that the differences of
+    the sums are taken close to the local level of the data.
+    """
+    first, last = starts[0], ends[-1]
+    p = X.shape[1]
+    # row bounds of the segments whose sums make up the windows
+    bounds = np.union1d(starts, ends)
+    bounds = bounds[bounds < last] - first
+    lengths = np.diff(np.r_[bounds, last - first])
+    group_of_row = np.repeat(np.arange(len(bounds)), lengths)
+
+    head = first + next(row_blocks(last - first, p))[1]
+    x_shift = np.mean(dense_rows(X, first, head), axis=0)
+    y_shift = np.mean(y[first:head])
+
+    def moments(start, stop):
+        # a sparse X is densified one block of rows at a time
+        Xb = dense_rows(X, first + start, first + stop) - x_shift
+        yb = np.asarray(y[first + start : first + stop], dtype=np.float64) - y_shift
+        outer = Xb[:, :, None] * Xb[:, None, :]
+        return np.column_stack(
+            [Xb, yb, outer.reshape(len(Xb), -1), Xb * yb[:, None], yb * yb]
+        )
+
+    sums = _group_sums(moments, p * p + 2 * p + 2, bounds, group_of_row)
+    # running sums at each segment bound, and their differences per window
+    running = np.vstack([np.zeros(sums.shape[1]), np.cumsum(sums, axis=0)])
+    index = np.r_[bounds, last - first]
+    totals = (
+        running[np.searchsorted(index, ends - first)]
+        - running[np.searchsorted(index, starts - first)]
+    )
+
+    counts = ends - starts
+    sx = totals[:, :p]
+    sy = totals[:, p]
+    sxx = totals[:, p + 1 : p + 1 + p * p].reshape(-1, p, p)
+    sxy = totals[:, p + 1 + p * p : -1]
+    syy = totals[:, -1]
+
+    # statistics centered on the means of each window
+    x_mean = sx / counts[:, None]
+    y_mean = sy / counts
+    cxx = sxx - counts[:, None, None] * x_mean[:, :, None] * x_mean[:, None, :]
+    cxy = sxy - counts[:, None] * x_mean * y_mean[:, None]
+    cyy = np.maximum(syy - counts * y_mean * y_mean, 0)
+    return x_mean + x_shift, y_mean + y_shift, cxx, cxy, cyy
@@ -0,0 +1,259 @@
+import numpy as np
+
+CRITERIA = ("aic", "bic")
+
+
+def sweep(A, k, reverse=False):
+    """
+    Sweeps the symmetric matrix A on pivot k, in place
+
+    Starting from A = [[X^T X, X^T y], [y^T X, y^T y]], after sweeping the
+    pivots of a subset S of the features, A[-1, -1] is the residual sum of
+    squares of the regression on S, A[S, -1] its coefficients and -A[S, S]
+    the inverse of its Gram matrix. The reverse sweep (reverse=True) of a
+    swept pivot undoes its sweep, removing the feature from the regression.
+    """
+    d = A[k, k]
+    row = A[k].copy()
+    col = A[:, k].copy()
+    A -= np.outer(col, row) / d
+    sign = -1 if reverse else 1
+    A[k] = sign * row / d
+    A[:, k] = sign * col / d
+    A[k, k] = -1 / d
+
+
+class SubsetSelection:
+    """
+    Result of a feature subset selection
+
+    features: Indices of the selected features, in increasing order
+    feature_names: Names of the selected features
+    criterion: Name of the criterion ('aic' or 'bic')
+    value: Criterion of the selected subset (as given by the `aic`/`bic`
+           methods of a model fitted on these features only)
+    coef: Coefficients of the selected features
+    intercept: Intercept of the model on the selected features
+    path: List of (action, feature name, criterion) tuples: the steps taken
+          by stepwise selection, or the successive best subsets found by
+          best-subset search (action 'best', with the subset's feature names)
+    """
+
+    def __init__(self, features, feature_names, criterion, value, coef, intercept, path):
+        self.features = features
+        self.feature_names = feature_names
+        self.criterion = criterion
+        self.value = value
+        self.coef = coef
+        self.intercept = intercept
+        self.path = path
+
+    def __repr__(self):
+        return "Selected {} features by {}: {}".format(
+            len(self.features), self.criterion.upper(), ", ".join(self.feature_names)
+        )
+
+
+class Selection:
+    """
+    Methods for selecting a subset of the features by AIC or BIC
+
+    stepwise: Forward, backward or bidirectional stepwise selection
+    best_subset: Exact best-subset selection by branch and bound
+
+    Every candidate subset is evaluated from the cross-product matrix of the
+    fit with the sweep operator (O(p^2) per step, no refitting on the data).
+    """
+
+    def __init__():
+        pass
+
+    def stepwise(self, direction="both", criterion="aic"):
+        """
+        Selects features by stepwise addition and/or removal
+
+        Arguments:
+        direction: 'forward' starts from the intercept-only model and adds
+                   features, 'backward' starts from all the features and
+                   removes them, 'both' starts forward and also tries to
+                   remove a feature after each addition
+        criterion: 'aic' or 'bic'. A step is taken while it lowers the criterion
+
+        Returns:
+        A SubsetSelection object
+        """
+        assert direction in (
+            "forward",
+            "backward",
+            "both",
+        ), "direction must be 'forward', 'backward' or 'both'"
+        setup = self._selection_setup(criterion)
+        if setup is None:
+            return None
+        A, score, names, tol = setup
+        p = A.shape[0] - 1
+        selected = np.zeros(p, dtype=bool)
+        if direction == "backward":
+            for j in range(p):
+                self._sweep_if_safe(A, j, selected, tol)
+        current = score(A[-1, -1], selected.sum())
+        path = [("start", None, float(current))]
+
+        while True:
+            candidates = []
+            if direction != "backward":
+                for j in np.flatnonzero(~selected):
+                    if A[j, j] > tol[j]:
+                        rss = A[-1, -1] - A[j, -1] ** 2 / A[j, j]
+                        candidates.append((score(rss, selected.sum() + 1), "add", j))
+            if direction != "forward" and (direction == "backward" or len(path) > 1):
+                for j in np.flatnonzero(selected):
+                    rss = A[-1, -1] - A[j, -1] ** 2 / A[j, j]
+                    candidates.append((score(rss, selected.sum() - 1), "remove", j))
+            if not candidates:
+                break
+            value, action, j = min(candidates, key=lambda c: c[0])
+            if value >= current:
+                break
+            sweep(A, j, reverse=action == "remove")
+            selected[j] = action == "add"
+            current = value
+            path.append((action, names[j], float(value)))
+
+        return self._selection_result(A, selected, criterion, current, names, path)
+
+    def best_subset(self, criterion="bic"):
+        """
+        Finds the subset of features with the lowest AIC or BIC, exactly
+
+        Branch and bound over the subsets, removing features one at a time:
+        the residual sum of squares of a subset bounds from below that of all
+        its own subsets, so whole branches are discarded without being
+        evaluated. The search is exponential in the worst case; it is
+        practical for up to a few tens of features.
+
+        Arguments:
+        criterion: 'aic' or 'bic'
+
+        Returns:
+        A SubsetSelection object
+        """
+        setup = self._selection_setup(criterion)
+        if setup is None:
+            return None
+        A, score, names, tol = setup
+        p = A.shape[0] - 1
+        selected = np.zeros(p, dtype=bool)
+        for j in range(p):
+            self._sweep_if_safe(A, j, selected, tol)
+
+        best = {"value": score(A[-1, -1], selected.sum()), "selected": selected.copy()}
+        path = [
+            ("best", [names[j] for j in np.flatnonzero(selected)], float(best["value"]))
+        ]
+        # the stepwise solution is a good first incumbent: it prunes most branches
+        start = self.stepwise("both", criterion)
+        if start.value < best["value"]:
+            best["value"] = start.value
+            best["selected"] = np.isin(np.arange(p), start.features)
+            path.append(("best", start.feature_names, float(start.value)))
+
+        def search(removable):
+            # removable: features of the current subset that may still be removed
+            # in this branch; the other selected features are kept in all of it.
+            # Removing t of them increases the RSS by at least the t-th smallest
+            # single-feature increase, which bounds the criterion of the branch
+            if not removable:
+                return
+            increase = A[removable, -1] ** 2 / -A[removable, removable]
+            ranks = np.argsort(increase)
+            num_selected = selected.sum()
+            smallest = np.r_[0, increase[ranks]]
+            bound = min(
+                score(A[-1, -1] + smallest[t], num_selected - t)
+                for t in range(len(removable) + 1)
+            )
+            if bound >= best["value"]:
+                return
+            order = [removable[i] for i in ranks[::-1]]
+            for i, j in enumerate(order):
+                sweep(A, j, reverse=True)
+                selected[j] = False
+                value = score(A[-1, -1], selected.sum())
+                if value < best["value"]:
+                    best["value"] = value
+                    best["selected"] = selected.copy()
+                    path.append(
+                        ("best", [names[k] for k in np.flatnonzero(selected)], float(value))
+                    )
+                search(order[i + 1 :])
+                sweep(A, j)
+                selected[j] = True
+
+        search(list(np.flatnonzero(selected)))
+
+        # coefficients of the best subset, swept afresh from the cross-products
+        A = self._selection_setup(criterion)[0]
+        for j in np.flatnonzero(best["selected"]):
+            sweep(A, j)
+        return self._selection_result(
+            A, best["selected"], criterion, best["value"], names, path
+        )
+
+    def _selection_setup(self, criterion):
+        """
+        Returns the augmented cross-product matrix of the fit, the criterion
+        as a function of (residual sum of squares, number of features), the
+        feature names and the pivot tolerances below which a feature is taken
+        as collinear with the swept ones; or None if the model is not fitted
+        """
+        assert criterion in CRITERIA, "criterion must be one of {}".format(CRITERIA)
+        if not self.is_fitted:
+            print("Model not fitted yet!")
+            return None
+        suff = self._sufficient_stats()
+        assert np.ndim(suff.y_mean) == 0, "Subset selection supports a single target"
+        # number of observations (suff.n is the total weight of a weighted fit)
+        n = self._fit_stats()["n"]
+        p = len(suff.x_mean)
+        A = np.empty((p + 1, p + 1))
+        if self.fit_intercept_:
+            A[:p, :p], A[:p, p], A[p, p] = suff.cxx, suff.cxy, suff.cyy
+        else:
+            A[:p, :p], A[:p, p], A[p, p] = suff.xtx, suff.xty, suff.yty
+        A[p, :p] = A[:p, p]
+
+        penalty = 2.0 if criterion == "aic" else np.log(n)
+        llf_weights = self._llf_weights()
+        intercept = 1 if self.fit_intercept_ else 0
+
+        def score(rss, num_features):
+            rss = max(rss, np.finfo(float).tiny)
+            llf = -n / 2 * (np.log(2 * np.pi) + np.log(rss / n) + 1) + llf_weights
+            return -2 * llf + penalty * (num_features + intercept)
+
+        names = getattr(self, "feature_names_", None)
+        if names is None:
+            names = ["X[{}]".format(j) for j in range(p)]
+        tol = 1e-10 * np.diag(A)[:p]
+        return A, score, list(names), tol
+
+    @staticmethod
+    def _sweep_if_safe(A, j, selected, tol):
+        """Sweeps pivot j unless the feature is collinear with the swept ones"""
+        if A[j, j] > tol[j]:
+            sweep(A, j)
+            selected[j] = True
+
+    def _selection_result(self, A, selected, criterion, value, names, path):
+        """Builds the SubsetSelection of the swept subset `selected`"""
+        features = np.flatnonzero(selected)
+        coef = A[features, -1].copy()
+        if self.fit_intercept_:
+            suff = self._sufficient_stats()
+            intercept = float(suff.y_mean - np.dot(suff.x_mean[features], coef))
+        else:
+            intercept = 0.0
+        return SubsetSelection(
+            features, [names[j] for j in features], criterion, value, coef, intercept, path
+        )
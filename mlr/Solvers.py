@@ -0,0 +1,587 @@
+import numpy as np
+from mlr.Sparse import is_sparse, sparse_cross_products, SPARSE_GRAM_MAX_FEATURES
+
+SOLVERS = ("auto", "cholesky", "qr", "svd", "lstsq", "cg", "lsqr", "lsmr", "sgd")
+# Solvers that never form nor factorize X^T X, only use products with X and X^T
+# (or minibatches of rows, for 'sgd')
+ITERATIVE_SOLVERS = ("cg", "lsqr", "lsmr", "sgd")
+
+# Largest condition number of X for which the normal equations (Cholesky)
+# are used by the 'auto' solver. Cholesky squares the condition number, so
+# this keeps the relative error of the coefficients around 1e-8.
+CHOLESKY_MAX_COND = 1e4
+# Largest condition number of X for which 'auto' uses QR before falling
+# back to the rank-revealing SVD
+QR_MAX_COND = 1e10
+
+# Default stopping tolerance of the iterative solvers, and of SGD (whose
+# gradient noise does not allow as tight a tolerance)
+ITERATIVE_TOL = 1e-10
+SGD_TOL = 1e-4
+# Default maximum number of epochs of SGD
+SGD_MAX_EPOCHS = 100
+
+# Size in bytes of the row blocks in which large arrays are processed: small
+# enough for a block and its temporaries to stay in cache, large enough for BLAS
+BLOCK_BYTES = 2 ** 22
+
+
+def row_blocks(n, num_columns, itemsize=8, block_bytes=None):
+    """
+    Yields (start, stop) bounds of row blocks of about BLOCK_BYTES each
+
+    Arguments:
+    n: Number of rows
+    num_columns: Number of columns of the array read by blocks
+    itemsize: Size in bytes of one element
+    block_bytes: Size in bytes of a block, if not BLOCK_BYTES
+    """
+    block_bytes = BLOCK_BYTES if block_bytes is None else block_bytes
+    block_rows = max(1, block_bytes // (max(num_columns, 1) * itemsize))
+    for start in range(0, n, block_rows):
+        yield start, min(start + block_rows, n)
+
+
+def centered_cross_products(X, y, x_mean, y_mean, weights=None):
+    """
+    Returns Xc^T Xc and Xc^T yc for the data centered on the given means,
+    centering one row block at a time instead of copying X
+
+    Arguments:
+    X: 2D numpy array
+    y: 1D numpy array (2D for several targets), or None to compute only Xc^T Xc
+    x_mean: Column means of X, or None not to center
+    y_mean: Mean of y (or None, not centering)
+    weights: Optional observation weights w: the rows of each block are
+             scaled by sqrt(w), giving Xc^T W Xc and Xc^T W yc
+    """
+    n, p = X.shape
+    xtx = np.zeros((p, p))
+    xty = None if y is None else np.zeros((p,) + np.shape(y)[1:])
+    root = None if weights is None else np.sqrt(weights)
+    for start, stop in row_blocks(n, p, X.dtype.itemsize):
+        Xb, yb = _prepared_block(X, y, start, stop, x_mean, y_mean, root)
+        xtx += np.dot(Xb.T, Xb)
+        if y is not None:
+            xty += np.dot(Xb.T, yb)
+    return xtx, xty
+
+
+def blocked_qr(X, y, x_mean=None, y_mean=None, weights=None):
+    """
+    Returns the R factor of the QR decomposition of X and Q^T y, computed
+    by row blocks (TSQR): each block is stacked under the R factor of the
+    blocks before it and factorized again. Memory is O(p^2) plus one block,
+    so a memory-mapped X is never loaded nor copied, and the accuracy is
+    that of QR (error proportional to cond(X), not cond(X)^2 as for X^T X)
+
+    Arguments:
+    X: 2D numpy array or memmap
+    y: 1D numpy array, or 2D array of shape (n, k)
+    x_mean, y_mean: Means to center on, or None
+    weights: Optional observation weights, scaling the rows by sqrt(w)
+    """
+    n, p = X.shape
+    root = None if weights is None else np.sqrt(weights)
+    R = np.zeros((0, p))
+    qty = np.zeros((0,) + np.shape(y)[1:])
+    for start, stop in row_blocks(n, p, X.dtype.itemsize):
+        Xb, yb = _prepared_block(X, y, start, stop, x_mean, y_mean, root)
+        Q, R = np.linalg.qr(np.concatenate([R, Xb]))
+        qty = np.dot(Q.T, np.concatenate([qty, yb]))
+    return R, qty
+
+
+def _prepared_block(X, y, start, stop, x_mean, y_mean, root):
+    """
+    Returns rows [start, stop) of X (as float64) and y, centered on the
+    given means (if not None) and scaled by the square roots of the weights
+    `root` (if not None)
+    """
+    Xb = np.asarray(X[start:stop], dtype=np.float64)
+    yb = None if y is None else np.asarray(y[start:stop], dtype=np.float64)
+    if x_mean is not None:
+        Xb = Xb - x_mean
+        if yb is not None:
+            yb = yb - y_mean
+    if root is not None:
+        Xb = Xb * root[start:stop, None]
+        if yb is not None:
+            yb = yb * root[start:stop].reshape((-1,) + (1,) * (yb.ndim - 1))
+    return Xb, yb
+
+
+def _solve_triangular(R, b, trans=0):
+    """Solves R x = b (trans=0) or R^T x = b (trans=1) for upper triangular R"""
+    from scipy.linalg import solve_triangular
+
+    return solve_triangular(R, b, trans=trans, lower=False, check_finite=False)
+
+
+class Factorization:
+    """
+    Factorization of the Gram matrix X^T X of a fitted design matrix
+
+    Kept after the fit so that the downstream statistics (standard errors,
+    leverage, etc.) reuse it instead of inverting X^T X again.
+
+    method: 'cholesky' or 'qr' store an upper triangular R with R^T R = X^T X
+            'svd' stores the singular values s and right singular vectors Vt
+            of X, so that X^T X = Vt^T diag(s^2) Vt
+    """
+
+    def __init__(self, method, R=None, s=None, Vt=None, rcond=None):
+        self.method = method
+        self.R = R
+        self.s = s
+        self.Vt = Vt
+        # relative cutoff below which singular values are numerically null
+        self.rcond = rcond
+        self._inverse = None
+
+    @classmethod
+    def from_gram(cls, xtx):
+        """
+        Factorizes a Gram matrix directly, using Cholesky if it is positive
+        definite and a (pseudo-inverting) eigen-decomposition otherwise
+        """
+        try:
+            return cls("cholesky", R=np.linalg.cholesky(xtx).T)
+        except np.linalg.LinAlgError:
+            return cls.from_gram_eigh(xtx)
+
+    @classmethod
+    def from_gram_eigh(cls, xtx):
+        """
+        Factorizes a Gram matrix by eigen-decomposition, which gives the
+        singular values and right singular vectors of X
+
+        The eigenvalues are accurate to about eps times the largest one, so
+        the singular values to about sqrt(eps) times the largest one, which
+        is the cutoff of the numerically null ones
+        """
+        eigvals, eigvecs = np.linalg.eigh(xtx)
+        order = np.argsort(eigvals)[::-1]
+        s = np.sqrt(np.clip(eigvals[order], 0, None))
+        return cls("svd", s=s, Vt=eigvecs[:, order].T, rcond=_gram_rcond(len(s)))
+
+    def _s_inv(self):
+        """Inverse singular values, with the numerically null ones set to zero"""
+        rcond = np.finfo(float).eps * len(self.s) if self.rcond is None else self.rcond
+        cutoff = rcond * self.s[0]
+        s_inv = np.zeros_like(self.s)
+        mask = self.s > cutoff
+        s_inv[mask] = 1 / self.s[mask]
+        return s_inv
+
+    @property
+    def rank(self):
+        """Numerical rank of the design matrix"""
+        if self.R is not None:
+            return self.R.shape[0]
+        return int(np.count_nonzero(self._s_inv()))
+
+    def condition_number(self):
+        """Returns the 2-norm condition number of the design matrix"""
+        if self.R is not None:
+            return np.linalg.cond(self.R)
+        if self.s[-1] == 0:
+            return np.inf
+        return self.s[0] / self.s[-1]
+
+    def gram(self):
+        """Returns the Gram matrix X^T X rebuilt from the factors"""
+        if self.R is not None:
+            return np.dot(self.R.T, self.R)
+        scaled = self.Vt.T * self.s
+        return np.dot(scaled, scaled.T)
+
+    def solve(self, b):
+        """Solves the normal equations (X^T X) x = b"""
+        if self.R is not None:
+            return _solve_triangular(self.R, _solve_triangular(self.R, b, trans=1))
+        s_inv = self._s_inv()
+        if b.ndim == 1:
+            return np.dot(self.Vt.T, s_inv ** 2 * np.dot(self.Vt, b))
+        return np.dot(self.Vt.T, (s_inv ** 2)[:, None] * np.dot(self.Vt, b))
+
+    def row_leverage(self, X_rows):
+        """
+        Returns the leverage x_i^T (X^T X)^-1 x_i of the given rows of the design
+        matrix, i.e. the squared norms of the rows of the thin Q factor
+        (Q = X R^-1), without forming Q or the n x n hat matrix
+        """
+        if self.R is not None:
+            Q_rows = _solve_triangular(self.R, X_rows.T, trans=1)
+            return np.sum(Q_rows * Q_rows, axis=0)
+        Q_rows = np.dot(X_rows, self.Vt.T) * self._s_inv()
+        return np.sum(Q_rows * Q_rows, axis=1)
+
+    def inverse(self):
+        """Returns (X^T X)^-1 (the pseudo-inverse for rank deficient designs)"""
+        if self._inverse is None:
+            if self.R is not None:
+                R_inv = _solve_triangular(self.R, np.eye(self.R.shape[0]))
+                self._inverse = np.dot(R_inv, R_inv.T)
+            else:
+                scaled = self.Vt.T * self._s_inv()
+                self._inverse = np.dot(scaled, scaled.T)
+        return self._inverse
+
+
+class InterceptFactorization:
+    """
+    Factorization of the Gram matrix of [1, X], built from the factorization
+    of the centered X^T X (the columns of X centered on their means)
+
+    Block elimination of the intercept gives the solve and the inverse
+    exactly, without ever forming the Gram matrix of [1, X].
+    """
+
+    def __init__(self, centered, n, x_mean):
+        self.centered = centered
+        self.method = centered.method
+        self.n = n
+        self.x_mean = x_mean
+        self._inverse = None
+
+    @property
+    def rank(self):
+        """Numerical rank of the design matrix (including the intercept)"""
+        return self.centered.rank + 1
+
+    def condition_number(self):
+        """Returns the 2-norm condition number of the centered design matrix"""
+        return self.centered.condition_number()
+
+    def row_leverage(self, X_rows):
+        """Returns the leverage of the given rows of X (without the ones column)"""
+        return 1 / self.n + self.centered.row_leverage(X_rows - self.x_mean)
+
+    def solve(self, b):
+        """Solves the normal equations of [1, X], with the intercept first"""
+        x1 = self.centered.solve(b[1:] - np.multiply.outer(self.x_mean, b[0]))
+        x0 = b[0] / self.n - np.dot(self.x_mean, x1)
+        return np.concatenate([np.asarray(x0)[None], x1])
+
+    def inverse(self):
+        """Returns the inverse of the Gram matrix of [1, X], intercept first"""
+        if self._inverse is None:
+            C = self.centered.inverse()
+            Cm = np.dot(C, self.x_mean)
+            p = len(self.x_mean)
+            inverse = np.empty((p + 1, p + 1))
+            inverse[0, 0] = 1 / self.n + np.dot(self.x_mean, Cm)
+            inverse[0, 1:] = -Cm
+            inverse[1:, 0] = -Cm
+            inverse[1:, 1:] = C
+            self._inverse = inverse
+        return self._inverse
+
+
+def select_solver(n, p, cond):
+    """
+    Picks a solver from the shape and the condition number of the design matrix
+
+    Arguments:
+    n: Number of observations
+    p: Number of columns of the design matrix
+    cond: Condition number of the design matrix
+    """
+    if n < p or not np.isfinite(cond) or cond > QR_MAX_COND:
+        return "svd"
+    if cond > CHOLESKY_MAX_COND:
+        return "qr"
+    return "cholesky"
+
+
+def solve_least_squares(
+    X,
+    y,
+    solver="auto",
+    x_mean=None,
+    y_mean=None,
+    tol=None,
+    max_iter=None,
+    callback=None,
+    weights=None,
+):
+    """
+    Solves the least squares problem min ||X b - y|| without inverting X^T X
+
+    Arguments:
+    X: 2D numpy array, the design matrix, or scipy.sparse matrix
+    y: 1D numpy array, the target, or 2D array of shape (n, k) to solve
+       k targets with a single factorization
+    solver: One of 'auto', 'cholesky', 'qr', 'svd', 'lstsq', 'lsqr', 'lsmr'.
+            'auto' forms X^T X and uses Cholesky if the problem is well
+            conditioned, QR if it is moderately ill-conditioned and SVD
+            for (nearly) rank deficient or under-determined problems.
+            'cholesky' and 'qr' raise LinAlgError for a rank deficient X
+            or fewer observations than columns.
+            'cg', 'lsqr', 'lsmr' and 'sgd' are iterative (see `solve_iterative`).
+            A sparse X is solved from its Gram matrix ('qr' and 'lstsq' then
+            behave as 'auto'), or with LSMR under 'auto' when it has more
+            than SPARSE_GRAM_MAX_FEATURES columns
+    x_mean, y_mean: If given, the problem is solved for X and y centered on
+            these means (the intercept is then eliminated by the caller).
+            The Cholesky path centers X by row blocks, never copying it;
+            only QR and SVD, which overwrite their input, need a centered copy.
+            For a memory-mapped X, they factorize it by row blocks instead
+            (see `blocked_qr`), so that X is never loaded into memory.
+    tol, max_iter, callback: Options of the iterative solvers, see `solve_iterative`
+    weights: Optional observation weights w, solving min ||W^1/2 (X b - y)||
+             (weighted least squares). The rows are scaled by sqrt(w) block by
+             block (Cholesky) or on the fly (iterative solvers), without a
+             copy of X; QR and SVD scale the copy they make anyway
+
+    Returns:
+    A tuple (coef, factorization, solver) where solver is the method actually
+    used. The factorization is None for the iterative solvers
+    """
+    assert solver in SOLVERS, "solver must be one of {}".format(SOLVERS)
+    n, p = X.shape
+    center = x_mean is not None
+    requested = solver
+
+    if is_sparse(X) and solver == "auto" and p > SPARSE_GRAM_MAX_FEATURES:
+        solver = "lsmr"
+    if solver in ITERATIVE_SOLVERS:
+        coef = solve_iterative(
+            X, y, solver, x_mean, y_mean, tol, max_iter, callback, weights
+        )
+        return coef, None, solver
+    if is_sparse(X):
+        xtx, xty = sparse_cross_products(X, y, x_mean, y_mean, weights)
+        return solve_gram(xtx, xty, solver=solver)
+
+    if solver in ("auto", "cholesky"):
+        factor = None
+        if n >= p:
+            if center or weights is not None or isinstance(X, np.memmap):
+                # by row blocks, in float64 whatever the dtype of X
+                xtx, xty = centered_cross_products(X, y, x_mean, y_mean, weights)
+            else:
+                xtx, xty = np.dot(X.T, X), np.dot(X.T, y)
+            try:
+                factor = Factorization("cholesky", R=np.linalg.cholesky(xtx).T)
+            except np.linalg.LinAlgError:
+                if solver == "cholesky":
+                    raise np.linalg.LinAlgError(
+                        "X^T X is not positive definite, use solver='qr' or 'svd'"
+                    )
+        elif solver == "cholesky":
+            raise np.linalg.LinAlgError(
+                "X^T X is singular for fewer observations than columns, use solver='svd'"
+            )
+        if solver == "cholesky":
+            return factor.solve(xty), factor, solver
+        cond = np.inf if factor is None else factor.condition_number()
+        solver = select_solver(n, p, cond)
+        if solver == "cholesky":
+            return factor.solve(xty), factor, solver
+    if solver == "qr" and n < p:
+        raise np.linalg.LinAlgError(
+            "X has fewer observations than columns, use solver='svd'"
+        )
+
+    if isinstance(X, np.memmap) and n >= p:
+        R, qty = blocked_qr(X, y, x_mean, y_mean, weights)
+        if solver == "qr" and _qr_rank_deficient(R, n):
+            if requested == "qr":
+                raise np.linalg.LinAlgError("X is rank deficient, use solver='svd'")
+            solver = "svd"
+        return _solve_from_qr(R, qty, solver)
+
+    if center:
+        X = X - x_mean
+        y = y - y_mean
+    if weights is not None:
+        root = np.sqrt(weights)
+        X = X * root[:, None]
+        y = y * root.reshape((-1,) + (1,) * (y.ndim - 1))
+
+    if solver == "qr":
+        Q, R = np.linalg.qr(X)
+        if not _qr_rank_deficient(R, n):
+            factor = Factorization("qr", R=R)
+            return _solve_triangular(R, np.dot(Q.T, y)), factor, solver
+        if requested == "qr":
+            raise np.linalg.LinAlgError("X is rank deficient, use solver='svd'")
+        # 'auto' falls back to the rank-revealing SVD
+        solver = "svd"
+
+    if solver == "svd":
+        U, s, Vt = np.linalg.svd(X, full_matrices=False)
+        factor = Factorization("svd", s=s, Vt=Vt)
+        s_inv = factor._s_inv()
+        if y.ndim > 1:
+            s_inv = s_inv[:, None]
+        coef = np.dot(Vt.T, s_inv * np.dot(U.T, y))
+        return coef, factor, solver
+
+    # lstsq: LAPACK's divide-and-conquer driver, factorization taken from X^T X
+    coef, _, rank, _ = np.linalg.lstsq(X, y, rcond=None)
+    if rank < p:
+        # X^T X may pass Cholesky in rounding: keep the rank found by lstsq
+        _, s, Vt = np.linalg.svd(X, full_matrices=False)
+        return coef, Factorization("svd", s=s, Vt=Vt), solver
+    return coef, Factorization.from_gram(np.dot(X.T, X)), solver
+
+
+def _gram_rcond(p):
+    """
+    Relative cutoff of the numerically null singular values of X when they
+    are computed from X^T X (of size p x p) rather than from X
+    """
+    return np.sqrt(np.finfo(float).eps * p)
+
+
+def _qr_rank_deficient(R, n):
+    """
+    Whether the R factor of a (non-pivoted) QR decomposition of an n-row X
+    has a numerically null diagonal entry, relative to the largest one
+    """
+    diag = np.abs(np.diag(R))
+    return diag.min() <= np.finfo(float).eps * max(n, len(diag)) * diag.max()
+
+
+def _solve_from_qr(R, qty, solver):
+    """
+    Solves the least squares problem from the R factor of the QR decomposition
+    of X and Q^T y, by 'qr' (back substitution), or 'svd' or 'lstsq' (on R,
+    whose singular values and right singular vectors are those of X)
+
+    Returns:
+    A tuple (coef, factorization, solver)
+    """
+    if solver == "qr":
+        return _solve_triangular(R, qty), Factorization("qr", R=R), solver
+    U, s, Vt = np.linalg.svd(R, full_matrices=False)
+    factor = Factorization("svd", s=s, Vt=Vt)
+    if solver == "lstsq":
+        return np.linalg.lstsq(R, qty, rcond=None)[0], factor, solver
+    s_inv = factor._s_inv()
+    if qty.ndim > 1:
+        s_inv = s_inv[:, None]
+    return np.dot(Vt.T, s_inv * np.dot(U.T, qty)), factor, solver
+
+
+def solve_iterative(
+    X,
+    y,
+    solver="lsmr",
+    x_mean=None,
+    y_mean=None,
+    tol=None,
+    max_iter=None,
+    callback=None,
+    weights=None,
+):
+    """
+    Solves the least squares problem iteratively, without forming X^T X:
+    memory O(n + p) instead of O(p^2), and no O(p^3) factorization. X is
+    never copied nor densified (centering is applied implicitly), and its
+    columns are scaled to unit norm for all the solvers (Jacobi preconditioning)
+
+    Arguments:
+    X: 2D numpy array, numpy memmap or scipy.sparse matrix
+    y: 1D numpy array, or 2D array of shape (n, k), one solve per target
+    solver: One of
+            'cg': conjugate gradient on the normal equations (CGLS)
+            'lsqr': LSQR, the numerically stable equivalent of 'cg'
+            'lsmr': LSMR (from SciPy), whose residual of the normal equations
+                    decreases monotonically, safer to stop early
+            'sgd': minibatch stochastic gradient descent with averaging, over
+                   row blocks of X (one pass over the data per epoch)
+    x_mean, y_mean: If given, the problem is solved for X and y centered on them
+    tol: Stopping tolerance, ITERATIVE_TOL by default (SGD_TOL for 'sgd'):
+         on the relative residual of the normal equations ('cg', 'lsqr',
+         'lsmr', also stopping on the relative residual for the last two),
+         also for 'sgd', whose averaged solution is tested once per epoch
+    max_iter: Maximum number of iterations (epochs for 'sgd'). By default,
+              2 p for 'cg' and 'lsqr', min(n, p) for 'lsmr', SGD_MAX_EPOCHS for 'sgd'
+    callback: Function called as callback(iteration, coef, residual_norm)
+              after every iteration (every epoch for 'sgd'; once at the end
+              for 'lsmr', which SciPy runs to completion), with the current
+              coefficients of the features (without intercept) and norm of
+              the residuals. For several targets, they are solved in turn
+    weights: Optional observation weights (weighted least squares), applied
+             as sqrt(w) row scaling inside the products with X
+
+    Returns:
+    The coefficients
+    """
+    from mlr.Iterative import DesignOperator, conjugate_gradient, lsqr, minibatch_sgd
+
+    n, p = X.shape
+    if tol is None:
+        tol = SGD_TOL if solver == "sgd" else ITERATIVE_TOL
+    # all the solvers work on the columns scaled to unit norm (Jacobi
+    # preconditioning), which often saves orders of magnitude of iterations
+    root = None if weights is None else np.sqrt(weights)
+    A = DesignOperator(X, x_mean, row_scale=root)
+    scale = A.jacobi_scaling()
+    A.column_scale = scale
+    if callback is not None:
+        user_callback = callback
+
+        def callback(iteration, x, residual_norm):
+            user_callback(iteration, scale * x, residual_norm)
+
+    b = y if y_mean is None else y - y_mean
+    columns = b.reshape(n, -1)
+    if root is not None:
+        columns = columns * root[:, None]
+    coef = np.empty((p, columns.shape[1]))
+    for j in range(columns.shape[1]):
+        if solver == "lsmr":
+            from scipy.sparse.linalg import LinearOperator, lsmr
+
+            operator = LinearOperator(
+                (n, p), matvec=A.matvec, rmatvec=A.rmatvec, dtype=np.float64
+            )
+            result = lsmr(operator, columns[:, j], atol=tol, btol=tol, maxiter=max_iter)
+            coef[:, j] = result[0]
+            if callback is not None:
+                callback(result[2], result[0], result[3])
+        elif solver == "sgd":
+            epochs = SGD_MAX_EPOCHS if max_iter is None else max_iter
+            coef[:, j] = minibatch_sgd(A, columns[:, j], tol, epochs, callback)[0]
+        else:
+            method = conjugate_gradient if solver == "cg" else lsqr
+            iterations = 2 * p if max_iter is None else max_iter
+            coef[:, j] = method(A, columns[:, j], tol, iterations, callback)[0]
+    coef *= scale[:, None]
+    return coef[:, 0] if np.ndim(y) == 1 else coef
+
+
+def solve_gram(xtx, xty, solver="auto"):
+    """
+    Solves the normal equations (X^T X) b = X^T y when only the Gram matrix
+    is available (e.g. accumulated from chunks of data)
+
+    Arguments:
+    xtx: 2D numpy array, the Gram matrix X^T X
+    xty: Numpy array, X^T y
+    solver: 'cholesky' or 'svd' (eigen-decomposition of X^T X) are honoured,
+            any other choice behaves as 'auto' and uses Cholesky, falling
+            back to the eigen-decomposition for (nearly) singular problems
+
+    Returns:
+    A tuple (coef, factorization, solver) where solver is the method actually used
+    """
+    assert solver in SOLVERS, "solver must be one of {}".format(SOLVERS)
+    if solver != "svd":
+        try:
+            factor = Factorization("cholesky", R=np.linalg.cholesky(xtx).T)
+            # beyond 1 / rcond, X^T X is singular up to its rounding errors
+            if solver == "cholesky" or factor.condition_number() * _gram_rcond(len(xtx)) < 1:
+                return factor.solve(xty), factor, "cholesky"
+        except np.linalg.LinAlgError:
+            if solver == "cholesky":
+                raise np.linalg.LinAlgError(
+                    "X^T X is not positive definite, use solver='svd'"
+                )
+    factor = Factorization.from_gram_eigh(xtx)
+    return factor.solve(xty), factor, "svd"
@@ -0,0 +1,83 @@
+import sys
+import numpy as np
+
+# Largest number of features for which the 'auto' solver solves a sparse
+# design from its Gram matrix (densified, p x p); wider designs use LSMR
+SPARSE_GRAM_MAX_FEATURES = 2048
+
+
+def is_sparse(X):
+    """
+    True if X is a scipy.sparse matrix or array
+
+    SciPy is not imported for the check: if scipy.sparse was never imported,
+    X cannot be one of its matrices.
+    """
+    sparse = sys.modules.get("scipy.sparse")
+    return sparse is not None and sparse.issparse(X)
+
+
+def as_compressed(X):
+    """Returns X itself if it is in CSR or CSC format, else converted to CSR"""
+    if X.format in ("csr", "csc"):
+        return X
+    return X.tocsr()
+
+
+def column_means(X, weights=None):
+    """
+    Returns the column means of a dense or sparse 2D array, as a 1D array
+
+    Arguments:
+    X: 2D numpy array (or memmap), or scipy.sparse matrix
+    weights: Optional observation weights, for weighted means
+    """
+    if weights is not None:
+        return np.asarray(X.T @ weights, dtype=np.float64).ravel() / np.sum(weights)
+    if is_sparse(X):
+        return np.asarray(X.mean(axis=0)).ravel()
+    return np.mean(X, axis=0, dtype=np.float64)
+
+
+def sparse_cross_products(X, y, x_mean=None, y_mean=None, weights=None):
+    """
+    Returns X^T X (dense) and X^T y for a sparse X, centered on the given
+    means by a rank-one correction instead of centering (densifying) X
+
+    The correction loses precision for columns with large means relative to
+    their spread, which sparse (e.g. one-hot) columns do not have.
+
+    Arguments:
+    X: scipy.sparse matrix
+    y: 1D or 2D numpy array, or None to compute only X^T X
+    x_mean, y_mean: Means to center on (weighted means, if weighted), or None
+                    for the raw cross-products
+    weights: Optional observation weights w, giving X^T W X and X^T W y
+    """
+    n = X.shape[0]
+    total = n
+    WX = X
+    if weights is not None:
+        total = np.sum(weights)
+        WX = X.multiply(weights[:, None]).tocsr()
+    xtx = (X.T @ WX).toarray()
+    xty = None if y is None else np.asarray(WX.T @ y)
+    if x_mean is not None:
+        xtx -= total * np.outer(x_mean, x_mean)
+        if y is not None:
+            xty = xty - total * np.multiply.outer(x_mean, y_mean)
+    return xtx, xty
+
+
+def dense_rows(X, start, stop, dtype=np.float64):
+    """Returns rows [start, stop) of a dense, memory-mapped or sparse X as a dense array"""
+    if is_sparse(X):
+        return X[start:stop].toarray().astype(dtype, copy=False)
+    return np.asarray(X[start:stop], dtype=dtype)
+
+
+def dense_column(X, i):
+    """Returns column i of a dense, memory-mapped or sparse X as a 1D array"""
+    if is_sparse(X):
+        return X[:, [i]].toarray().ravel()
+    return np.asarray(X[:, i])
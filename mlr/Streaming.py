@@ -0,0 +1,453 @@
+import numpy as np
+from mlr.Solvers import solve_gram, row_blocks, InterceptFactorization
+from mlr.Sparse import is_sparse, column_means, sparse_cross_products
+
+# Largest condition number of a fit whose sufficient statistics are rebuilt
+# from its factorization instead of from the data
+REBUILD_MAX_CONDITION = 1e4
+
+def load_array(source, dtype=np.float64, num_features=None):
+    """
+    Opens an array for out-of-core use without reading it into memory
+
+    Arguments:
+    source: A numpy array (returned as is), a path to a .npy file (memory-mapped
+            read-only), or a path to a raw binary file of `dtype` values
+    dtype: Data type of a raw binary file
+    num_features: Number of columns of a raw binary file holding a 2D array
+    """
+    if not isinstance(source, str):
+        return source
+    if source.endswith(".npy"):
+        return np.load(source, mmap_mode="r")
+    data = np.memmap(source, dtype=dtype, mode="r")
+    if num_features is not None:
+        data = data.reshape(-1, num_features)
+    return data
+
+
+class SufficientStats:
+    """
+    Sufficient statistics of a least squares problem, accumulated chunk by chunk
+
+    Holds the number of observations, the column means of X and y and the
+    centered cross-product matrices Xc^T Xc, Xc^T yc and yc^T yc. Chunks are
+    merged with the pairwise update of Chan et al., which is numerically
+    stable where accumulating the raw X^T X and column sums is not.
+    For weighted observations, `n` is the total weight, the means are
+    weighted and the cross-products are Xc^T W Xc, Xc^T W yc and yc^T W yc,
+    while `count` keeps the number of observations (for the degrees of
+    freedom) and `log_weight_sum` the sum of log w over the positive
+    weights (for the log-likelihood). Unweighted, `count` equals `n`, and
+    `weighted` tells whether any chunk came with weights.
+    Memory is proportional to p^2, whatever the number of observations.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.count = 0
+        self.weighted = False
+        self.log_weight_sum = 0.0
+        self.x_mean = None
+        self.y_mean = None
+        self.cxx = None
+        self.cxy = None
+        self.cyy = None
+
+    @classmethod
+    def from_arrays(cls, X, y, weights=None):
+        """
+        Computes the statistics of a single chunk of data
+
+        Arguments:
+        X: 2D numpy array, or scipy.sparse matrix
+        y: 1D numpy array
+        weights: Optional 1D array of observation weights
+        """
+        if is_sparse(X):
+            return cls.from_sparse(X, y, weights)
+        stats = cls._counted(X.shape[0], weights)
+        if weights is None:
+            stats.n = X.shape[0]
+            stats.x_mean = np.mean(X, axis=0)
+            stats.y_mean = np.mean(y, axis=0)
+        else:
+            stats.n = np.sum(weights)
+            if stats.n == 0:
+                return stats
+            stats.x_mean = np.dot(weights, X) / stats.n
+            stats.y_mean = np.tensordot(weights, y, axes=1) / stats.n
+        Xc = X - stats.x_mean
+        yc = y - stats.y_mean
+        # Xc^T W Xc as (W^1/2 Xc)^T (W^1/2 Xc)
+        if weights is not None:
+            root = np.sqrt(weights).reshape(-1, 1)
+            Xc *= root
+            yc = yc * root.reshape((-1,) + (1,) * (yc.ndim - 1))
+        stats.cxx = np.dot(Xc.T, Xc)
+        stats.cxy = np.dot(Xc.T, yc)
+        stats.cyy = np.sum(yc * yc, axis=0)
+        return stats
+
+    @classmethod
+    def from_sparse(cls, X, y, weights=None):
+        """
+        Computes the statistics of a scipy.sparse X (and dense y) from the
+        sparse product X^T X, without densifying X
+        """
+        stats = cls._counted(X.shape[0], weights)
+        if weights is None:
+            stats.n = X.shape[0]
+            stats.y_mean = np.mean(y, axis=0)
+        else:
+            stats.n = np.sum(weights)
+            if stats.n == 0:
+                return stats
+            stats.y_mean = np.tensordot(weights, y, axes=1) / stats.n
+        stats.x_mean = column_means(X, weights)
+        stats.cxx, stats.cxy = sparse_cross_products(
+            X, y, stats.x_mean, stats.y_mean, weights
+        )
+        yc = y - stats.y_mean
+        wyc = yc if weights is None else yc * weights.reshape((-1,) + (1,) * (yc.ndim - 1))
+        stats.cyy = np.sum(wyc * yc, axis=0)
+        return stats
+
+    @classmethod
+    def _counted(cls, count, weights):
+        """Empty statistics holding the observation count and log-weight sum of a chunk"""
+        stats = cls()
+        stats.count = count
+        if weights is not None:
+            stats.weighted = True
+            stats.log_weight_sum = np.sum(np.log(weights[weights > 0]))
+        return stats
+
+    def copy(self):
+        """
+        Returns a copy of the statistics, which `add`, `merge`, `remove` and
+        `subtract` update without changing the original
+        """
+        other = SufficientStats()
+        other.__dict__.update(self.__dict__)
+        return other
+
+    def add(self, X, y, weights=None):
+        """
+        Accumulates a chunk of data (X: 2D numpy array, y: 1D numpy array,
+        weights: optional 1D array of observation weights)
+        """
+        self.merge(SufficientStats.from_arrays(X, y, weights))
+
+    def merge(self, other):
+        """Merges the statistics of another (disjoint) set of observations"""
+        self.count += other.count
+        self.weighted = self.weighted or other.weighted
+        self.log_weight_sum += other.log_weight_sum
+        if other.n == 0:
+            # no observations, or only ones of zero weight
+            return
+        if self.n == 0:
+            self.n = other.n
+            self.x_mean = other.x_mean
+            self.y_mean = other.y_mean
+            self.cxx = other.cxx
+            self.cxy = other.cxy
+            self.cyy = other.cyy
+            return
+        n = self.n + other.n
+        dx = other.x_mean - self.x_mean
+        dy = other.y_mean - self.y_mean
+        w = self.n * other.n / n
+        self.cxx = self.cxx + other.cxx + w * np.outer(dx, dx)
+        self.cxy = self.cxy + other.cxy + w * np.multiply.outer(dx, dy)
+        self.cyy = self.cyy + other.cyy + w * dy * dy
+        self.x_mean = self.x_mean + dx * (other.n / n)
+        self.y_mean = self.y_mean + dy * (other.n / n)
+        self.n = n
+
+    def remove(self, X, y, weights=None):
+        """
+        Removes a chunk of data accumulated before (X: 2D numpy array,
+        y: 1D numpy array, weights: the weights it was accumulated with)
+        """
+        self.subtract(SufficientStats.from_arrays(X, y, weights))
+
+    def subtract(self, other):
+        """
+        Removes the statistics of a subset of the observations, reversing `merge`
+        """
+        if other.count == 0:
+            return
+        if other.count >= self.count or other.n >= self.n > 0:
+            raise ValueError("Cannot remove as many observations as were accumulated")
+        self.count -= other.count
+        self.log_weight_sum -= other.log_weight_sum
+        if other.n == 0:
+            return
+        n = self.n - other.n
+        x_mean = self.x_mean + (self.x_mean - other.x_mean) * (other.n / n)
+        y_mean = self.y_mean + (self.y_mean - other.y_mean) * (other.n / n)
+        dx = other.x_mean - x_mean
+        dy = other.y_mean - y_mean
+        w = n * other.n / self.n
+        self.cxx = self.cxx - other.cxx - w * np.outer(dx, dx)
+        self.cxy = self.cxy - other.cxy - w * np.multiply.outer(dx, dy)
+        self.cyy = self.cyy - other.cyy - w * dy * dy
+        self.x_mean = x_mean
+        self.y_mean = y_mean
+        self.n = n
+
+    @property
+    def xtx(self):
+        """Raw (uncentered) X^T X"""
+        return self.cxx + self.n * np.outer(self.x_mean, self.x_mean)
+
+    @property
+    def xty(self):
+        """Raw (uncentered) X^T y"""
+        return self.cxy + self.n * np.multiply.outer(self.x_mean, self.y_mean)
+
+    @property
+    def yty(self):
+        """Raw (uncentered) y^T y"""
+        return self.cyy + self.n * self.y_mean * self.y_mean
+
+
+class Streaming:
+    """
+    Methods for fitting the model out-of-core, from chunks of data
+
+    partial_fit: Updates the fit with one more chunk of data
+    fit_stream: Fits the model from an iterable of chunks of data
+    update: Updates a fitted model with new observations
+    remove: Removes observations from a fitted model
+
+    Only the sufficient statistics are kept (memory proportional to p^2),
+    so the Metrics and Inference methods work on a streamed model, but the
+    methods needing the raw data or residuals (plots, outliers) do not.
+
+    Memory-mapped data (see `ingest_data`) is fitted with the same
+    statistics, accumulated over row blocks of the mapped file.
+    """
+
+    def __init__():
+        pass
+
+    def partial_fit(self, X_chunk, y_chunk):
+        """
+        Updates the model coefficients with one more chunk of data
+
+        A model fitted in memory (`fit`), or holding ingested data, is
+        continued as with `update`: its data is dropped and only its
+        sufficient statistics are kept.
+
+        Arguments:
+        X_chunk: 1D or 2D numpy array
+        y_chunk: 1D numpy array
+        """
+        if len(X_chunk.shape) == 1:
+            X_chunk = X_chunk.reshape(-1, 1)
+        suff = getattr(self, "stream_stats_", None)
+        if suff is None and self.features_ is not None and self.target_ is not None:
+            # continue a model fitted in memory (or its ingested data) from its statistics
+            suff = self._sufficient_stats()
+        suff = SufficientStats() if suff is None else suff
+        self._start_stream(self._changed_stats(suff, X_chunk, y_chunk))
+        self._fit_from_stream()
+
+    def fit_stream(self, chunks, X=None, y=None):
+        """
+        Fits the model from an iterable of chunks of data, e.g. the output of
+        `pandas.read_csv(path, chunksize=...)`, without holding the data in memory
+
+        Arguments:
+        chunks: Iterable yielding either (X_chunk, y_chunk) tuples of numpy
+                arrays or Pandas DataFrames
+        X: A list of the feature columns, if the chunks are DataFrames
+        y: Name of the target column, if the chunks are DataFrames
+        """
+        self._start_stream()
+        for chunk in chunks:
+            if X is not None:
+                X_chunk = chunk[X].to_numpy(dtype=float)
+                y_chunk = chunk[y].to_numpy(dtype=float)
+            else:
+                X_chunk, y_chunk = chunk
+            if len(X_chunk.shape) == 1:
+                X_chunk = X_chunk.reshape(-1, 1)
+            self.stream_stats_.add(X_chunk, y_chunk)
+        if self.stream_stats_.x_mean is None:
+            self.stream_stats_ = None
+            print("No data in the stream!")
+            return None
+        self._fit_from_stream()
+
+    def update(self, X_new, y_new, sample_weight=None):
+        """
+        Updates the fitted model with new observations, without refitting
+        on the previous ones
+
+        The model's sufficient statistics are merged with those of the new
+        rows and the coefficients re-solved: O(k p^2 + p^3) for k new rows,
+        whatever the number of observations fitted before.
+
+        Arguments:
+        X_new: 1D or 2D numpy array
+        y_new: 1D numpy array (2D for a model fitted on several targets)
+        sample_weight: Optional 1D array of weights of the new rows (1 by
+                       default), for a weighted fit
+        """
+        if not self.is_fitted:
+            print("Model not fitted yet!")
+            return None
+        if len(X_new.shape) == 1:
+            X_new = X_new.reshape(-1, 1)
+        suff = self._changed_stats(
+            self._sufficient_stats(), X_new, y_new, _weights(sample_weight)
+        )
+        self._start_stream(suff)
+        self._fit_from_stream()
+
+    def remove(self, X_old, y_old, sample_weight=None):
+        """
+        Removes observations from the fitted model, e.g. the oldest rows of
+        a sliding window (`update` with the newest rows, then `remove` with
+        the oldest ones). Same cost as `update`
+
+        Arguments:
+        X_old: 1D or 2D numpy array, rows among those fitted
+        y_old: 1D numpy array, their targets
+        sample_weight: The weights these rows were fitted with, if any
+        """
+        if not self.is_fitted:
+            print("Model not fitted yet!")
+            return None
+        if len(X_old.shape) == 1:
+            X_old = X_old.reshape(-1, 1)
+        suff = self._changed_stats(
+            self._sufficient_stats(), X_old, y_old, _weights(sample_weight), remove=True
+        )
+        self._start_stream(suff)
+        self._fit_from_stream()
+
+    def _changed_stats(self, suff, X, y, weights=None, remove=False):
+        """
+        Returns a copy of the SufficientStats `suff` with the given rows
+        added (or removed), so that the model is left as it is if they are
+        refused, e.g. for a wrong number of columns
+        """
+        if suff.x_mean is not None and X.shape[1] != len(suff.x_mean):
+            raise ValueError(
+                "X has {} columns, the model was fitted with {}".format(
+                    X.shape[1], len(suff.x_mean)
+                )
+            )
+        if X.shape[0] != y.shape[0]:
+            raise ValueError("X and y must have the same number of rows")
+        suff = suff.copy()
+        if remove:
+            suff.remove(X, y, weights)
+        else:
+            suff.add(X, y, weights)
+        return suff
+
+    def _sufficient_stats(self):
+        """
+        Returns the sufficient statistics of the current fit, to update it
+
+        For a well-conditioned model fitted on in-memory data with an intercept,
+        they are rebuilt from the centered factorization kept by the fit
+        (Xc^T Xc = R^T R, Xc^T yc = Xc^T Xc beta, yc^T yc = SST) in O(p^3),
+        without another pass over the data.
+        """
+        if getattr(self, "stream_stats_", None) is not None:
+            return self.stream_stats_
+
+        def compute():
+            stats = self._fit_stats()
+            factor = stats["factor"]
+            if (
+                not isinstance(factor, InterceptFactorization)
+                or factor.condition_number() > REBUILD_MAX_CONDITION
+            ):
+                # Xc^T Xc beta loses the precision of Xc^T yc when beta is
+                # ill-determined (or truncated, if the design is rank deficient)
+                return self._blocked_sufficient_stats()
+            suff = SufficientStats()
+            suff.n = factor.n  # the total weight, for a weighted fit
+            suff.count = stats["n"]
+            suff.weighted = self.sample_weight_ is not None
+            suff.log_weight_sum = 2 * self._llf_weights()
+            suff.x_mean = factor.x_mean
+            suff.y_mean = stats["y_mean"]
+            suff.cxx = factor.centered.gram()
+            suff.cxy = np.dot(suff.cxx, stats["coef"][1:])
+            suff.cyy = stats["sst"]
+            return suff
+
+        return self._cached(("sufficient_stats", self.fit_intercept_), compute)
+
+    def _start_stream(self, stats=None):
+        """
+        Drops any in-memory data and starts accumulating from scratch,
+        or from the given SufficientStats
+        """
+        self.features_ = None
+        self.target_ = None
+        self.sample_weight_ = None
+        self.fitted_ = None
+        self.resid_ = None
+        self.stream_stats_ = SufficientStats() if stats is None else stats
+
+    def _fit_from_stream(self):
+        """Solves the least squares problem from the accumulated statistics"""
+        self._set_fit_stats(self._solve_sufficient_stats(self.stream_stats_))
+        self._set_fit_attributes()
+
+    def _blocked_sufficient_stats(self):
+        """
+        Accumulates the sufficient statistics of `features_` and `target_`
+        (weighted by `sample_weight_`, if any) by row blocks
+        """
+        X = self.features_
+        y = self.target_
+        w = getattr(self, "sample_weight_", None)
+        if is_sparse(X):
+            return SufficientStats.from_sparse(X, y, w)
+        suff = SufficientStats()
+        for start, stop in row_blocks(X.shape[0], X.shape[1], X.dtype.itemsize):
+            suff.add(
+                np.asarray(X[start:stop], dtype=np.float64),
+                np.asarray(y[start:stop], dtype=np.float64),
+                None if w is None else w[start:stop],
+            )
+        return suff
+
+    def _solve_sufficient_stats(self, suff):
+        """
+        Solves the least squares problem from a SufficientStats object and
+        returns the statistics dictionary stored in the fit cache
+        """
+        n = suff.count
+        p = len(suff.x_mean)
+        if self.fit_intercept_:
+            beta, centered, solver = solve_gram(suff.cxx, suff.cxy, solver=self.solver)
+            intercept = suff.y_mean - np.dot(suff.x_mean, beta)
+            coef = np.concatenate([np.asarray(intercept)[None], beta])
+            factor = InterceptFactorization(centered, suff.n, suff.x_mean)
+            sse = suff.cyy - np.sum(beta * suff.cxy, axis=0)
+        else:
+            xty = suff.xty
+            coef, factor, solver = solve_gram(suff.xtx, xty, solver=self.solver)
+            sse = suff.yty - np.sum(coef * xty, axis=0)
+        return self._make_fit_stats(
+            n, p, coef, factor, solver, np.maximum(sse, 0), suff.cyy, suff.y_mean, suff.n
+        )
+
+
+def _weights(sample_weight):
+    """Sample weights as a 1D float array, or None"""
+    if sample_weight is None:
+        return None
+    return np.asarray(sample_weight, dtype=np.float64).ravel()
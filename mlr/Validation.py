@@ -0,0 +1,159 @@
+import copy
+from contextlib import ExitStack
+import numpy as np
+from mlr.Solvers import solve_gram
+from mlr.Streaming import SufficientStats
+from mlr.Sparse import is_sparse, SPARSE_GRAM_MAX_FEATURES
+from mlr.Parallel import share, attach_shared_data, effective_n_jobs
+
+CV_METRICS = ("mse", "rmse", "mae", "r_squared")
+
+
+class Validation:
+    """
+    Methods for estimating the out-of-sample error of the model
+
+    cross_validate: K-fold cross-validation
+    press_resid: Leave-one-out (predicted) residuals
+    press: PRESS statistic, the sum of squared leave-one-out residuals
+    """
+
+    def __init__():
+        pass
+
+    def cross_validate(
+        self, k=5, metrics=("mse",), shuffle=False, random_state=None, n_jobs=1
+    ):
+        """
+        K-fold cross-validation of the model
+
+        The model of each fold is solved from the sufficient statistics of
+        the full data minus those of the held-out fold, so X^T X is never
+        formed again from the training rows: the cost per fold is that of
+        one pass over the held-out rows.
+
+        Arguments:
+        k: Number of folds
+        metrics: List of the metrics computed on each held-out fold, among
+                 'mse', 'rmse', 'mae' and 'r_squared'
+        shuffle: Boolean. If False (default), the folds are consecutive rows
+        random_state: Seed of the shuffling
+        n_jobs: Number of worker processes (-1 for all the CPUs). With more
+                than one, the data is placed in shared memory (the arrays of
+                a sparse X), which the workers map instead of receiving
+                pickled copies
+
+        Returns:
+        A dictionary mapping each metric to the array of its values per fold
+        """
+        for metric in metrics:
+            assert metric in CV_METRICS, "metrics must be among {}".format(CV_METRICS)
+        if not self.is_fitted:
+            print("Model not fitted yet!")
+            return None
+        if self.features_ is None:
+            print("The raw data is needed: the model was fitted from a stream!")
+            return None
+        if self.sample_weight_ is not None:
+            print("cross_validate does not support sample weights!")
+            return None
+        X = self.features_
+        y = self.target_
+        if is_sparse(X):
+            if X.shape[1] > SPARSE_GRAM_MAX_FEATURES:
+                print("cross_validate needs X^T X: too many features for a sparse design!")
+                return None
+            # CSR, for the row selection of the folds
+            X = X.tocsr()
+        n = X.shape[0]
+        assert 2 <= k <= n, "k must be between 2 and the number of observations"
+
+        order = np.arange(n)
+        if shuffle:
+            np.random.default_rng(random_state).shuffle(order)
+        folds = np.array_split(order, k)
+        suff = self._sufficient_stats()
+        args = (suff, self.fit_intercept_, self.solver, tuple(metrics))
+
+        n_jobs = min(effective_n_jobs(n_jobs), k)
+        if n_jobs > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ExitStack() as stack:
+                X_handle = share(X, stack)
+                y_handle = share(np.asarray(y, dtype=np.float64), stack)
+                with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                    futures = [
+                        executor.submit(_shared_fold_scores, X_handle, y_handle, rows, *args)
+                        for rows in folds
+                    ]
+                    scores = [future.result() for future in futures]
+        else:
+            scores = [_fold_scores(X, y, rows, *args) for rows in folds]
+
+        return {
+            metric: np.array([score[metric] for score in scores]) for metric in metrics
+        }
+
+    def press_resid(self):
+        """
+        Returns the leave-one-out (predicted) residuals e_i / (1 - h_ii): the
+        error on each observation of the model fitted without it, computed
+        exactly from the residuals and the leverage of the full fit
+        """
+        h = self.leverage()
+        if h is None:
+            return None
+        if np.ndim(self.resid_) > 1:
+            h = h[:, None]
+        return self.resid_ / (1 - h)
+
+    def press(self):
+        """Returns the PRESS statistic (sum of squared leave-one-out residuals)"""
+        r = self.press_resid()
+        if r is None:
+            return None
+        return np.sum(r * r, axis=0)
+
+
+def _fold_scores(X, y, rows, suff, fit_intercept, solver, metrics):
+    """
+    Fits the model without the given rows, from the sufficient statistics
+    `suff` of all the data, and returns its metrics on those rows
+    """
+    if is_sparse(X):
+        X_fold = X[rows].astype(np.float64)
+    else:
+        X_fold = np.asarray(X[rows], dtype=np.float64)
+    y_fold = np.asarray(y[rows], dtype=np.float64)
+    train = copy.copy(suff)
+    train.subtract(SufficientStats.from_arrays(X_fold, y_fold))
+    if fit_intercept:
+        coef = solve_gram(train.cxx, train.cxy, solver=solver)[0]
+        intercept = train.y_mean - np.dot(train.x_mean, coef)
+    else:
+        coef = solve_gram(train.xtx, train.xty, solver=solver)[0]
+        intercept = 0
+
+    resid = y_fold - (X_fold @ coef + intercept)
+    sse = np.sum(resid * resid, axis=0)
+    yc = y_fold - np.mean(y_fold, axis=0)
+    scores = {
+        "mse": sse / len(rows),
+        "rmse": np.sqrt(sse / len(rows)),
+        "mae": np.mean(np.abs(resid), axis=0),
+        "r_squared": 1 - sse / np.sum(yc * yc, axis=0),
+    }
+    return {metric: scores[metric] for metric in metrics}
+
+
+def _shared_fold_scores(X_handle, y_handle, rows, *args):
+    """Worker process: `_fold_scores` on the data held in shared memory"""
+    X_shms, X = attach_shared_data(X_handle)
+    y_shms, y = attach_shared_data(y_handle)
+    try:
+        return _fold_scores(X, y, rows, *args)
+    finally:
+        del X, y
+        for shm in X_shms + y_shms:
+            shm.close()
@@ -1,10 +1,29 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import statsmodels.api as sm
 
 from mlr.Metrics import Metrics
 from mlr.Inference import Inference
 from mlr.Diagnostics_plots import Diagnostics_plots
 from mlr.Data_plots import Data_plots
 from mlr.Outliers import Outliers
-from mlr.Multicollinearity import Multicollinearity
\ No newline at end of file
+from mlr.Multicollinearity import Multicollinearity
+from mlr.Grouped import GroupedModels, fit_grouped
+from mlr.Rolling import RollingModels
+from mlr.Selection import SubsetSelection
+from mlr.Regularized import RegularizationPath
+from mlr.Predictor import LinearPredictor
+from mlr.Encoding import DataFrameEncoding
+from mlr.Serving import AsyncBatchPredictor
+
+# matplotlib and statsmodels are only imported by the methods that use them;
+# `mlr.plt` and `mlr.sm` remain available, loaded on first access
+_LAZY_MODULES = {"plt": "matplotlib.pyplot", "sm": "statsmodels.api"}
+
+
+def __getattr__(name):
+    if name in _LAZY_MODULES:
+        from importlib import import_module
+
+        module = import_module(_LAZY_MODULES[name])
+        globals()[name] = module
+        return module
+    raise AttributeError("module 'mlr' has no attribute {!r}".format(name))
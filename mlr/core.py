@@ -0,0 +1,18 @@
+"""
+Minimal import path for fitting and scoring, e.g. in serving workers
+
+    from mlr.core import MyLinearRegression
+
+Pulls in NumPy only: matplotlib, seaborn, statsmodels, pandas and SciPy are
+imported by the methods that need them, on first use.
+"""
+from mlr.MLR import MyLinearRegression
+from mlr.Predictor import LinearPredictor
+from mlr.Solvers import (
+    SOLVERS,
+    Factorization,
+    InterceptFactorization,
+    solve_gram,
+    solve_least_squares,
+)
+from mlr.Streaming import SufficientStats, load_array
@@ -16,7 +16,7 @@ setup(
     long_description_content_type='text/markdown',
     long_description=read('README.md'),
     packages=['mlr'],
-    install_requires=['numpy','pandas','matplotlib','seaborn','statsmodels'],
+    install_requires=['numpy','scipy','pandas','matplotlib','seaborn','statsmodels'],
     keywords=[
         'Regression',
         'Linear regression',
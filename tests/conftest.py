@@ -0,0 +1,71 @@
+"""
+Shared fixtures: random regression data and models fitted on it
+"""
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from mlr.MLR import MyLinearRegression
+
+
+def _make_data(
+    n=400,
+    p=4,
+    seed=0,
+    loc=0.0,
+    spread=0.0,
+    intercept=0.5,
+    coef=None,
+    noise=1.0,
+    mixing=None,
+    num_targets=None,
+    density=None,
+):
+    """
+    Returns X, y and observation weights of a random linear model
+
+    Arguments:
+    n, p: Number of observations and of features
+    seed: Seed of the random generator
+    loc, spread: The feature means are loc plus a uniform draw in [-spread, spread]
+    intercept: Intercept of the model
+    coef: Coefficients of the model (uniform in [-1, 1] by default)
+    noise: Standard deviation of the (normal) noise
+    mixing: p x p matrix the independent features are multiplied by, for
+            correlated ones (dense X only)
+    num_targets: Number of targets, for a 2D y (1D y by default)
+    density: Fraction of nonzero features, for a scipy.sparse CSR X (dense by default)
+    """
+    rng = np.random.default_rng(seed)
+    shape = (p,) if num_targets is None else (p, num_targets)
+    if density is None:
+        X = rng.standard_normal((n, p)) + loc + rng.uniform(-spread, spread, p)
+        if mixing is not None:
+            X = X @ mixing
+    else:
+        X = sp.random(n, p, density=density, format="csr", random_state=seed)
+        X.data = rng.standard_normal(len(X.data)) + loc
+    if coef is None:
+        coef = rng.uniform(-1, 1, shape)
+    y = intercept + X @ coef + noise * rng.standard_normal((n,) + shape[1:])
+    weights = rng.uniform(0.2, 3.0, n)
+    return X, y, weights
+
+
+def _fitted_model(X, y, sample_weight=None, **params):
+    """Returns a MyLinearRegression(**params) fitted on X, y"""
+    model = MyLinearRegression(**params)
+    model.fit(X, y, sample_weight=sample_weight)
+    return model
+
+
+@pytest.fixture
+def make_data():
+    """The random data generator, called with the arguments a test needs"""
+    return _make_data
+
+
+@pytest.fixture
+def fitted_model():
+    """The model factory, called with the data and parameters a test needs"""
+    return _fitted_model
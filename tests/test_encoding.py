@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from mlr.MLR import MyLinearRegression
+
+pd = pytest.importorskip("pandas")
+
+
+def make_frame(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(
+        {
+            "size": rng.standard_normal(n),
+            "color": rng.choice(["x", "y", "z"], n),
+            "shape": pd.Categorical(rng.choice(["round", "square"], n)),
+        }
+    )
+    effect = frame["color"].map({"x": 5.0, "y": 1.0, "z": -2.0}).to_numpy()
+    frame["target"] = 2 * frame["size"] + effect + rng.standard_normal(n)
+    return frame
+
+
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+def test_predict_dataframe_round_trip(fit_intercept):
+    frame = make_frame()
+    model = MyLinearRegression(fit_intercept=fit_intercept)
+    model.fit_dataframe(["size", "color", "shape"], "target", frame)
+    # the fitted values are the predictions of the training frame
+    np.testing.assert_allclose(model.predict(frame), model.fitted_, rtol=1e-12)
+
+
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+def test_unseen_and_missing_levels_take_the_reference_level(fit_intercept):
+    frame = make_frame()
+    model = MyLinearRegression(fit_intercept=fit_intercept)
+    model.fit_dataframe(["size", "color", "shape"], "target", frame)
+    new = pd.DataFrame(
+        {
+            "size": [0.3, 0.3, 0.3, 0.3],
+            "color": ["x", "w", None, "x"],
+            "shape": ["round", "round", "round", "oval"],
+        }
+    )
+    predicted = model.predict(new)
+    # 'w', None and 'oval' are encoded as the reference levels 'x' and 'round'
+    np.testing.assert_allclose(predicted, predicted[0], rtol=1e-12)
+    assert abs(predicted[0]) > 1
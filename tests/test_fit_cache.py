@@ -0,0 +1,34 @@
+import numpy as np
+
+from mlr.MLR import MyLinearRegression
+
+
+def test_new_data_clears_the_fit(make_data, capsys):
+    model = MyLinearRegression()
+    model.fit(*make_data(200, 3)[:2])
+    model.ingest_data(*make_data(50, 2, seed=1)[:2])
+    assert not model.is_fitted
+    assert model.resid_ is None and model.fitted_ is None
+    assert model.sse() is None
+    assert model.adj_r_squared() is None
+    assert "Model not fitted yet!" in capsys.readouterr().out
+
+    model.fit()
+    assert model.is_fitted
+    assert model.coef_.shape == (2,)
+    assert model.dfe_ == 47
+    assert model.resid_.shape == (50,)
+
+
+def test_metrics_are_cached_per_fit(make_data):
+    X, y, _ = make_data(200, 3)
+    model = MyLinearRegression()
+    model.fit(X, y)
+    stats = model._fit_stats()
+    assert model.sse() == stats["sse"]
+    # the accessors read the statistics of the fit, without refitting
+    assert model._fit_stats() is stats
+    np.testing.assert_allclose(
+        model.adj_r_squared(),
+        1 - (stats["sse"] / model.dfe_) / (stats["sst"] / model.dft_),
+    )
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from mlr import fit_grouped
+from mlr.MLR import MyLinearRegression
+
+pd = pytest.importorskip("pandas")
+
+FEATURES = ["a", "b", "c"]
+
+
+def make_frame(seed=0):
+    rng = np.random.default_rng(seed)
+    # group 'tiny' has fewer rows than coefficients
+    sizes = {"g0": 80, "g1": 45, "g2": 200, "g3": 17, "tiny": 2}
+    frames = []
+    for key, size in sizes.items():
+        X = rng.standard_normal((size, 3)) + rng.uniform(-1, 1, 3)
+        y = rng.uniform(-2, 2) + X @ rng.uniform(-1, 1, 3) + rng.standard_normal(size)
+        frame = pd.DataFrame(X, columns=FEATURES)
+        frame["y"] = y
+        frame["key"] = key
+        frames.append(frame)
+    # interleave the groups, so that fit_grouped has to sort them
+    frame = pd.concat(frames, ignore_index=True)
+    return frame.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+def test_fit_grouped_matches_per_group_fits(fit_intercept, n_jobs):
+    frame = make_frame()
+    models = fit_grouped(frame, FEATURES, "y", "key", fit_intercept, n_jobs=n_jobs)
+    assert list(models.groups) == sorted(frame["key"].unique())
+
+    for i, key in enumerate(models.groups):
+        group = frame[frame["key"] == key]
+        assert models.counts[i] == len(group)
+        if len(group) <= len(FEATURES) + fit_intercept:
+            # not enough observations: no standard errors
+            assert np.all(np.isnan(models.std_err[i]))
+            continue
+        ref = MyLinearRegression(fit_intercept=fit_intercept)
+        ref.fit_dataframe(FEATURES, "y", group)
+        np.testing.assert_allclose(models.coef[i], ref.coef_, rtol=1e-9)
+        np.testing.assert_allclose(models.intercept[i], ref.intercept_, rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(models.std_err[i], ref.std_err(), rtol=1e-9)
+        np.testing.assert_allclose(models.r_squared[i], ref.r_squared(), rtol=1e-9)
+        np.testing.assert_allclose(models.sse[i], ref.sse(), rtol=1e-9)
+        assert models.dfe[i] == ref.dfe_
+
+
+def test_tiny_group_interpolates_its_rows():
+    frame = make_frame()
+    models = fit_grouped(frame, FEATURES, "y", "key")
+    tiny = frame[frame["key"] == "tiny"]
+    predicted = models.predict(tiny[FEATURES].to_numpy(), tiny["key"])
+    # the minimum-norm solution of an under-determined group fits its rows exactly
+    np.testing.assert_allclose(predicted, tiny["y"], rtol=1e-9)
+
+
+def test_n_jobs_gives_the_same_models():
+    frame = make_frame(seed=1)
+    serial = fit_grouped(frame, FEATURES, "y", "key")
+    parallel = fit_grouped(frame, FEATURES, "y", "key", n_jobs=2)
+    for name in ("coef", "intercept", "std_err", "sse", "sst", "dfe"):
+        np.testing.assert_array_equal(getattr(serial, name), getattr(parallel, name))
+
+
+def test_fit_grouped_ill_conditioned_groups():
+    rng = np.random.default_rng(0)
+    frames = []
+    # condition numbers of X from about 1e2 to 1e3
+    for key, noise in enumerate([1e-2, 3e-3, 1e-3]):
+        X = rng.standard_normal((300, 3))
+        X[:, 2] = X[:, 0] + noise * rng.standard_normal(300)
+        frame = pd.DataFrame(X, columns=FEATURES)
+        frame["y"] = 1 + X @ [1.0, 2.0, 3.0] + rng.standard_normal(300)
+        frame["key"] = key
+        frames.append(frame)
+    frame = pd.concat(frames, ignore_index=True)
+    models = fit_grouped(frame, FEATURES, "y", "key")
+    for i, key in enumerate(models.groups):
+        ref = MyLinearRegression(solver="cholesky")
+        ref.fit_dataframe(FEATURES, "y", frame[frame["key"] == key])
+        np.testing.assert_allclose(models.coef[i], ref.coef_, rtol=1e-8)
+        np.testing.assert_allclose(models.intercept[i], ref.intercept_, rtol=1e-8)
+        np.testing.assert_allclose(models.std_err[i], ref.std_err(), rtol=1e-8)
@@ -0,0 +1,43 @@
+"""
+`mlr.core` is the import path of serving workers: it must pull in NumPy only
+"""
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = ["matplotlib", "seaborn", "statsmodels", "pandas", "scipy"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(*args):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_core_does_not_import_heavy_modules():
+    code = (
+        "import sys, mlr.core\n"
+        "print(' '.join(m for m in {!r} if m in sys.modules))".format(HEAVY_MODULES)
+    )
+    loaded = run_python("-c", code).stdout.split()
+    assert loaded == []
+
+
+def test_importtime_of_core():
+    # -X importtime lists every module imported (and its cost), on stderr
+    report = run_python("-X", "importtime", "-c", "import mlr.core").stderr
+    imported = {line.rsplit("|", 1)[-1].strip() for line in report.splitlines()}
+    assert "mlr.core" in imported
+    heavy = sorted(
+        name for name in imported if name.split(".")[0] in HEAVY_MODULES
+    )
+    assert heavy == []
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from mlr.MLR import MyLinearRegression
+
+
+# a sparse design, converted to the other kinds by as_input
+DATA = dict(n=2000, p=6, density=0.5, noise=0.1)
+
+
+def as_input(X, kind, tmp_path):
+    """The design as a sparse matrix, an in-memory array or a memory-mapped .npy"""
+    if kind == "sparse":
+        return X
+    if kind == "dense":
+        return X.toarray()
+    path = str(tmp_path / "X.npy")
+    np.save(path, X.toarray())
+    return path
+
+
+def reference(X, y, fit_intercept, weights=None):
+    model = MyLinearRegression(fit_intercept=fit_intercept, solver="lstsq")
+    model.fit(X.toarray(), y, sample_weight=weights)
+    return model
+
+
+def assert_same_coef(model, ref, rtol):
+    np.testing.assert_allclose(model.coef_, ref.coef_, rtol=rtol, atol=rtol)
+    np.testing.assert_allclose(model.intercept_, ref.intercept_, rtol=rtol, atol=rtol)
+
+
+@pytest.mark.parametrize("kind", ["sparse", "memmap", "dense"])
+@pytest.mark.parametrize("weighted", [False, True], ids=["ols", "wls"])
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+@pytest.mark.parametrize("solver", ["cg", "lsqr", "lsmr"])
+def test_krylov_solvers(solver, fit_intercept, weighted, kind, make_data, tmp_path):
+    X, y, weights = make_data(**DATA)
+    weights = weights if weighted else None
+    model = MyLinearRegression(fit_intercept=fit_intercept, solver=solver)
+    model.fit(as_input(X, kind, tmp_path), y, sample_weight=weights)
+    if kind == "memmap":
+        assert isinstance(model.features_, np.memmap)
+    assert model.solver_ == solver
+    assert model.n_iter_ is not None
+    ref = reference(X, y, fit_intercept, weights)
+    assert_same_coef(model, ref, 1e-7)
+    np.testing.assert_allclose(model.sse(), ref.sse(), rtol=1e-10)
+
+
+@pytest.mark.parametrize("kind", ["sparse", "memmap", "dense"])
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+def test_sgd_solver(fit_intercept, kind, make_data, tmp_path):
+    X, y, _ = make_data(**DATA)
+    model = MyLinearRegression(
+        fit_intercept=fit_intercept, solver="sgd", tol=1e-6, max_iter=500
+    )
+    model.fit(as_input(X, kind, tmp_path), y)
+    assert_same_coef(model, reference(X, y, fit_intercept), 1e-3)
+    # the iterations are the epochs actually run
+    assert 0 < model.n_iter_ <= 500
+
+
+def test_callback_and_max_iter(make_data):
+    X, y, _ = make_data(**DATA)
+    seen = []
+    model = MyLinearRegression(
+        solver="lsqr", max_iter=3, callback=lambda i, coef, norm: seen.append((i, norm))
+    )
+    model.fit(X, y)
+    assert [i for i, _ in seen] == [1, 2, 3]
+    assert model.n_iter_ == 3
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from mlr.MLR import MyLinearRegression
+
+
+@pytest.mark.parametrize("weighted", [False, True], ids=["ols", "wls"])
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+def test_each_target_matches_its_single_target_fit(fit_intercept, weighted, make_data):
+    X, Y, weights = make_data(n=300, loc=1.0, num_targets=3)
+    weights = weights if weighted else None
+    model = MyLinearRegression(fit_intercept=fit_intercept)
+    model.fit(X, Y, sample_weight=weights)
+    assert model.coef_.shape == (X.shape[1], Y.shape[1])
+    for j in range(Y.shape[1]):
+        single = MyLinearRegression(fit_intercept=fit_intercept)
+        single.fit(X, Y[:, j], sample_weight=weights)
+        np.testing.assert_allclose(model.coef_[:, j], single.coef_, rtol=1e-10)
+        if fit_intercept:
+            np.testing.assert_allclose(model.intercept_[j], single.intercept_, rtol=1e-10)
+        np.testing.assert_allclose(model.sse()[j], single.sse(), rtol=1e-10)
+        np.testing.assert_allclose(model.r_squared()[j], single.r_squared(), rtol=1e-10)
+        np.testing.assert_allclose(model.aic()[j], single.aic(), rtol=1e-10)
+        np.testing.assert_allclose(model.bic()[j], single.bic(), rtol=1e-10)
+        np.testing.assert_allclose(model.std_err()[:, j], single.std_err(), rtol=1e-10)
+        np.testing.assert_allclose(model.pvalues()[:, j], single.pvalues(), rtol=1e-8, atol=1e-300)
+        np.testing.assert_allclose(model.conf_int()[:, :, j], single.conf_int(), rtol=1e-10)
+        np.testing.assert_allclose(model.ftest()[0][j], single.ftest()[0], rtol=1e-10)
+        np.testing.assert_allclose(
+            model.cooks_distances()[:, j], single.cooks_distances(), rtol=1e-9
+        )
+        np.testing.assert_allclose(model.dffits()[:, j], single.dffits(), rtol=1e-9)
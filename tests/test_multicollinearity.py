@@ -0,0 +1,69 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from mlr.MLR import MyLinearRegression
+
+sm = pytest.importorskip("statsmodels.api")
+from statsmodels.stats.outliers_influence import variance_inflation_factor
+
+
+# features of different means, for the centering to matter
+DATA = dict(n=500, spread=2.0)
+
+
+def statsmodels_vifs(X):
+    design = sm.add_constant(X)
+    return np.array(
+        [variance_inflation_factor(design, i) for i in range(1, design.shape[1])]
+    )
+
+
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+@pytest.mark.parametrize("near_collinear", [False, True], ids=["independent", "near_collinear"])
+def test_vif_matches_statsmodels(fit_intercept, near_collinear, make_data):
+    X, y, _ = make_data(**DATA)
+    if near_collinear:
+        rng = np.random.default_rng(1)
+        X[:, 3] = X[:, 0] - 2 * X[:, 1] + 1e-3 * rng.standard_normal(len(y))
+    model = MyLinearRegression(fit_intercept=fit_intercept)
+    model.fit(X, y)
+    np.testing.assert_allclose(model.vif(verbose=False), statsmodels_vifs(X), rtol=1e-6)
+
+
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+def test_vif_of_a_constant_feature(fit_intercept, make_data, capsys):
+    X, y, _ = make_data(**DATA)
+    X[:, 2] = 3.0
+    model = MyLinearRegression(fit_intercept=fit_intercept)
+    model.fit(X, y)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        vifs = model.vif(verbose=False)
+    assert vifs[2] == np.inf
+    assert "Constant feature(s) [2]" in capsys.readouterr().out
+    keep = [0, 1, 3]
+    np.testing.assert_allclose(vifs[keep], statsmodels_vifs(X[:, keep]), rtol=1e-8)
+
+
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+@pytest.mark.parametrize("streamed", [False, True], ids=["in_memory", "updated"])
+def test_vif_of_a_weighted_fit(fit_intercept, streamed, make_data):
+    X, y, w = make_data(**DATA)
+    model = MyLinearRegression(fit_intercept=fit_intercept)
+    if streamed:
+        model.fit(X[:400], y[:400], sample_weight=w[:400])
+        model.update(X[400:], y[400:], sample_weight=w[400:])
+    else:
+        model.fit(X, y, sample_weight=w)
+    # 1 / (1 - R^2) of each feature's weighted regression on the others
+    weighted = []
+    for j in range(X.shape[1]):
+        others = sm.add_constant(np.delete(X, j, axis=1))
+        weighted.append(1 / (1 - sm.WLS(X[:, j], others, weights=w).fit().rsquared))
+    np.testing.assert_allclose(model.vif(verbose=False, weighted=True), weighted, rtol=1e-6)
+    if streamed:
+        assert model.vif(verbose=False) is None
+    else:
+        np.testing.assert_allclose(model.vif(verbose=False), statsmodels_vifs(X), rtol=1e-6)
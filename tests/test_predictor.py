@@ -0,0 +1,126 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from mlr.MLR import MyLinearRegression
+from mlr.Predictor import LinearPredictor, predict_linear
+
+DATA = dict(n=300, p=5, intercept=1.0)
+
+
+@pytest.mark.parametrize("mmap_mode", ["r", None])
+@pytest.mark.parametrize("suffix", [".npz", ""], ids=["suffix", "no_suffix"])
+@pytest.mark.parametrize("num_targets", [None, 3], ids=["single", "multi"])
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_save_load_round_trip(
+    tmp_path, mmap_mode, suffix, num_targets, dtype, make_data, fitted_model
+):
+    X, y, _ = make_data(num_targets=num_targets, **DATA)
+    model = fitted_model(X, y)
+    predictor = model.export(dtype=dtype)
+    written = predictor.save(str(tmp_path / ("model" + suffix)))
+    assert written.endswith(".npz")
+
+    loaded = LinearPredictor.load(str(tmp_path / ("model" + suffix)), mmap_mode=mmap_mode)
+    assert loaded.dtype == np.dtype(dtype)
+    assert loaded.feature_names == predictor.feature_names
+    np.testing.assert_array_equal(loaded.coef, predictor.coef)
+    np.testing.assert_array_equal(loaded.intercept, predictor.intercept)
+    X = X.astype(dtype)
+    np.testing.assert_array_equal(loaded.predict(X), predictor.predict(X))
+
+
+def test_load_memory_maps_the_coefficients(tmp_path, make_data, fitted_model):
+    X, y, _ = make_data(**DATA)
+    model = fitted_model(X, y)
+    path = model.export().save(str(tmp_path / "model"))
+    loaded = LinearPredictor.load(path)
+    assert not loaded.coef.flags.owndata
+    assert not loaded.coef.flags.writeable
+    np.testing.assert_array_equal(loaded.predict(X), model.predict(X))
+
+
+def test_load_fortran_ordered_and_compressed_archives(tmp_path):
+    coef = np.asfortranarray(np.arange(12.0).reshape(4, 3))
+    names = np.array(["a", "b", "c", "d"])
+    X = np.random.default_rng(0).standard_normal((10, 4))
+    for save in (np.savez, np.savez_compressed):
+        path = str(tmp_path / "{}.npz".format(save.__name__))
+        save(path, coef=coef, intercept=np.array([1.0, 2.0, 3.0]), feature_names=names)
+        loaded = LinearPredictor.load(path)
+        np.testing.assert_array_equal(loaded.coef, coef)
+        np.testing.assert_array_equal(loaded.predict(X), X @ coef + [1.0, 2.0, 3.0])
+        assert loaded.feature_names == ("a", "b", "c", "d")
+
+
+def test_pickle_and_predict_linear(make_data, fitted_model):
+    X, y, _ = make_data(**DATA)
+    model = fitted_model(X, y)
+    predictor = pickle.loads(pickle.dumps(model.export()))
+    np.testing.assert_array_equal(predictor.predict(X), model.export().predict(X))
+    out = np.empty(len(X))
+    predict_linear(X, model.coef_, model.intercept_, out=out, chunk_size=7)
+    np.testing.assert_allclose(out, model.predict(X), rtol=1e-12)
+
+
+@pytest.mark.parametrize("chunk_size", [None, 1, 7, 1000])
+@pytest.mark.parametrize("num_targets", [None, 3], ids=["single", "multi"])
+def test_predict_into_out_in_chunks(chunk_size, num_targets, make_data, fitted_model):
+    X, y, _ = make_data(num_targets=num_targets, **DATA)
+    model = fitted_model(X, y)
+    expected = X @ model.coef_ + model.intercept_
+    np.testing.assert_allclose(model.predict(X, chunk_size=chunk_size), expected, rtol=1e-12)
+    np.testing.assert_allclose(model.predicted_, expected, rtol=1e-12)
+
+    model.predicted_ = None
+    out = np.empty(expected.shape)
+    returned = model.predict(X, out=out, chunk_size=chunk_size)
+    assert returned is out
+    assert model.predicted_ is None
+    np.testing.assert_allclose(out, expected, rtol=1e-12)
+    with pytest.raises(ValueError):
+        model.predict(X, out=np.empty((len(X) + 1,) + expected.shape[1:]))
+
+
+@pytest.mark.parametrize("chunk_size", [None, 7])
+def test_predict_float32(chunk_size, make_data, fitted_model):
+    X, y, _ = make_data(**DATA)
+    model = fitted_model(X, y)
+    X32 = X.astype(np.float32)
+    predicted = model.predict(X32, dtype=np.float32, chunk_size=chunk_size)
+    assert predicted.dtype == np.float32
+    np.testing.assert_allclose(predicted, model.predict(X), rtol=1e-4, atol=1e-4)
+    out = np.empty(len(X), dtype=np.float32)
+    model.predict(X32, out=out, chunk_size=chunk_size)
+    np.testing.assert_array_equal(out, predicted)
+
+
+@pytest.mark.parametrize("n_threads", [1, 4])
+@pytest.mark.parametrize("num_targets", [None, 3], ids=["single", "multi"])
+def test_predict_many_matches_predict(n_threads, num_targets, make_data, fitted_model):
+    X, y, _ = make_data(num_targets=num_targets, **DATA)
+    model = fitted_model(X, y)
+    batches = [X[:1], X[1:50], X[50:], np.empty((0, 5))]
+    results = model.predict_many(batches, n_threads=n_threads)
+    assert len(results) == len(batches)
+    for batch, predicted in zip(batches, results):
+        np.testing.assert_array_equal(predicted, model.predict(batch))
+
+
+def test_read_only_leaves_predicted_untouched(make_data, fitted_model):
+    X, y, _ = make_data(**DATA)
+    model = fitted_model(X, y)
+    model.predict(X[:10])
+    stored = model.predicted_
+    model.read_only = True
+    predicted = model.predict(X)
+    assert model.predicted_ is stored
+    model.predict_many([X, X[:3]], n_threads=2)
+    assert model.predicted_ is stored
+    np.testing.assert_allclose(predicted, X @ model.coef_ + model.intercept_, rtol=1e-12)
+
+    shared = MyLinearRegression(read_only=True)
+    shared.fit(X, X @ np.arange(5.0))
+    shared.predict(X)
+    assert not hasattr(shared, "predicted_")
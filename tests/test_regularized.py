@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from mlr.MLR import MyLinearRegression
+
+
+MIXING = np.eye(6)
+MIXING[1, 2] = 0.9  # correlated features 1 and 2
+DATA = dict(
+    n=150,
+    p=6,
+    spread=1.0,
+    intercept=0.7,
+    coef=[1.5, 0.0, -1.0, 0.0, 0.5, 0.0],
+    mixing=MIXING,
+)
+
+
+def design(X, y, fit_intercept):
+    """The (centered, with an intercept) data the penalties apply to"""
+    if fit_intercept:
+        return X - X.mean(axis=0), y - y.mean()
+    return X, y
+
+
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+def test_ridge_path_closed_form(fit_intercept, make_data):
+    X, y, _ = make_data(**DATA)
+    model = MyLinearRegression(fit_intercept=fit_intercept)
+    model.fit(X, y)
+    alphas = [0.0, 0.1, 1.0, 10.0, 1000.0]
+    path = model.ridge_path(alphas)
+
+    Xc, yc = design(X, y, fit_intercept)
+    p = X.shape[1]
+    for i, alpha in enumerate(alphas):
+        expected = np.linalg.solve(Xc.T @ Xc + alpha * np.eye(p), Xc.T @ yc)
+        np.testing.assert_allclose(path.coef[i], expected, rtol=1e-9, atol=1e-12)
+    # alpha = 0 is the least squares fit
+    np.testing.assert_allclose(path.coef[0], model.coef_, rtol=1e-9)
+    np.testing.assert_allclose(path.intercept[0], model.intercept_, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(path.predict(X)[:, 0], model.predict(X), rtol=1e-9)
+
+
+def test_ridge_path_collinear_features(make_data):
+    X, y, _ = make_data(**DATA)
+    X = np.column_stack([X, X[:, 0] - X[:, 3]])
+    model = MyLinearRegression()
+    model.fit(X, y)
+    path = model.ridge_path([0.5])
+    Xc, yc = design(X, y, True)
+    expected = np.linalg.solve(Xc.T @ Xc + 0.5 * np.eye(X.shape[1]), Xc.T @ yc)
+    np.testing.assert_allclose(path.coef[0], expected, rtol=1e-8, atol=1e-10)
+
+
+@pytest.mark.parametrize("l1_ratio", [1.0, 0.5, 0.1])
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+def test_elastic_net_path_kkt_conditions(l1_ratio, fit_intercept, make_data):
+    X, y, _ = make_data(**DATA)
+    model = MyLinearRegression(fit_intercept=fit_intercept)
+    model.fit(X, y)
+    path = model.elastic_net_path(l1_ratio=l1_ratio, n_alphas=30, tol=1e-10)
+
+    Xc, yc = design(X, y, fit_intercept)
+    n = len(y)
+    scale = np.max(np.abs(Xc.T @ yc / n))
+    assert np.all(np.diff(path.alphas) < 0)
+    assert np.count_nonzero(path.coef[0]) == 0
+    for alpha, coef in zip(path.alphas, path.coef):
+        l1 = alpha * l1_ratio
+        l2 = alpha * (1 - l1_ratio)
+        # correlations of the features with the residuals, minus the ridge term
+        grad = Xc.T @ (yc - Xc @ coef) / n - l2 * coef
+        active = coef != 0
+        np.testing.assert_allclose(
+            grad[active], l1 * np.sign(coef[active]), rtol=0, atol=1e-7 * scale
+        )
+        assert np.all(np.abs(grad[~active]) <= l1 + 1e-7 * scale)
+    assert np.array_equal(path.df, np.count_nonzero(path.coef, axis=1))
+
+
+def test_lasso_path_small_alpha_reaches_least_squares(make_data):
+    X, y, _ = make_data(**DATA)
+    model = MyLinearRegression()
+    model.fit(X, y)
+    path = model.lasso_path(alphas=[1e-10], tol=1e-12, max_iter=100000)
+    np.testing.assert_allclose(path.coef[0], model.coef_, rtol=1e-6)
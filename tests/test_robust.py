@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from mlr.MLR import MyLinearRegression
+
+sm = pytest.importorskip("statsmodels.api")
+
+NORMS = {
+    "huber": sm.robust.norms.HuberT,
+    "tukey": sm.robust.norms.TukeyBiweight,
+}
+
+
+DATA = dict(n=500, loc=1.0, intercept=1.0, coef=[1.0, -2.0, 0.5, 0.0])
+
+
+@pytest.mark.parametrize("sparse", [False, True], ids=["dense", "sparse"])
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+@pytest.mark.parametrize("norm", sorted(NORMS))
+def test_fit_robust_matches_statsmodels_rlm(norm, fit_intercept, sparse, make_data):
+    X, y, _ = make_data(**DATA)
+    y[:20] += 15  # gross outliers
+    design = sm.add_constant(X) if fit_intercept else X
+    ref = sm.RLM(y, design, M=NORMS[norm]()).fit(tol=1e-12, maxiter=200)
+
+    model = MyLinearRegression(fit_intercept=fit_intercept)
+    X_fit = sp.csr_matrix(X) if sparse else X
+    model.fit_robust(X_fit, y, norm=norm, tol=1e-12, max_iter=200)
+    params = model.coef_
+    if fit_intercept:
+        params = np.concatenate([[model.intercept_], params])
+    np.testing.assert_allclose(params, ref.params, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(model.scale_, ref.scale, rtol=1e-9)
+    np.testing.assert_allclose(model.robust_weights_, ref.weights, rtol=0, atol=1e-9)
+    # the model is left as the weighted fit with the robust weights
+    np.testing.assert_allclose(model.sample_weight_, model.robust_weights_)
+
+
+def test_prior_weights_multiply_the_robust_ones(make_data):
+    X, y, prior = make_data(**DATA)
+    y[:20] += 15
+    model = MyLinearRegression()
+    model.fit_robust(X, y, sample_weight=prior)
+    np.testing.assert_allclose(model.sample_weight_, model.robust_weights_ * prior)
+    assert np.all(model.robust_weights_ <= 1)
+
+
+def test_fit_robust_without_data(capsys):
+    model = MyLinearRegression()
+    assert model.fit_robust() is None
+    assert "No data ingested yet!" in capsys.readouterr().out
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from mlr.MLR import MyLinearRegression
+
+
+def window_lstsq(X, y, start, end, fit_intercept):
+    design = X[start:end]
+    if fit_intercept:
+        design = np.column_stack([np.ones(end - start), design])
+    return np.linalg.lstsq(design, y[start:end], rcond=None)[0]
+
+
+def assert_windows_match(result, X, y, fit_intercept, rtol, num_checked=60):
+    for i in np.linspace(0, len(result) - 1, num_checked).astype(int):
+        expected = window_lstsq(X, y, result.starts[i], result.ends[i], fit_intercept)
+        coef = result.coef[i]
+        if fit_intercept:
+            coef = np.concatenate([[result.intercept[i]], coef])
+        np.testing.assert_allclose(coef, expected, rtol=rtol, atol=0)
+
+
+@pytest.mark.parametrize("expanding", [False, True], ids=["rolling", "expanding"])
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+def test_rolling_fit_matches_per_window_fits(fit_intercept, expanding, make_data):
+    X, y, _ = make_data(3000, 3, loc=2.0, intercept=1.0, coef=[0.5, -1.0, 2.0])
+    model = MyLinearRegression(fit_intercept=fit_intercept)
+    model.ingest_data(X, y)
+    result = model.rolling_fit(window=200, step=37, expanding=expanding)
+    np.testing.assert_array_equal(result.ends, np.arange(200, 3001, 37))
+    assert_windows_match(result, X, y, fit_intercept, 1e-9)
+
+    # std_err of a window from the model fitted on it alone
+    i = len(result) // 2
+    ref = MyLinearRegression(fit_intercept=fit_intercept)
+    ref.fit(X[result.starts[i] : result.ends[i]], y[result.starts[i] : result.ends[i]])
+    np.testing.assert_allclose(result.std_err[i], ref.std_err(), rtol=1e-8)
+    np.testing.assert_allclose(result.r_squared[i], ref.r_squared(), rtol=1e-8)
+
+
+def test_rolling_precision_does_not_degrade_on_a_long_random_walk():
+    rng = np.random.default_rng(1)
+    n = 200_000
+    X = np.cumsum(rng.standard_normal((n, 3)), axis=0)
+    y = 1.0 + X @ [0.5, -1.0, 2.0] + rng.standard_normal(n)
+    model = MyLinearRegression()
+    model.ingest_data(X, y)
+    result = model.rolling_fit(window=500, step=50)
+    assert_windows_match(result, X, y, True, 1e-8)
@@ -0,0 +1,104 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from mlr.MLR import MyLinearRegression
+
+
+@pytest.fixture
+def correlated_data(make_data):
+    """
+    Data with correlated features, so that greedy and exact selection can
+    differ, and about half of the coefficients zero
+    """
+
+    def make(seed, n=120, p=8):
+        rng = np.random.default_rng(seed)
+        coef = np.where(rng.random(p) < 0.5, rng.uniform(-1, 1, p), 0.0)
+        mixing = np.eye(p)
+        mixing[0, 1] = 0.8
+        mixing[[4, 2], 5] = [0.6, -0.5]
+        return make_data(n, p, seed, intercept=1.0, coef=coef, mixing=mixing)
+
+    return make
+
+
+def criterion_of(X, y, features, criterion, fit_intercept):
+    """AIC or BIC of the least squares fit on `features`, refitted from scratch"""
+    n = len(y)
+    design = X[:, list(features)]
+    if fit_intercept:
+        design = np.column_stack([np.ones(n), design])
+    if design.shape[1]:
+        resid = y - design @ np.linalg.lstsq(design, y, rcond=None)[0]
+    else:
+        resid = y
+    rss = resid @ resid
+    k = design.shape[1]
+    llf = -n / 2 * (np.log(2 * np.pi) + np.log(rss / n) + 1)
+    penalty = 2.0 if criterion == "aic" else np.log(n)
+    return -2 * llf + penalty * k
+
+
+def refitted(X, y, features, fit_intercept, sample_weight=None):
+    model = MyLinearRegression(fit_intercept=fit_intercept)
+    model.fit(X[:, features], y, sample_weight=sample_weight)
+    return model
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("criterion", ["aic", "bic"])
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+def test_best_subset_matches_brute_force(seed, criterion, fit_intercept, correlated_data):
+    X, y, _ = correlated_data(seed)
+    p = X.shape[1]
+    values = {
+        subset: criterion_of(X, y, subset, criterion, fit_intercept)
+        for size in range(p + 1)
+        for subset in combinations(range(p), size)
+    }
+    best = min(values, key=values.get)
+
+    model = MyLinearRegression(fit_intercept=fit_intercept)
+    model.fit(X, y)
+    result = model.best_subset(criterion)
+    assert tuple(result.features) == best
+    np.testing.assert_allclose(result.value, values[best], rtol=1e-10)
+
+
+@pytest.mark.parametrize("direction", ["forward", "backward", "both"])
+@pytest.mark.parametrize("criterion", ["aic", "bic"])
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+def test_stepwise_criterion_and_coef_match_refit(
+    direction, criterion, fit_intercept, correlated_data
+):
+    X, y, _ = correlated_data(0)
+    model = MyLinearRegression(fit_intercept=fit_intercept)
+    model.fit(X, y)
+    result = model.stepwise(direction, criterion)
+    assert len(result.features) > 0
+    ref = refitted(X, y, result.features, fit_intercept)
+    expected = ref.aic() if criterion == "aic" else ref.bic()
+    np.testing.assert_allclose(result.value, expected, rtol=1e-10)
+    np.testing.assert_allclose(result.coef, ref.coef_, rtol=1e-8)
+    np.testing.assert_allclose(result.intercept, ref.intercept_, rtol=1e-8, atol=1e-12)
+    # no single step from the selected subset lowers the criterion further
+    if direction == "both":
+        p = X.shape[1]
+        for j in range(p):
+            features = sorted(set(result.features) ^ {j})
+            value = criterion_of(X, y, features, criterion, fit_intercept)
+            assert value >= result.value - 1e-9
+
+
+def test_weighted_selection_matches_weighted_refit(correlated_data):
+    X, y, weights = correlated_data(1)
+    model = MyLinearRegression()
+    model.fit(X, y, sample_weight=weights)
+    for result, method in [
+        (model.stepwise("both", "aic"), "aic"),
+        (model.best_subset("bic"), "bic"),
+    ]:
+        ref = refitted(X, y, result.features, True, weights)
+        np.testing.assert_allclose(result.value, getattr(ref, method)(), rtol=1e-10)
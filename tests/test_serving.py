@@ -0,0 +1,54 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from mlr import AsyncBatchPredictor
+
+
+@pytest.mark.parametrize("max_batch_size", [1, 8, 256])
+def test_gathered_predictions_equal_predict(max_batch_size, make_data, fitted_model):
+    model = fitted_model(*make_data(n=200)[:2])
+    X, _, _ = make_data(n=50, seed=1)  # new rows to serve
+
+    async def main():
+        predictor = AsyncBatchPredictor(model, max_batch_size=max_batch_size)
+        results = await asyncio.gather(*(predictor.predict(row) for row in X))
+        return predictor, results
+
+    predictor, results = asyncio.run(main())
+    np.testing.assert_allclose(results, model.predict(X), rtol=1e-12)
+    stats = predictor.stats()
+    assert stats["requests"] == len(X)
+    assert stats["batches"] == -(-len(X) // max_batch_size)
+
+
+def test_exported_predictor_is_served(make_data, fitted_model):
+    model = fitted_model(*make_data(n=200)[:2])
+    X, _, _ = make_data(n=50, seed=1)  # new rows to serve
+
+    async def main():
+        predictor = AsyncBatchPredictor(model.export())
+        return await asyncio.gather(*(predictor.predict(row) for row in X))
+
+    np.testing.assert_allclose(asyncio.run(main()), model.predict(X), rtol=1e-12)
+
+
+def test_malformed_row_fails_only_its_own_future(make_data, fitted_model):
+    model = fitted_model(*make_data(n=200)[:2])
+    X, _, _ = make_data(n=50, seed=1)  # new rows to serve
+    rows = list(X[:10])
+    rows[4] = np.ones(3)  # wrong number of features
+
+    async def main():
+        predictor = AsyncBatchPredictor(model, max_batch_size=64)
+        return await asyncio.gather(
+            *(predictor.predict(row) for row in rows), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert isinstance(results[4], ValueError)
+    good = [i for i in range(10) if i != 4]
+    np.testing.assert_allclose(
+        [results[i] for i in good], model.predict(X[good]), rtol=1e-12
+    )
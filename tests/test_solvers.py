@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from mlr.MLR import MyLinearRegression
+from mlr.Solvers import solve_least_squares
+
+
+# the last feature is an exact combination of the first two
+COLLINEAR = np.eye(4)
+COLLINEAR[:, 3] = [1.0, 2.0, 0.0, 0.0]
+COLLINEAR_DATA = dict(
+    p=4, intercept=0.0, coef=[1.0, -2.0, 0.5, 0.0], mixing=COLLINEAR
+)
+
+
+@pytest.mark.parametrize("solver", ["cholesky", "qr"])
+def test_rank_deficient_design_is_refused(solver, make_data):
+    X, y, _ = make_data(50, **COLLINEAR_DATA)
+    with pytest.raises(np.linalg.LinAlgError, match="svd"):
+        solve_least_squares(X, y, solver=solver)
+
+
+@pytest.mark.parametrize("solver", ["auto", "svd", "lstsq"])
+def test_rank_deficient_design_minimum_norm(solver, make_data):
+    X, y, _ = make_data(50, **COLLINEAR_DATA)
+    coef = solve_least_squares(X, y, solver=solver)[0]
+    np.testing.assert_allclose(coef, np.linalg.pinv(X) @ y, rtol=1e-8, atol=1e-10)
+
+
+@pytest.mark.parametrize("solver", ["cholesky", "qr"])
+def test_fewer_observations_than_columns_is_refused(solver):
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((5, 8))
+    with pytest.raises(np.linalg.LinAlgError, match="fewer observations"):
+        solve_least_squares(X, rng.standard_normal(5), solver=solver)
+
+
+def test_rank_deficient_memmap_qr(tmp_path, make_data):
+    X, y, _ = make_data(200, **COLLINEAR_DATA)
+    path = str(tmp_path / "X.npy")
+    np.save(path, X)
+    model = MyLinearRegression(solver="qr")
+    with pytest.raises(np.linalg.LinAlgError, match="rank deficient"):
+        model.fit(path, y)
+
+
+def assert_same_as_in_memory(model, X, y, fit_intercept, solver):
+    ref = MyLinearRegression(fit_intercept=fit_intercept, solver=solver)
+    ref.fit(np.array(X, dtype=np.float64), y)
+    np.testing.assert_allclose(model.coef_, ref.coef_, rtol=1e-9)
+    np.testing.assert_allclose(model.intercept_, ref.intercept_, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(model.std_err(), ref.std_err(), rtol=1e-9)
+    np.testing.assert_allclose(model.resid_, ref.resid_, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(model.leverage(), ref.leverage(), rtol=1e-9)
+
+
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+@pytest.mark.parametrize("solver", ["auto", "cholesky", "qr", "svd"])
+def test_fit_from_npy_in_row_blocks(tmp_path, monkeypatch, solver, fit_intercept, make_data):
+    # blocks of a few rows, so that the memmap is read in many of them
+    monkeypatch.setattr("mlr.Solvers.BLOCK_BYTES", 1024)
+    X, y, _ = make_data(1000, 6, loc=3.0, intercept=1.0)
+    np.save(str(tmp_path / "X.npy"), X)
+    np.save(str(tmp_path / "y.npy"), y)
+    model = MyLinearRegression(fit_intercept=fit_intercept, solver=solver)
+    model.ingest_data(str(tmp_path / "X.npy"), str(tmp_path / "y.npy"))
+    assert isinstance(model.features_, np.memmap)
+    model.fit()
+    assert_same_as_in_memory(model, X, y, fit_intercept, solver)
+
+
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+def test_fit_from_raw_float32_file(tmp_path, monkeypatch, fit_intercept, make_data):
+    monkeypatch.setattr("mlr.Solvers.BLOCK_BYTES", 1024)
+    X, y, _ = make_data(1000, 6, loc=3.0, intercept=1.0)
+    X = X.astype(np.float32)
+    path = str(tmp_path / "X.bin")
+    X.tofile(path)
+    model = MyLinearRegression(fit_intercept=fit_intercept)
+    model.ingest_data(path, y, dtype=np.float32, num_features=X.shape[1])
+    assert isinstance(model.features_, np.memmap)
+    assert model.features_.dtype == np.float32
+    model.fit()
+    assert_same_as_in_memory(model, X, y, fit_intercept, "auto")
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from mlr.MLR import MyLinearRegression
+
+
+# a CSR design
+DATA = dict(p=8, density=0.3, loc=1.0)
+
+
+@pytest.fixture
+def fit_both(fitted_model):
+    """Fits the model on the sparse design and on the same design densified"""
+
+    def fit(X, y, fit_intercept, solver="auto", weights=None):
+        params = dict(fit_intercept=fit_intercept, solver=solver)
+        dense = fitted_model(X.toarray(), y, weights, **params)
+        return fitted_model(X, y, weights, **params), dense
+
+    return fit
+
+
+@pytest.mark.parametrize("fmt", ["csr", "csc"])
+@pytest.mark.parametrize("weighted", [False, True], ids=["ols", "wls"])
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+def test_sparse_fit_matches_dense(fit_intercept, weighted, fmt, make_data, fit_both):
+    X, y, weights = make_data(**DATA)
+    X = X.asformat(fmt)
+    sparse, dense = fit_both(X, y, fit_intercept, weights=weights if weighted else None)
+    assert sp.issparse(sparse.features_)
+    np.testing.assert_allclose(sparse.coef_, dense.coef_, rtol=1e-10)
+    np.testing.assert_allclose(sparse.intercept_, dense.intercept_, rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(sparse.std_err(), dense.std_err(), rtol=1e-10)
+    np.testing.assert_allclose(sparse.pvalues(), dense.pvalues(), rtol=1e-8, atol=1e-300)
+    np.testing.assert_allclose(sparse.leverage(), dense.leverage(), rtol=1e-9)
+    np.testing.assert_allclose(sparse.sse(), dense.sse(), rtol=1e-10)
+    np.testing.assert_allclose(sparse.aic(), dense.aic(), rtol=1e-10)
+    np.testing.assert_allclose(sparse.predict(X), dense.predict(X.toarray()), rtol=1e-10)
+
+
+@pytest.mark.parametrize("solver", ["cholesky", "qr", "svd", "lstsq"])
+def test_sparse_direct_solvers(solver, make_data, fit_both):
+    X, y, _ = make_data(**DATA)
+    sparse, dense = fit_both(X, y, True, solver)
+    np.testing.assert_allclose(sparse.coef_, dense.coef_, rtol=1e-10)
+    np.testing.assert_allclose(sparse.std_err(), dense.std_err(), rtol=1e-10)
+
+
+def test_sparse_multi_target(make_data, fit_both):
+    X, y, _ = make_data(**DATA)
+    Y = np.column_stack([y, 2 * y + 1])
+    sparse, dense = fit_both(X, Y, True)
+    np.testing.assert_allclose(sparse.coef_, dense.coef_, rtol=1e-10)
+    np.testing.assert_allclose(sparse.std_err(), dense.std_err(), rtol=1e-10)
+
+
+def test_sparse_validation_and_multicollinearity(make_data, fit_both):
+    X, y, _ = make_data(**DATA)
+    sparse, dense = fit_both(X, y, True)
+    for metric, values in sparse.cross_validate(k=4, metrics=("mse", "r_squared")).items():
+        np.testing.assert_allclose(
+            values, dense.cross_validate(k=4, metrics=(metric,))[metric], rtol=1e-9
+        )
+    np.testing.assert_allclose(sparse.corrcoef(), dense.corrcoef(), rtol=1e-10, atol=1e-14)
+    np.testing.assert_allclose(sparse.covar(), dense.covar(), rtol=1e-10, atol=1e-14)
+
+
+def test_sparse_rolling_fit(make_data, fit_both):
+    X, y, _ = make_data(**DATA)
+    sparse, dense = fit_both(X, y, True)
+    rolled = sparse.rolling_fit(window=100, step=25)
+    expected = dense.rolling_fit(window=100, step=25)
+    np.testing.assert_allclose(rolled.coef, expected.coef, rtol=1e-9)
+    np.testing.assert_allclose(rolled.std_err, expected.std_err, rtol=1e-9)
+
+
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+def test_statsmodels_results_of_a_sparse_design(fit_intercept, make_data, fit_both):
+    X, y, _ = make_data(**DATA)
+    sparse, dense = fit_both(X, y, fit_intercept)
+    lm = sparse._ols()
+    assert len(lm.params) == len(dense.coef_) + fit_intercept
+    np.testing.assert_allclose(lm.params[fit_intercept:], dense.coef_, rtol=1e-8)
+    np.testing.assert_allclose(lm.get_influence().hat_matrix_diag, dense.leverage(), rtol=1e-8)
+
+
+@pytest.mark.filterwarnings("ignore:.*non-interactive")
+def test_feature_plots_of_a_sparse_design(make_data):
+    matplotlib = pytest.importorskip("matplotlib")
+    pytest.importorskip("seaborn")
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    X, y, _ = make_data(n=60, p=3, density=0.3, loc=1.0)
+    model = MyLinearRegression()
+    model.fit(X, y)
+    model.fitted_vs_features()
+    model.pairplot()
+    plt.close("all")
@@ -0,0 +1,205 @@
+"""
+Parity of the fit, metrics and inference with statsmodels OLS / WLS
+
+Run from the repository root with `python -m pytest -q`.
+"""
+import numpy as np
+import pytest
+
+from mlr.MLR import MyLinearRegression
+
+sm = pytest.importorskip("statsmodels.api")
+
+DIRECT_SOLVERS = ["auto", "cholesky", "qr", "svd", "lstsq"]
+ITERATIVE_SOLVERS = ["cg", "lsqr", "lsmr"]
+
+# relative tolerance of the direct solvers, and of the iterative ones,
+# which stop at a relative residual of 1e-10
+DIRECT_RTOL = 1e-10
+ITERATIVE_RTOL = 1e-7
+
+# features of different means, for the centering to matter
+DATA = dict(spread=2.0, intercept=1.5)
+
+
+def reference(X, y, fit_intercept, weights):
+    design = sm.add_constant(X) if fit_intercept else X
+    if weights is None:
+        return sm.OLS(y, design).fit()
+    return sm.WLS(y, design, weights=weights).fit()
+
+
+def params(model):
+    if model.fit_intercept_:
+        return np.concatenate([[model.intercept_], model.coef_])
+    return model.coef_
+
+
+def assert_fit_parity(model, ref, rtol):
+    np.testing.assert_allclose(params(model), ref.params, rtol=rtol, atol=rtol)
+    np.testing.assert_allclose(model.sse(), ref.ssr, rtol=rtol)
+    np.testing.assert_allclose(model.aic(), ref.aic, rtol=rtol)
+    np.testing.assert_allclose(model.bic(), ref.bic, rtol=rtol)
+    fvalue, f_pvalue = model.ftest()
+    np.testing.assert_allclose(fvalue, ref.fvalue, rtol=rtol)
+    np.testing.assert_allclose(f_pvalue, ref.f_pvalue, rtol=rtol, atol=1e-300)
+
+
+def assert_inference_parity(model, ref, rtol):
+    np.testing.assert_allclose(model.std_err(), ref.bse, rtol=rtol)
+    np.testing.assert_allclose(model.tvalues(), ref.tvalues, rtol=rtol)
+    np.testing.assert_allclose(model.pvalues(), ref.pvalues, rtol=1e-8, atol=1e-300)
+    np.testing.assert_allclose(model.conf_int(), ref.conf_int(), rtol=rtol)
+    np.testing.assert_allclose(
+        model.conf_int(alpha=0.1), ref.conf_int(alpha=0.1), rtol=rtol
+    )
+
+
+@pytest.mark.parametrize("weighted", [False, True], ids=["ols", "wls"])
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+@pytest.mark.parametrize("solver", DIRECT_SOLVERS)
+def test_direct_solvers(solver, fit_intercept, weighted, make_data, fitted_model):
+    X, y, weights = make_data(400, 5, **DATA)
+    weights = weights if weighted else None
+    model = fitted_model(X, y, weights, solver=solver, fit_intercept=fit_intercept)
+    ref = reference(X, y, fit_intercept, weights)
+    assert_fit_parity(model, ref, DIRECT_RTOL)
+    assert_inference_parity(model, ref, DIRECT_RTOL)
+    if fit_intercept:
+        # statsmodels reports the uncentered R^2 of a model without intercept
+        np.testing.assert_allclose(model.r_squared(), ref.rsquared, rtol=DIRECT_RTOL)
+        np.testing.assert_allclose(
+            model.adj_r_squared(), ref.rsquared_adj, rtol=DIRECT_RTOL
+        )
+
+
+@pytest.mark.parametrize("weighted", [False, True], ids=["ols", "wls"])
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+@pytest.mark.parametrize("solver", ITERATIVE_SOLVERS)
+def test_iterative_solvers(solver, fit_intercept, weighted, make_data, fitted_model):
+    X, y, weights = make_data(400, 5, **DATA)
+    weights = weights if weighted else None
+    model = fitted_model(X, y, weights, solver=solver, fit_intercept=fit_intercept)
+    ref = reference(X, y, fit_intercept, weights)
+    assert_fit_parity(model, ref, ITERATIVE_RTOL)
+    # no factorization is kept, so no standard errors
+    assert np.all(np.isnan(model.std_err()))
+
+
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+def test_sgd_solver(fit_intercept, make_data):
+    X, y, _ = make_data(2000, 3, **DATA)
+    model = MyLinearRegression(
+        fit_intercept=fit_intercept, solver="sgd", tol=1e-6, max_iter=500
+    )
+    model.fit(X, y)
+    ref = reference(X, y, fit_intercept, None)
+    np.testing.assert_allclose(params(model), ref.params, rtol=1e-3, atol=1e-3)
+
+
+@pytest.mark.parametrize("weighted", [False, True], ids=["ols", "wls"])
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+def test_update_and_remove(fit_intercept, weighted, make_data):
+    X, y, weights = make_data(500, 5, **DATA)
+    if not weighted:
+        weights = np.ones(len(y))
+    model = MyLinearRegression(fit_intercept=fit_intercept)
+    model.fit(X[:300], y[:300], sample_weight=weights[:300] if weighted else None)
+    model.update(X[300:], y[300:], sample_weight=weights[300:] if weighted else None)
+    model.remove(X[:100], y[:100], sample_weight=weights[:100] if weighted else None)
+    ref = reference(X[100:], y[100:], fit_intercept, weights[100:] if weighted else None)
+    assert_fit_parity(model, ref, DIRECT_RTOL)
+    assert_inference_parity(model, ref, DIRECT_RTOL)
+
+
+def test_update_weighted_fit_with_unit_weights(make_data):
+    X, y, weights = make_data(400, 5, **DATA)
+    model = MyLinearRegression()
+    model.fit(X[:300], y[:300], sample_weight=weights[:300])
+    model.update(X[300:], y[300:])
+    ref = reference(X, y, True, np.concatenate([weights[:300], np.ones(100)]))
+    assert model._fit_stats()["dfe"] == ref.df_resid
+    assert_fit_parity(model, ref, DIRECT_RTOL)
+    assert_inference_parity(model, ref, DIRECT_RTOL)
+
+
+@pytest.mark.parametrize("weighted", [False, True], ids=["ols", "wls"])
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+def test_influence(fit_intercept, weighted, make_data, fitted_model):
+    from statsmodels.stats.outliers_influence import OLSInfluence
+
+    X, y, weights = make_data(400, 5, **DATA)
+    weights = weights if weighted else None
+    model = fitted_model(X, y, weights, fit_intercept=fit_intercept)
+    design = sm.add_constant(X) if fit_intercept else X
+    if weighted:
+        # OLSInfluence of a WLS fit mixes the weighted and unweighted design:
+        # compare with the OLS fit of the whitened problem instead
+        root = np.sqrt(weights)
+        design, y = design * root[:, None], y * root
+    ref = OLSInfluence(sm.OLS(y, design).fit())
+    np.testing.assert_allclose(model.leverage(), ref.hat_matrix_diag, rtol=DIRECT_RTOL)
+    np.testing.assert_allclose(
+        model.studentized_resid(), ref.resid_studentized_internal, rtol=DIRECT_RTOL
+    )
+    np.testing.assert_allclose(
+        model.studentized_resid(external=True),
+        ref.resid_studentized_external,
+        rtol=DIRECT_RTOL,
+    )
+    np.testing.assert_allclose(model.cooks_distances(), ref.cooks_distance[0], rtol=DIRECT_RTOL)
+    np.testing.assert_allclose(model.dffits(), ref.dffits[0], rtol=DIRECT_RTOL)
+
+
+@pytest.mark.filterwarnings("ignore::statsmodels.tools.sm_exceptions.SingularMatrixWarning")
+@pytest.mark.parametrize("weighted", [False, True], ids=["ols", "wls"])
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+@pytest.mark.parametrize("solver", ["auto", "svd", "lstsq"])
+def test_rank_deficient_design(solver, fit_intercept, weighted, make_data, fitted_model):
+    X, y, weights = make_data(200, 4, **DATA)
+    X[:, 3] = X[:, 0] + 2 * X[:, 1]
+    weights = weights if weighted else None
+    model = fitted_model(X, y, weights, solver=solver, fit_intercept=fit_intercept)
+    ref = reference(X, y, fit_intercept, weights)
+    assert model.dfe_ == ref.df_resid
+    assert_fit_parity(model, ref, 1e-8)
+    assert_inference_parity(model, ref, 1e-8)
+
+
+@pytest.mark.filterwarnings("ignore::statsmodels.tools.sm_exceptions.SingularMatrixWarning")
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+@pytest.mark.parametrize("source", ["sparse", "stream"])
+def test_rank_deficient_gram(source, fit_intercept, make_data):
+    import scipy.sparse as sp
+
+    X, y, _ = make_data(200, 4, **DATA)
+    X[:, 3] = X[:, 0] + 2 * X[:, 1]
+    model = MyLinearRegression(fit_intercept=fit_intercept)
+    if source == "sparse":
+        model.fit(sp.csr_matrix(X), y)
+    else:
+        model.fit_stream([(X[:120], y[:120]), (X[120:], y[120:])])
+    ref = reference(X, y, fit_intercept, None)
+    assert model.dfe_ == ref.df_resid
+    assert_fit_parity(model, ref, 1e-7)
+    assert_inference_parity(model, ref, 1e-7)
+
+
+@pytest.mark.filterwarnings("error")
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+def test_no_degrees_of_freedom_left(fit_intercept, make_data, fitted_model):
+    X, y, _ = make_data(5, 8, **DATA)
+    model = fitted_model(X, y, fit_intercept=fit_intercept)
+    assert model.dfe_ == 0
+    for values in (
+        model.std_err(),
+        model.tvalues(),
+        model.pvalues(),
+        model.conf_int(),
+        model.ftest(),
+        model.adj_r_squared(),
+        model.studentized_resid(external=True),
+    ):
+        assert np.all(np.isnan(values))
+    model.cooks_distances()
+    model.dffits()
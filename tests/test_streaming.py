@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from mlr.MLR import MyLinearRegression
+
+
+def full_fit(X, y, fit_intercept=True):
+    model = MyLinearRegression(fit_intercept=fit_intercept)
+    model.fit(X, y)
+    return model
+
+
+def assert_same_fit(model, ref):
+    np.testing.assert_allclose(model.coef_, ref.coef_, rtol=1e-10)
+    np.testing.assert_allclose(model.intercept_, ref.intercept_, rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(model.std_err(), ref.std_err(), rtol=1e-10)
+    np.testing.assert_allclose(model.sse(), ref.sse(), rtol=1e-10)
+    assert model.dfe_ == ref.dfe_
+
+
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+def test_partial_fit_continues_a_fit(fit_intercept, make_data):
+    X, y, _ = make_data(n=1000, loc=2.0)
+    model = MyLinearRegression(fit_intercept=fit_intercept)
+    model.fit(X[:600], y[:600])
+    model.partial_fit(X[600:800], y[600:800])
+    model.partial_fit(X[800:], y[800:])
+    assert_same_fit(model, full_fit(X, y, fit_intercept))
+
+
+def test_partial_fit_from_scratch(make_data):
+    X, y, _ = make_data(n=1000, loc=2.0)
+    model = MyLinearRegression()
+    for start in range(0, len(y), 250):
+        model.partial_fit(X[start : start + 250], y[start : start + 250])
+    assert_same_fit(model, full_fit(X, y))
+
+
+def test_fit_stream(make_data):
+    X, y, _ = make_data(n=1000, loc=2.0)
+    chunks = ((X[i : i + 300], y[i : i + 300]) for i in range(0, len(y), 300))
+    model = MyLinearRegression()
+    model.fit_stream(chunks)
+    assert_same_fit(model, full_fit(X, y))
+
+
+def test_partial_fit_after_ingest_drops_the_old_stream(make_data):
+    X, y, _ = make_data(n=1000, loc=2.0)
+    model = MyLinearRegression()
+    model.fit_stream([(X[:100], y[:100])])
+    model.ingest_data(X[100:600], y[100:600])
+    model.partial_fit(X[600:], y[600:])
+    assert model.stream_stats_.count == 900
+    assert_same_fit(model, full_fit(X[100:], y[100:]))
+    assert model.features_ is None and model.resid_ is None
+    assert model.leverage() is None
+
+
+def test_fit_stream_of_no_chunks(capsys):
+    model = MyLinearRegression()
+    assert model.fit_stream([]) is None
+    assert "No data" in capsys.readouterr().out
+    assert not model.is_fitted and model.stream_stats_ is None
+
+
+@pytest.mark.parametrize("streamed", [False, True], ids=["in_memory", "streamed"])
+def test_refused_update_and_remove_leave_the_model(streamed, make_data):
+    X, y, _ = make_data(n=200, loc=2.0)
+    model = MyLinearRegression()
+    if streamed:
+        model.fit_stream([(X[:100], y[:100]), (X[100:], y[100:])])
+    else:
+        model.fit(X, y)
+    coef = model.coef_.copy()
+    r_squared = model.r_squared()
+    with pytest.raises(ValueError, match="columns"):
+        model.update(X[:5, :2], y[:5])
+    with pytest.raises(ValueError, match="as many observations"):
+        model.remove(X, y)
+    with pytest.raises(ValueError, match="columns"):
+        model.partial_fit(X[:5, :2], y[:5])
+    assert model.is_fitted
+    assert (model.features_ is None) == streamed
+    np.testing.assert_array_equal(model.coef_, coef)
+    assert model.r_squared() == r_squared
+    assert model.stream_stats_ is None or model.stream_stats_.count == 200
+
+
+@pytest.mark.filterwarnings("error")
+def test_partial_fit_of_fewer_rows_than_parameters(make_data):
+    X, y, _ = make_data(n=1000, loc=2.0)
+    model = MyLinearRegression()
+    model.partial_fit(X[:3], y[:3])
+    assert model.dfe_ == 0
+    assert np.all(np.isnan(model.std_err()))
+    model.partial_fit(X[3:], y[3:])
+    assert_same_fit(model, full_fit(X, y))
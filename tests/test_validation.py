@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from mlr.MLR import MyLinearRegression
+
+METRICS = ("mse", "rmse", "mae", "r_squared")
+DATA = dict(loc=1.0, intercept=2.0)
+
+
+def refit_scores(X, y, folds, fit_intercept):
+    """Metrics of each held-out fold, refitting the model on the other rows"""
+    scores = {metric: [] for metric in METRICS}
+    for rows in folds:
+        train = np.setdiff1d(np.arange(len(y)), rows)
+        model = MyLinearRegression(fit_intercept=fit_intercept)
+        model.fit(X[train], y[train])
+        resid = y[rows] - model.predict(X[rows])
+        sse = resid @ resid
+        yc = y[rows] - y[rows].mean()
+        scores["mse"].append(sse / len(rows))
+        scores["rmse"].append(np.sqrt(sse / len(rows)))
+        scores["mae"].append(np.mean(np.abs(resid)))
+        scores["r_squared"].append(1 - sse / (yc @ yc))
+    return scores
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+@pytest.mark.parametrize("sparse", [False, True], ids=["dense", "sparse"])
+def test_cross_validate_matches_refits(n_jobs, fit_intercept, sparse, make_data):
+    X, y, _ = make_data(200, **DATA)
+    model = MyLinearRegression(fit_intercept=fit_intercept)
+    model.fit(sp.csr_matrix(X) if sparse else X, y)
+    result = model.cross_validate(
+        k=5, metrics=METRICS, shuffle=True, random_state=3, n_jobs=n_jobs
+    )
+
+    order = np.arange(len(y))
+    np.random.default_rng(3).shuffle(order)
+    expected = refit_scores(X, y, np.array_split(order, 5), fit_intercept)
+    for metric in METRICS:
+        np.testing.assert_allclose(result[metric], expected[metric], rtol=1e-9)
+
+
+def test_cross_validate_refuses_sample_weights(capsys, make_data):
+    X, y, _ = make_data(200, **DATA)
+    model = MyLinearRegression()
+    model.fit(X, y, sample_weight=np.ones(len(y)))
+    assert model.cross_validate() is None
+    assert "sample weights" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("fit_intercept", [True, False], ids=["intercept", "no_intercept"])
+def test_press_resid_matches_leave_one_out_refits(fit_intercept, make_data):
+    X, y, _ = make_data(40, **DATA)
+    model = MyLinearRegression(fit_intercept=fit_intercept)
+    model.fit(X, y)
+    expected = []
+    for i in range(len(y)):
+        rest = np.arange(len(y)) != i
+        loo = MyLinearRegression(fit_intercept=fit_intercept)
+        loo.fit(X[rest], y[rest])
+        expected.append(y[i] - loo.predict(X[i : i + 1])[0])
+    np.testing.assert_allclose(model.press_resid(), expected, rtol=1e-9)
+    np.testing.assert_allclose(model.press(), np.sum(np.square(expected)), rtol=1e-9)